@@ -22,46 +22,93 @@ Usage:
     python -m dspy_helm.cli --list-scenarios
 """
 
-from .providers import (
-    BaseProvider,
-    ProviderResponse,
-    RateLimitConfig,
-    ProviderChain,
-    OpenCodeZenProvider,
-    OpenRouterProvider,
-    GeminiProvider,
-    create_provider_chain,
-    get_default_provider,
-    get_provider_by_name,
-)
-
-from .scenarios import (
-    BaseScenario,
-    ScenarioRegistry,
-    SecurityReviewScenario,
-    UnitTestScenario,
-    DocumentationScenario,
-    APIDesignScenario,
-)
-
-from .optimizers import (
-    BaseOptimizer,
-    IOptimizer,
-    OptimizerRegistry,
-    MIPROv2Optimizer,
-    BootstrapFewShotOptimizer,
-    BootstrapFewShotRandomSearchOptimizer,
-)
-
-from .eval import Evaluator
-
-from .prompts import (
-    TOMLPrompt,
-    PromptRegistry,
-    TOMLToDSPyConverter,
-    load_commands_prompts,
-    initialize_prompt_registry,
-)
+from typing import TYPE_CHECKING, Any, Dict
+import importlib
+
+# Public name -> subpackage it is imported from on first access (PEP 562),
+# so e.g. ``python -m dspy_helm.cli --prompt`` does not import dspy
+_LAZY_ATTRS: Dict[str, str] = {
+    "BaseProvider": "providers",
+    "ProviderResponse": "providers",
+    "RateLimitConfig": "providers",
+    "ProviderChain": "providers",
+    "OpenCodeZenProvider": "providers",
+    "OpenRouterProvider": "providers",
+    "GeminiProvider": "providers",
+    "create_provider_chain": "providers",
+    "get_default_provider": "providers",
+    "get_provider_by_name": "providers",
+    "BaseScenario": "scenarios",
+    "ScenarioRegistry": "scenarios",
+    "SecurityReviewScenario": "scenarios",
+    "UnitTestScenario": "scenarios",
+    "DocumentationScenario": "scenarios",
+    "APIDesignScenario": "scenarios",
+    "BaseOptimizer": "optimizers",
+    "IOptimizer": "optimizers",
+    "OptimizerRegistry": "optimizers",
+    "MIPROv2Optimizer": "optimizers",
+    "BootstrapFewShotOptimizer": "optimizers",
+    "BootstrapFewShotRandomSearchOptimizer": "optimizers",
+    "Evaluator": "eval",
+    "TOMLPrompt": "prompts",
+    "PromptRegistry": "prompts",
+    "TOMLToDSPyConverter": "prompts",
+    "load_commands_prompts": "prompts",
+    "initialize_prompt_registry": "prompts",
+}
+
+if TYPE_CHECKING:
+    from .providers import (
+        BaseProvider,
+        ProviderResponse,
+        RateLimitConfig,
+        ProviderChain,
+        OpenCodeZenProvider,
+        OpenRouterProvider,
+        GeminiProvider,
+        create_provider_chain,
+        get_default_provider,
+        get_provider_by_name,
+    )
+    from .scenarios import (
+        BaseScenario,
+        ScenarioRegistry,
+        SecurityReviewScenario,
+        UnitTestScenario,
+        DocumentationScenario,
+        APIDesignScenario,
+    )
+    from .optimizers import (
+        BaseOptimizer,
+        IOptimizer,
+        OptimizerRegistry,
+        MIPROv2Optimizer,
+        BootstrapFewShotOptimizer,
+        BootstrapFewShotRandomSearchOptimizer,
+    )
+    from .eval import Evaluator
+    from .prompts import (
+        TOMLPrompt,
+        PromptRegistry,
+        TOMLToDSPyConverter,
+        load_commands_prompts,
+        initialize_prompt_registry,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    package = _LAZY_ATTRS.get(name)
+    if package is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{package}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __version__ = "1.0.0"
 __author__ = "gemini-cli-prompt-library"
@@ -7,28 +7,81 @@ Usage:
     python -m dspy_helm.cli --scenario security_review --evaluate-only
     python -m dspy_helm.cli --scenario security_review --optimizer MIPROv2
     python -m dspy_helm.cli --scenario unit_test --optimizer BootstrapFewShot
+    python -m dspy_helm.cli --prompt "Explain SQL injection" --stream
 """
 
 import argparse
 import sys
+from contextlib import ExitStack
 from typing import Optional
 
 
-def setup_dspy_lm(provider: str = "groq", model: str = "llama-3.3-70b-versatile"):
-    """Configure DSPy with the specified LM provider."""
+def setup_dspy_lm(
+    provider: str = "groq",
+    model: Optional[str] = None,
+    cache: bool = False,
+    max_concurrency: Optional[int] = None,
+    params=None,
+    budget=None,
+):
+    """
+    Configure DSPy to send its requests through the provider layer.
+
+    Args:
+        provider: Provider name, or "chain" for the default failover chain
+            (scheduled at batch priority on the shared PriorityScheduler)
+        model: Model to use (default: the provider's default model; the
+            chain takes its models from providers.yaml and ignores this)
+        cache: Reuse completions from earlier runs (on-disk ResponseCache)
+        max_concurrency: In-flight LM requests allowed (None = unlimited)
+        params: GenerationParams used as the LM's defaults
+        budget: RunBudget the chain enforces (None = unlimited)
+
+    Returns:
+        The configured ProviderLM, or None if it could not be set up
+    """
     import dspy
-    from dspy_helm.providers import get_provider_by_name
+    from dspy_helm.providers import (
+        PriorityScheduler,
+        ProviderChain,
+        ResponseCache,
+        create_provider_chain,
+        get_provider_by_name,
+        get_registry,
+        get_scheduler,
+    )
+
+    if provider == "chain" and model:
+        print(
+            f"Warning: --model {model} is ignored with --provider chain; "
+            "set models in providers.yaml"
+        )
 
     try:
-        provider_instance = get_provider_by_name(provider)
-        lm = dspy.OpenAI(
-            model=model,
-            api_key=(
-                provider_instance.api_key
-                if hasattr(provider_instance, "api_key")
-                else ""
-            ),
-            base_url=provider_instance.base_url,
+        from dspy_helm.providers.dspy_lm import ProviderLM
+
+        if provider == "chain" and budget is None:
+            chain = get_scheduler().client("batch")
+        elif provider == "chain":
+            # A budgeted run gets its own scheduler so the budget does not
+            # stay attached to the process-wide one
+            chain = PriorityScheduler(create_provider_chain(budget=budget)).client(
+                "batch"
+            )
+        else:
+            chain = ProviderChain(
+                [get_provider_by_name(provider, model)], budget=budget
+            )
+        if provider == "chain":
+            name = "chain/" + ">".join(get_registry().chain_order())
+        else:
+            name = f"{provider}/{chain.providers[0].model}"
+        lm = ProviderLM(
+            chain,
+            model=name,
+            response_cache=ResponseCache() if cache else None,
+            max_concurrency=max_concurrency,
+            **(params.to_dict() if params is not None else {}),
         )
         dspy.settings.configure(lm=lm)
         return lm
@@ -52,12 +105,125 @@ def list_scenarios():
     return scenarios
 
 
+def ask(
+    prompt: str,
+    provider: str = "groq",
+    model: Optional[str] = None,
+    stream: bool = False,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+):
+    """
+    Send a single prompt to a provider and print the reply.
+
+    The call goes through the shared scheduler at interactive priority,
+    so it overtakes batch work in this process (see providers.scheduler).
+    Streams are not scheduled.
+    """
+    from dspy_helm.providers import (
+        GenerationParams,
+        ProviderChain,
+        get_provider_by_name,
+        get_scheduler,
+    )
+
+    scheduler = get_scheduler()
+    if provider == "chain":
+        chain = scheduler.chain
+    else:
+        chain = ProviderChain([get_provider_by_name(provider, model)])
+    params = GenerationParams(max_tokens=max_tokens, temperature=temperature)
+
+    if not stream:
+        response = scheduler.client("interactive", chain).call(prompt, params=params)
+    else:
+        response_stream = chain.stream(prompt, params=params)
+        for chunk in response_stream:
+            print(chunk, end="", flush=True)
+        print()
+        response = response_stream.response
+
+    if not response.success:
+        print(f"Error: {response.error}")
+        return response
+
+    if not stream:
+        print(response.content)
+    ttft = response.metadata.get("ttft_seconds")
+    timing = f"{response.latency_seconds:.2f}s"
+    if ttft is not None:
+        timing += f", first token {ttft:.2f}s"
+    timing += (
+        f", {response.prompt_tokens} prompt + "
+        f"{response.completion_tokens} completion tokens"
+    )
+    print(f"\n[{response.provider}/{response.model} in {timing}]")
+    return response
+
+
+def print_concurrency(results, num_threads: int):
+    """Print how busy each provider kept the evaluation threads."""
+    for name, stats in (results.get("concurrency") or {}).items():
+        if not stats["requests"]:
+            continue
+        print(
+            f"  {name}: {stats['requests']} requests, "
+            f"{stats['mean_concurrency']:.1f} mean / {stats['peak_in_flight']} peak "
+            f"in flight of {num_threads} threads, "
+            f"{stats['queue_wait_seconds']:.1f}s queued in the rate limiter"
+        )
+
+
+def print_budget(budget) -> None:
+    """Print a run's usage against its budget."""
+    report = budget.report()
+    print(
+        f"Budget: {report['requests']} requests, {report['tokens']} tokens "
+        f"({report['prompt_tokens']} prompt + {report['completion_tokens']} "
+        f"completion), ${report['cost']:.4f}, {report['elapsed_seconds']:.0f}s; "
+        f"{report['cache_hits']} cache hits, {report['rejected']} calls refused"
+    )
+    if report["exhausted"]:
+        print(f"Budget exhausted: {report['exhausted']}")
+
+
+def build_budget(
+    max_tokens: Optional[int] = None,
+    max_requests: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    max_cost: Optional[float] = None,
+):
+    """RunBudget for the given limits, or None if none is set."""
+    if all(v is None for v in (max_tokens, max_requests, max_seconds, max_cost)):
+        return None
+    from dspy_helm.providers import RunBudget, get_registry
+
+    return RunBudget(
+        max_tokens=max_tokens,
+        max_requests=max_requests,
+        max_seconds=max_seconds,
+        max_cost=max_cost,
+        cost_per_1k_tokens=get_registry().costs(),
+    )
+
+
 def run_evaluation(
     scenario_name: str,
     optimizer_name: Optional[str] = None,
     evaluate_only: bool = False,
     provider: str = "groq",
-    model: str = "llama-3.3-70b-versatile",
+    model: Optional[str] = None,
+    cache: bool = False,
+    max_concurrency: Optional[int] = None,
+    cassette_path: Optional[str] = None,
+    cassette_mode: str = "replay",
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    pack_size: Optional[int] = None,
+    max_tokens_budget: Optional[int] = None,
+    max_requests: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    max_cost: Optional[float] = None,
 ):
     """Run evaluation for a scenario."""
     from dspy_helm.scenarios import ScenarioRegistry
@@ -85,29 +251,73 @@ def run_evaluation(
 
         program = dspy.ChainOfThought("code -> review")
 
-    setup_dspy_lm(provider, model)
+    from dspy_helm.providers import Cassette, GenerationParams, use_cassette
 
-    if evaluate_only:
-        print("\nEvaluating without optimization...")
-        evaluator = Evaluator(metric=scenario.metric)
-        results = evaluator.evaluate(program, valset)
-        print(f"Score: {results.get('score', 'N/A')}")
-        return results
-
-    if optimizer_name:
-        print(f"\nOptimizing with {optimizer_name}...")
-        optimizer_class = OptimizerRegistry.get(optimizer_name)
-        optimizer = optimizer_class(metric=scenario.metric)
-        optimized_program = optimizer.compile(program, trainset, valset)
-
-        print("\nEvaluating optimized program...")
-        evaluator = Evaluator(metric=scenario.metric)
-        results = evaluator.evaluate(optimized_program, valset)
-        print(f"Score: {results.get('score', 'N/A')}")
-        return results, optimized_program
+    cassette = Cassette(cassette_path, cassette_mode) if cassette_path else None
+    budget = build_budget(max_tokens_budget, max_requests, max_seconds, max_cost)
+    # Command-line settings override the scenario's
+    params = GenerationParams(max_tokens=max_tokens, temperature=temperature).merged(
+        scenario.GENERATION_PARAMS or GenerationParams()
+    )
+    lm = setup_dspy_lm(
+        provider,
+        model,
+        cache=cache,
+        max_concurrency=max_concurrency,
+        params=params,
+        budget=budget,
+    )
+    session = ExitStack()
+    if cassette is not None and lm is not None:
+        # For this run only: the providers are the registry's shared instances
+        session.enter_context(use_cassette(cassette, lm.chain.providers))
 
-    print("No optimizer specified. Use --optimizer to optimize prompts.")
-    return None
+    try:
+        if evaluate_only and pack_size is not None and lm is not None:
+            pack_size = pack_size or scenario.PACK_SIZE
+            print(f"\nEvaluating scenario prompts, {pack_size} per request...")
+            evaluator = Evaluator(metric=scenario.metric)
+            results = evaluator.evaluate_packed(
+                scenario, valset, lm.chain, pack_size=pack_size, **params.to_dict()
+            )
+            print(f"Score: {results.get('score', 'N/A')}")
+            packing = results["packing"]
+            print(
+                f"  {packing['prompts']} examples in {packing['requests']} requests "
+                f"({packing['fallbacks']} sent alone after an unparsed pack)"
+            )
+            print_concurrency(results, evaluator.num_threads)
+            return results
+
+        if evaluate_only:
+            print("\nEvaluating without optimization...")
+            evaluator = Evaluator(metric=scenario.metric)
+            results = evaluator.evaluate(program, valset)
+            print(f"Score: {results.get('score', 'N/A')}")
+            print_concurrency(results, evaluator.num_threads)
+            return results
+
+        if optimizer_name:
+            print(f"\nOptimizing with {optimizer_name}...")
+            optimizer_class = OptimizerRegistry.get(optimizer_name)
+            optimizer = optimizer_class(metric=scenario.metric)
+            optimized_program = optimizer.compile(program, trainset, valset)
+
+            print("\nEvaluating optimized program...")
+            evaluator = Evaluator(metric=scenario.metric)
+            results = evaluator.evaluate(optimized_program, valset)
+            print(f"Score: {results.get('score', 'N/A')}")
+            print_concurrency(results, evaluator.num_threads)
+            return results, optimized_program
+
+        print("No optimizer specified. Use --optimizer to optimize prompts.")
+        return None
+    finally:
+        session.close()
+        if cassette is not None:
+            print(cassette.miss_report())
+        if budget is not None:
+            print_budget(budget)
 
 
 def main():
@@ -122,6 +332,7 @@ Examples:
     python -m dspy_helm.cli --scenario security_review --evaluate-only
     python -m dspy_helm.cli --scenario security_review --optimizer MIPROv2
     python -m dspy_helm.cli --scenario unit_test --optimizer BootstrapFewShot
+    python -m dspy_helm.cli --prompt "Explain SQL injection" --stream
         """,
     )
 
@@ -162,23 +373,136 @@ Examples:
             "opencode_zen",
             "openrouter",
             "google",
+            "chain",
         ],
-        help="LM provider to use",
+        help="LM provider to use ('chain' fails over across the default providers)",
     )
 
     parser.add_argument(
         "--model",
         type=str,
-        default="llama-3.3-70b-versatile",
-        help="Model to use",
+        default=None,
+        help="Model to use (default: the provider's default model)",
+    )
+
+    parser.add_argument(
+        "--prompt",
+        type=str,
+        help="Send a single prompt to --provider and print the reply",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="With --prompt, print the reply as it is generated",
+    )
+
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="Completion token limit (default: the scenario's, else the provider's)",
+    )
+
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=None,
+        help="Sampling temperature (default: the scenario's, else the provider's)",
+    )
+
+    parser.add_argument(
+        "--pack",
+        type=int,
+        nargs="?",
+        const=0,
+        default=None,
+        metavar="N",
+        help="With --evaluate-only, send N scenario prompts per request "
+        "(default N: the scenario's) instead of running the DSPy program",
+    )
+
+    parser.add_argument(
+        "--max-tokens-budget",
+        type=int,
+        default=None,
+        help="Stop sending requests once the run has used this many tokens",
+    )
+
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Stop sending requests after this many provider requests",
+    )
+
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Stop sending requests after this much wall time",
+    )
+
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        default=None,
+        help="Stop sending requests once the run has cost this many USD "
+        "(priced with providers.yaml cost_per_1k_tokens)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse LM completions from earlier runs",
+    )
+
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Maximum in-flight LM requests during evaluation and optimization",
+    )
+
+    parser.add_argument(
+        "--cassette",
+        type=str,
+        default=None,
+        help="JSONL file to record LM responses to or replay them from",
+    )
+
+    parser.add_argument(
+        "--cassette-mode",
+        type=str,
+        default="replay",
+        choices=["record", "replay", "record_new"],
+        help="replay: offline from the cassette; record_new: record only misses",
     )
 
     args = parser.parse_args()
+    model = args.model
+
+    if args.provider == "chain" and model:
+        parser.error(
+            "--model cannot be combined with --provider chain; "
+            "set each provider's model in providers.yaml"
+        )
 
     if args.list_scenarios:
         list_scenarios()
         sys.exit(0)
 
+    if args.prompt:
+        response = ask(
+            args.prompt,
+            args.provider,
+            model,
+            stream=args.stream,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+        )
+        sys.exit(0 if response.success else 1)
+
     if not args.scenario:
         parser.print_help()
         print("\nError: --scenario is required unless --list-scenarios is specified")
@@ -190,7 +514,18 @@ Examples:
             optimizer_name=args.optimizer,
             evaluate_only=args.evaluate_only,
             provider=args.provider,
-            model=args.model,
+            model=model,
+            cache=args.cache,
+            max_concurrency=args.max_concurrency,
+            cassette_path=args.cassette,
+            cassette_mode=args.cassette_mode,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+            pack_size=args.pack,
+            max_tokens_budget=args.max_tokens_budget,
+            max_requests=args.max_requests,
+            max_seconds=args.max_seconds,
+            max_cost=args.max_cost,
         )
         print(f"\n{'=' * 60}")
         print("Done!")
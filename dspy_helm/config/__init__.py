@@ -2,6 +2,6 @@
 Config module for DSPy-HELM.
 """
 
-from .providers import load_providers_config
+from .providers import load_providers_config, get_provider_config
 
-__all__ = ["load_providers_config"]
+__all__ = ["load_providers_config", "get_provider_config"]
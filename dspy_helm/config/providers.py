@@ -0,0 +1,61 @@
+"""
+Loader for providers.yaml.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import yaml
+
+PROVIDERS_CONFIG_PATH = Path(__file__).parent / "providers.yaml"
+
+logger = logging.getLogger(__name__)
+
+
+def load_providers_config(
+    path: Optional[Union[str, Path]] = None,
+) -> Dict[str, Any]:
+    """
+    Load the provider configuration.
+
+    Returns an empty config if the file does not exist or is invalid.
+
+    Args:
+        path: YAML file (default: dspy_helm/config/providers.yaml)
+
+    Returns:
+        Parsed configuration dictionary
+    """
+    config_path = Path(path) if path else PROVIDERS_CONFIG_PATH
+    if not config_path.exists():
+        return {}
+
+    try:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+    except (yaml.YAMLError, OSError) as e:
+        logger.warning(f"Failed to load provider config from {config_path}: {e}")
+        return {}
+
+    return config if isinstance(config, dict) else {}
+
+
+def get_provider_config(
+    name: str, config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Get one provider's block from the configuration.
+
+    Args:
+        name: Provider key (e.g., "groq")
+        config: Parsed configuration (default: load_providers_config())
+
+    Returns:
+        Provider configuration, or an empty dict if not configured
+    """
+    if config is None:
+        config = load_providers_config()
+    providers = config.get("providers") or {}
+    entry = providers.get(name) if isinstance(providers, dict) else None
+    return entry if isinstance(entry, dict) else {}
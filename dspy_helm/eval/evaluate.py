@@ -2,12 +2,14 @@
 Evaluation harness for DSPy programs.
 """
 
-from typing import List, Callable, Dict, Any, TYPE_CHECKING
+from typing import List, Callable, Dict, Any, Union, TYPE_CHECKING
 import json
 from pathlib import Path
 
 if TYPE_CHECKING:
     import dspy
+    from ..providers.base import BaseProvider, ProviderChain
+    from ..scenarios.base import BaseScenario
 
 
 class Evaluator:
@@ -22,6 +24,11 @@ class Evaluator:
     ):
         self.metric = metric
         self.num_threads = num_threads
+
+        # Size shared provider connection pools for num_threads callers
+        from ..providers.sessions import ensure_pool_size
+
+        ensure_pool_size(num_threads)
         self.display_progress = display_progress
         self.display_table = display_table
 
@@ -78,10 +85,95 @@ class Evaluator:
 
             avg_score = total_score / len(devset) if devset else 0.0
 
-            return {"score": avg_score, "count": len(devset), "outputs": results}
+            return self._with_concurrency(
+                {"score": avg_score, "count": len(devset), "outputs": results}
+            )
         else:
             avg_score = self._evaluator(program)
-            return {"score": avg_score, "count": len(devset)}
+            return self._with_concurrency({"score": avg_score, "count": len(devset)})
+
+    def evaluate_packed(
+        self,
+        scenario: "BaseScenario",
+        devset: List["dspy.Example"],
+        target: Union["BaseProvider", "ProviderChain"],
+        pack_size: int = 8,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a scenario's own prompts, several examples per request.
+
+        Prompts come from ``scenario.make_prompt`` rather than a DSPy
+        program; answers fill the scenario's first output field and are
+        scored with the metric. See ``providers.packing``.
+
+        Args:
+            scenario: Scenario providing prompts, output field and metric
+            devset: Examples to evaluate
+            target: Provider or chain to send packed requests to
+            pack_size: Examples per request
+            **kwargs: Call arguments (e.g., generation parameters)
+
+        Returns:
+            score, count, outputs and packing counters
+        """
+        import dspy
+        from ..providers.packing import PackingConfig, PromptPacker
+
+        if not scenario.OUTPUT_FIELDS:
+            raise ValueError(f"{scenario!r} has no output field to fill")
+        output_field = scenario.OUTPUT_FIELDS[0]
+
+        packer = PromptPacker(
+            target,
+            PackingConfig(pack_size=pack_size, max_concurrency=self.num_threads),
+        )
+        prompts = [scenario.make_prompt(dict(example)) for example in devset]
+        responses = packer.call_many(prompts, **kwargs)
+
+        results = []
+        total_score = 0.0
+        for example, response in zip(devset, responses):
+            pred = (
+                dspy.Prediction(**{output_field: response.content})
+                if response.success
+                else None
+            )
+            try:
+                score = (self.metric(example, pred) or 0.0) if pred else 0.0
+            except Exception:
+                score = 0.0
+            total_score += score
+            results.append(
+                {
+                    "example": dict(example),
+                    "prediction": {output_field: response.content} if pred else None,
+                    "score": score,
+                }
+            )
+
+        avg_score = total_score / len(devset) if devset else 0.0
+        return self._with_concurrency(
+            {
+                "score": avg_score,
+                "count": len(devset),
+                "outputs": results,
+                "packing": packer.stats(),
+            }
+        )
+
+    @staticmethod
+    def _with_concurrency(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the configured ProviderLM's per-provider concurrency counters."""
+        import dspy
+
+        chain = getattr(dspy.settings.lm, "chain", None)
+        providers = getattr(chain, "providers", None)
+        if isinstance(providers, list) and providers:
+            results["concurrency"] = {
+                provider.name: provider.metrics.stats() for provider in providers
+            }
+        return results
 
     def export_results(self, results: Dict[str, Any], output_path: Path) -> None:
         """Export evaluation results to JSON."""
@@ -10,88 +10,132 @@ Provides unified interface for:
 - Google Gemini (requires API key)
 
 Priority: Groq → HuggingFace → OpenRouter → Gemini (all with free tiers!)
-"""
-
-from .base import BaseProvider, ProviderResponse, RateLimitConfig, ProviderChain
-from .groq import GroqProvider
-from .huggingface import HuggingFaceProvider
-from .puter import PuterFreeProvider
-from .opencode_zen import OpenCodeZenProvider
-from .openrouter import OpenRouterProvider
-from .gemini import GeminiProvider
-
-
-def create_provider_chain() -> ProviderChain:
-    """
-    Create provider chain with default providers.
-
-    Order: Groq → HuggingFace → OpenRouter → Gemini (all with free tiers!)
-    All using FREE tier - total cost: $0
 
-    Returns:
-        ProviderChain with all providers configured
-    """
-    providers = [
-        # Primary: Groq - FAST, free tier available!
-        GroqProvider(
-            model="llama-3.3-70b-versatile",
-            rate_limit=RateLimitConfig(enabled=True, max_retries=3, backoff_factor=1.0),
-        ),
-        # Fallback 1: HuggingFace - FREE, no API key needed!
-        HuggingFaceProvider(
-            model="meta-llama/Llama-3.2-3B-Instruct",
-            rate_limit=RateLimitConfig(enabled=True, max_retries=3, backoff_factor=1.0),
-        ),
-        # Fallback 2: OpenRouter (requires API key)
-        OpenRouterProvider(
-            model="x-ai/grok-4.1-fast:free",
-            rate_limit=RateLimitConfig(enabled=True, max_retries=3, backoff_factor=1.0),
-        ),
-        # Fallback 3: Gemini (requires API key)
-        GeminiProvider(
-            model="gemini-1.5-flash",
-            rate_limit=RateLimitConfig(enabled=True, max_retries=3, backoff_factor=2.0),
-        ),
-    ]
+Every provider supports both a blocking ``call`` and an asyncio ``acall``,
+and ``stream`` for incremental output (native SSE for OpenAI-compatible APIs).
 
-    return ProviderChain(providers)
+Names other than the core classes are imported on first access (PEP 562),
+so importing this package does not import every provider or ``requests``;
+providers themselves are built from providers.yaml by the registry.
+"""
 
+from typing import TYPE_CHECKING, Any, Dict
+import importlib
 
-def get_default_provider() -> GroqProvider:
-    """Get the default (primary) provider - Groq (fast, free tier available)."""
-    return GroqProvider(
-        model="llama-3.3-70b-versatile",
-        rate_limit=RateLimitConfig(enabled=True, max_retries=3, backoff_factor=1.0),
+from .base import BaseProvider, ProviderResponse, RateLimitConfig, ProviderChain
+from .params import GenerationParams
+
+# Public name -> submodule it is imported from on first access
+_LAZY_ATTRS: Dict[str, str] = {
+    "HTTPProvider": "http_provider",
+    "OpenAICompatibleProvider": "http_provider",
+    "CLIProvider": "cli_provider",
+    "HedgeConfig": "hedging",
+    "HedgeStats": "hedging",
+    "ResponseCache": "cache",
+    "SemanticCache": "semantic_cache",
+    "Cassette": "cassette",
+    "use_cassette": "cassette",
+    "RateLimiter": "ratelimit",
+    "TokenBucket": "ratelimit",
+    "CircuitBreaker": "circuit",
+    "CircuitBreakerConfig": "circuit",
+    "CircuitState": "circuit",
+    "AdaptiveRouter": "routing",
+    "RoutingConfig": "routing",
+    "ProviderStream": "streaming",
+    "WarmProcessPool": "workers",
+    "WorkerPoolConfig": "workers",
+    "configure_pool_size": "sessions",
+    "get_session": "sessions",
+    "estimate_tokens": "tokens",
+    "RunBudget": "budget",
+    "ConcurrencyMetrics": "metrics",
+    "ContextConfig": "context",
+    "PriorityScheduler": "scheduler",
+    "SchedulerConfig": "scheduler",
+    "get_scheduler": "scheduler",
+    "ModelWarmer": "warmup",
+    "warmer_from_config": "warmup",
+    "PromptPacker": "packing",
+    "PackingConfig": "packing",
+    "ModelCascade": "cascade",
+    "cascade_from_config": "cascade",
+    "confidence_check": "cascade",
+    "json_check": "cascade",
+    "metric_check": "cascade",
+    "regex_check": "cascade",
+    "GroqProvider": "groq",
+    "HuggingFaceProvider": "huggingface",
+    "PuterFreeProvider": "puter",
+    "OpenCodeZenProvider": "opencode_zen",
+    "OpenRouterProvider": "openrouter",
+    "GeminiProvider": "gemini",
+    "ProviderRegistry": "registry",
+    "get_registry": "registry",
+    "create_provider_chain": "registry",
+    "get_default_provider": "registry",
+    "get_provider_by_name": "registry",
+    "clear_provider_cache": "registry",
+    "reload_providers": "registry",
+}
+
+if TYPE_CHECKING:
+    from .http_provider import HTTPProvider, OpenAICompatibleProvider
+    from .cli_provider import CLIProvider
+    from .hedging import HedgeConfig, HedgeStats
+    from .cache import ResponseCache
+    from .semantic_cache import SemanticCache
+    from .cassette import Cassette, use_cassette
+    from .ratelimit import RateLimiter, TokenBucket
+    from .circuit import CircuitBreaker, CircuitBreakerConfig, CircuitState
+    from .routing import AdaptiveRouter, RoutingConfig
+    from .streaming import ProviderStream
+    from .workers import WarmProcessPool, WorkerPoolConfig
+    from .sessions import configure_pool_size, get_session
+    from .tokens import estimate_tokens
+    from .budget import RunBudget
+    from .metrics import ConcurrencyMetrics
+    from .context import ContextConfig
+    from .scheduler import PriorityScheduler, SchedulerConfig, get_scheduler
+    from .warmup import ModelWarmer, warmer_from_config
+    from .packing import PackingConfig, PromptPacker
+    from .cascade import (
+        ModelCascade,
+        cascade_from_config,
+        confidence_check,
+        json_check,
+        metric_check,
+        regex_check,
+    )
+    from .groq import GroqProvider
+    from .huggingface import HuggingFaceProvider
+    from .puter import PuterFreeProvider
+    from .opencode_zen import OpenCodeZenProvider
+    from .openrouter import OpenRouterProvider
+    from .gemini import GeminiProvider
+    from .registry import (
+        ProviderRegistry,
+        clear_provider_cache,
+        create_provider_chain,
+        get_default_provider,
+        get_provider_by_name,
+        get_registry,
+        reload_providers,
     )
 
 
-def get_provider_by_name(name: str) -> BaseProvider:
-    """
-    Get a specific provider by name.
-
-    Args:
-        name: Provider name (groq, huggingface, puter, opencode_zen, openrouter, google)
-
-    Returns:
-        Provider instance
-
-    Raises:
-        ValueError: If provider not found
-    """
-    providers = {
-        "groq": GroqProvider,
-        "huggingface": HuggingFaceProvider,
-        "puter": PuterFreeProvider,
-        "opencode_zen": OpenCodeZenProvider,
-        "openrouter": OpenRouterProvider,
-        "google": GeminiProvider,
-    }
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
-    if name not in providers:
-        available = ", ".join(providers.keys())
-        raise ValueError(f"Unknown provider: '{name}'. Available: {available}")
 
-    return providers[name]()
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 
 __all__ = [
@@ -99,13 +143,56 @@ __all__ = [
     "ProviderResponse",
     "RateLimitConfig",
     "ProviderChain",
+    "HedgeConfig",
+    "HedgeStats",
+    "ResponseCache",
+    "SemanticCache",
+    "Cassette",
+    "use_cassette",
+    "RateLimiter",
+    "TokenBucket",
+    "CircuitBreaker",
+    "CircuitBreakerConfig",
+    "CircuitState",
+    "AdaptiveRouter",
+    "RoutingConfig",
+    "ProviderStream",
+    "RunBudget",
+    "ConcurrencyMetrics",
+    "ContextConfig",
+    "GenerationParams",
+    "PriorityScheduler",
+    "SchedulerConfig",
+    "get_scheduler",
+    "estimate_tokens",
+    "WarmProcessPool",
+    "WorkerPoolConfig",
+    "ModelWarmer",
+    "warmer_from_config",
+    "PromptPacker",
+    "PackingConfig",
+    "ModelCascade",
+    "cascade_from_config",
+    "confidence_check",
+    "json_check",
+    "metric_check",
+    "regex_check",
+    "HTTPProvider",
+    "OpenAICompatibleProvider",
+    "CLIProvider",
     "GroqProvider",
     "HuggingFaceProvider",
     "PuterFreeProvider",
     "OpenCodeZenProvider",
     "OpenRouterProvider",
     "GeminiProvider",
+    "ProviderRegistry",
+    "get_registry",
     "create_provider_chain",
     "get_default_provider",
     "get_provider_by_name",
+    "clear_provider_cache",
+    "reload_providers",
+    "get_session",
+    "configure_pool_size",
 ]
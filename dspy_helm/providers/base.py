@@ -6,10 +6,41 @@ following the Strategy pattern for provider rotation.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Optional,
+    Dict,
+    Any,
+    List,
+    Tuple,
+    Callable,
+    Iterable,
+    Iterator,
+    TYPE_CHECKING,
+)
+import asyncio
+import json
+import threading
 import time
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
+
+from .hedging import HedgeConfig, HedgeStats, LatencyTracker
+from .ratelimit import RateLimiter
+from .circuit import CircuitBreaker, CircuitBreakerConfig, CircuitState
+from .routing import AdaptiveRouter, RoutingConfig
+from .tokens import fill_token_counts
+from .context import ContextConfig, PromptSize, prompt_fits
+from .metrics import ConcurrencyMetrics
+from .params import GenerationParams, flatten_params
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .semantic_cache import SemanticCache
+    from .cassette import Cassette
+    from .budget import RunBudget
+    from .streaming import ChunkSource, ProviderStream
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +55,8 @@ class ProviderResponse:
     model: str = ""
     error: Optional[str] = None
     tokens_used: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
     latency_seconds: float = 0.0
     rate_limited: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
@@ -37,10 +70,38 @@ class RateLimitConfig:
     max_retries: int = 3
     backoff_factor: float = 1.0
     max_backoff: float = 60.0
+    # Proactive pacing (None = only pace from provider rate-limit headers)
+    requests_per_minute: Optional[float] = None
+    burst: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "RateLimitConfig":
+        """Build from a ``rate_limit`` block of providers.yaml."""
+        known = {k: v for k, v in (data or {}).items() if k in cls.__dataclass_fields__}
+        return cls(**known)
 
 
 class BaseProvider(ABC):
-    """Abstract base class for CLI providers."""
+    """
+    Abstract base class for CLI providers.
+
+    One instance is shared by every thread and task that calls it (e.g.,
+    Evaluator's worker threads). Per-request state lives in locals of the
+    call; what the instance shares (cache, limiter, singleflight, metrics)
+    is thread-safe, and ``metrics`` counts requests in flight and time
+    queued in the rate limiter.
+    """
+
+    # Context window (prompt + completion tokens) per model; models not
+    # listed use DEFAULT_CONTEXT_WINDOW (None = unknown, never pre-checked)
+    CONTEXT_WINDOWS: Dict[str, int] = {}
+    DEFAULT_CONTEXT_WINDOW: Optional[int] = None
+
+    # Completion tokens reserved out of the window for the response
+    OUTPUT_RESERVE_TOKENS = 1000
+
+    # Generation parameters this provider cannot apply (dropped per call)
+    UNSUPPORTED_PARAMS: Tuple[str, ...] = ()
 
     def __init__(
         self,
@@ -49,6 +110,10 @@ class BaseProvider(ABC):
         subcommand: str,
         model: str,
         rate_limit: Optional[RateLimitConfig] = None,
+        cache: Optional["ResponseCache"] = None,
+        coalesce: bool = True,
+        semantic_cache: Optional["SemanticCache"] = None,
+        cassette: Optional["Cassette"] = None,
     ):
         """
         Initialize provider.
@@ -59,15 +124,27 @@ class BaseProvider(ABC):
             subcommand: CLI subcommand (e.g., "ask")
             model: Default model to use
             rate_limit: Rate limiting configuration
+            cache: Persistent response cache (None = no caching)
+            coalesce: Share one upstream call among concurrent identical calls
+            semantic_cache: Near-duplicate prompt cache consulted after an
+                exact-cache miss (None = disabled)
+            cassette: Record/replay store for calls (None = always send)
         """
         self.name = name
         self.command = command
         self.subcommand = subcommand
         self.model = model
         self.rate_limit = rate_limit or RateLimitConfig()
-
-        self._last_request_time = 0.0
-        self._retry_count = 0
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.cassette = cassette
+        self.coalesce = coalesce
+        self.singleflight = SingleFlight()
+        self.limiter = RateLimiter(
+            requests_per_minute=self.rate_limit.requests_per_minute,
+            burst=self.rate_limit.burst,
+        )
+        self.metrics = ConcurrencyMetrics()
 
     @abstractmethod
     def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
@@ -83,7 +160,414 @@ class BaseProvider(ABC):
         """
         ...
 
-    def call(self, prompt: str, **kwargs) -> ProviderResponse:
+    async def _aexecute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Execute the CLI command without blocking the event loop.
+
+        Providers with a native asyncio transport override this. The
+        default runs the blocking ``_execute_cli`` in a worker thread.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with result or error
+        """
+        return await asyncio.to_thread(self._execute_cli, prompt, **kwargs)
+
+    @property
+    def default_params(self) -> GenerationParams:
+        """Generation settings used where a call leaves a parameter unset."""
+        return GenerationParams()
+
+    def generation_params(self, kwargs: Dict[str, Any]) -> GenerationParams:
+        """
+        Resolve a call's generation parameters.
+
+        Args:
+            kwargs: Keyword arguments of the call (loose keys or ``params=``)
+
+        Returns:
+            The call's parameters over ``default_params``, without
+            UNSUPPORTED_PARAMS
+        """
+        params = GenerationParams.from_kwargs(kwargs).merged(self.default_params)
+        return params.without(self.UNSUPPORTED_PARAMS)
+
+    def _key_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parameters that identify a request in the cache and the cassette.
+
+        Generation parameters are resolved first, so an omitted value and
+        the provider default share entries; the timeout does not change
+        the answer and is left out. Other call arguments are kept.
+        """
+        names = {f.name for f in fields(GenerationParams)} | {"params"}
+        material = {k: v for k, v in kwargs.items() if k not in names}
+        material.update(self.generation_params(kwargs).without(("timeout",)).to_dict())
+        return material
+
+    @property
+    def context_window(self) -> Optional[int]:
+        """Context window of the current model in tokens (None = unknown)."""
+        return self.CONTEXT_WINDOWS.get(self.model, self.DEFAULT_CONTEXT_WINDOW)
+
+    @property
+    def prompt_token_limit(self) -> Optional[int]:
+        """Largest prompt the current model accepts (None = unknown)."""
+        window = self.context_window
+        if window is None:
+            return None
+        return max(0, window - self.OUTPUT_RESERVE_TOKENS)
+
+    def fits(self, prompt: str) -> bool:
+        """Whether a prompt fits the current model's context window."""
+        return prompt_fits(prompt, self.prompt_token_limit)
+
+    def _context_exceeded(self, prompt: str) -> Optional[ProviderResponse]:
+        """Failed response for a prompt that cannot fit, without sending it."""
+        if self.fits(prompt):
+            return None
+        return ProviderResponse(
+            success=False,
+            error=(
+                f"Prompt too large for {self.model}: ~{PromptSize(prompt).tokens} "
+                f"tokens > {self.prompt_token_limit} token limit"
+            ),
+            provider=self.name,
+            model=self.model,
+            metadata={"context_exceeded": True},
+        )
+
+    def _backoff_delay(
+        self, attempt: int, response: Optional[ProviderResponse] = None
+    ) -> float:
+        """
+        Delay before retry ``attempt + 1``.
+
+        Honours a Retry-After reported by the provider, otherwise
+        exponential backoff; both capped at ``max_backoff``.
+        """
+        retry_after = response.metadata.get("retry_after") if response else None
+        if retry_after is not None:
+            return min(float(retry_after), self.rate_limit.max_backoff)
+        return min(
+            self.rate_limit.backoff_factor * (2**attempt), self.rate_limit.max_backoff
+        )
+
+    def call(
+        self,
+        prompt: str,
+        cache_bypass: bool = False,
+        cache_refresh: bool = False,
+        **kwargs,
+    ) -> ProviderResponse:
+        """
+        Call the provider, serving repeated requests from the cache.
+
+        Args:
+            prompt: Prompt to send
+            cache_bypass: Neither read nor write the cache
+            cache_refresh: Skip the cache lookup but store the new response
+            **kwargs: Generation parameters (``params=GenerationParams(...)``
+                or loose ``max_tokens=...`` etc.) and additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        kwargs = flatten_params(kwargs)
+        too_large = self._context_exceeded(prompt)
+        if too_large is not None:
+            return too_large
+
+        key, cached, status = self._cache_lookup(
+            prompt, kwargs, cache_bypass, cache_refresh
+        )
+        if cached is not None:
+            return cached
+
+        def fetch() -> ProviderResponse:
+            response = self._fetch(prompt, **kwargs)
+            fill_token_counts(response, prompt)
+            return self._cache_store(key, response, status, prompt, kwargs)
+
+        if not self._coalescing(cache_bypass, cache_refresh):
+            return fetch()
+        response, shared = self.singleflight.do(self._flight_key(prompt, kwargs), fetch)
+        return self._coalesced(response) if shared else response
+
+    async def acall(
+        self,
+        prompt: str,
+        cache_bypass: bool = False,
+        cache_refresh: bool = False,
+        **kwargs,
+    ) -> ProviderResponse:
+        """
+        Async version of ``call``; backoff waits yield to the event loop.
+
+        Args:
+            prompt: Prompt to send
+            cache_bypass: Neither read nor write the cache
+            cache_refresh: Skip the cache lookup but store the new response
+            **kwargs: Generation parameters (``params=GenerationParams(...)``
+                or loose ``max_tokens=...`` etc.) and additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        kwargs = flatten_params(kwargs)
+        too_large = self._context_exceeded(prompt)
+        if too_large is not None:
+            return too_large
+
+        key, cached, status = self._cache_lookup(
+            prompt, kwargs, cache_bypass, cache_refresh
+        )
+        if cached is not None:
+            return cached
+
+        async def fetch() -> ProviderResponse:
+            response = await self._afetch(prompt, **kwargs)
+            fill_token_counts(response, prompt)
+            return self._cache_store(key, response, status, prompt, kwargs)
+
+        if not self._coalescing(cache_bypass, cache_refresh):
+            return await fetch()
+        response, shared = await self.singleflight.ado(
+            self._flight_key(prompt, kwargs), fetch
+        )
+        return self._coalesced(response) if shared else response
+
+    def _coalescing(self, cache_bypass: bool, cache_refresh: bool) -> bool:
+        """Callers asking for a fresh response are never coalesced."""
+        return self.coalesce and not (cache_bypass or cache_refresh)
+
+    def _flight_key(self, prompt: str, params: Dict[str, Any]) -> str:
+        params = self._key_params(params)
+        return json.dumps([self.model, prompt, params], sort_keys=True, default=str)
+
+    @staticmethod
+    def _coalesced(response: ProviderResponse) -> ProviderResponse:
+        """Copy of a shared response for a coalesced caller."""
+        copy = replace(response, metadata=dict(response.metadata))
+        copy.metadata["coalesced"] = True
+        return copy
+
+    def stream(
+        self,
+        prompt: str,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        cache_bypass: bool = False,
+        cache_refresh: bool = False,
+        **kwargs,
+    ) -> "ProviderStream":
+        """
+        Stream the response as it is generated.
+
+        Iterate the result for text chunks, or call ``collect()`` for a
+        ProviderResponse whose metadata carries ``ttft_seconds``. Cache
+        hits and cassette replays are replayed as a single chunk;
+        early-stopped responses are neither cached nor recorded. Streams
+        are never coalesced: each caller reads its own response.
+
+        Args:
+            prompt: Prompt to send
+            stop_when: Predicate on the text so far; True stops the stream
+            cache_bypass: Neither read nor write the cache
+            cache_refresh: Skip the cache lookup but store the new response
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderStream over the response text
+        """
+        from .streaming import ProviderStream, replay
+
+        kwargs = flatten_params(kwargs)
+        too_large = self._context_exceeded(prompt)
+        if too_large is not None:
+            return ProviderStream(replay(too_large), self.name, self.model)
+
+        key, cached, status = self._cache_lookup(
+            prompt, kwargs, cache_bypass, cache_refresh
+        )
+        if cached is not None:
+            return ProviderStream(replay(cached), self.name, self.model, stop_when)
+
+        def store(response: ProviderResponse) -> None:
+            fill_token_counts(response, prompt)
+            stopped_early = response.metadata.get("stopped_early")
+            if stopped_early:
+                self._cache_store(None, response, status)
+            else:
+                self._cache_store(key, response, status, prompt, kwargs)
+
+        # The stream may finish after the cassette is detached
+        cassette = self.cassette
+
+        def record(response: ProviderResponse) -> None:
+            if not response.metadata.get("stopped_early"):
+                cassette.record(
+                    self.name, self.model, prompt, response, self._key_params(kwargs)
+                )
+
+        replayed = None
+        if cassette is not None:
+            replayed = cassette.play(
+                self.name, self.model, prompt, self._key_params(kwargs)
+            )
+        if replayed is not None:
+            source = replay(replayed)
+        else:
+            source = self._stream_chunks(prompt, **kwargs)
+        stream = ProviderStream(source, self.name, self.model, stop_when)
+        if cassette is not None and replayed is None:
+            stream.add_done_callback(record)
+        stream.add_done_callback(store)
+        return stream
+
+    def _stream_chunks(self, prompt: str, **kwargs) -> "ChunkSource":
+        """
+        Yield response text as it arrives.
+
+        Providers with a streaming transport override this. The default
+        makes a normal call and yields the whole content as one chunk.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            Generator of text chunks whose return value is the final
+            response (its content is filled in from the chunks)
+        """
+        from .streaming import replay
+
+        response = self._call_with_retries(prompt, **kwargs)
+        return (yield from replay(response))
+
+    def _cache_lookup(
+        self,
+        prompt: str,
+        params: Dict[str, Any],
+        bypass: bool,
+        refresh: bool,
+    ) -> Tuple[Optional[str], Optional[ProviderResponse], str]:
+        """
+        Resolve the cache key and look up a stored response.
+
+        Keys use the resolved parameters (see ``_key_params``). The exact
+        cache is consulted first, then the semantic cache.
+
+        Returns:
+            (key, cached response or None, cache status)
+        """
+        if self.cache is None and self.semantic_cache is None:
+            return None, None, "disabled"
+        if bypass:
+            return None, None, "bypass"
+
+        params = self._key_params(params)
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self.name, self.model, prompt, params)
+        if refresh:
+            return key, None, "refresh"
+
+        start_time = time.time()
+        status = "hit"
+        cached = self.cache.get(key) if key is not None else None
+        if cached is None and self.semantic_cache is not None:
+            status = "semantic_hit"
+            cached = self.semantic_cache.get(self.name, self.model, prompt, params)
+        if cached is None:
+            return key, None, "miss"
+
+        cached.metadata["cached_latency_seconds"] = cached.latency_seconds
+        cached.latency_seconds = time.time() - start_time
+        self._annotate_cache(cached, status)
+        return key, cached, status
+
+    def _cache_store(
+        self,
+        key: Optional[str],
+        response: ProviderResponse,
+        status: str,
+        prompt: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> ProviderResponse:
+        """
+        Store a fresh successful response and annotate its cache status.
+
+        Args:
+            key: Exact-cache key (None = don't store)
+            response: Fresh response
+            status: Cache status from ``_cache_lookup``
+            prompt: Prompt to index in the semantic cache (None = don't index)
+            params: Generation parameters of the request
+        """
+        if key is not None and response.success:
+            self.cache.set(key, response)
+        if (
+            prompt is not None
+            and self.semantic_cache is not None
+            and status in ("miss", "refresh")
+        ):
+            self.semantic_cache.set(
+                self.name, self.model, prompt, response, self._key_params(params or {})
+            )
+        if self.cache is not None or self.semantic_cache is not None:
+            self._annotate_cache(response, status)
+        return response
+
+    def _annotate_cache(self, response: ProviderResponse, status: str) -> None:
+        response.metadata["cache"] = status
+        if self.cache is not None:
+            response.metadata["cache_hits"] = self.cache.hits
+            response.metadata["cache_misses"] = self.cache.misses
+
+    def _fetch(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Send a request with retries, or replay/record it on the cassette."""
+        if self.cassette is None:
+            return self._call_with_retries(prompt, **kwargs)
+        params = self._key_params(kwargs)
+        replayed = self.cassette.play(self.name, self.model, prompt, params)
+        if replayed is not None:
+            return replayed
+        response = self._call_with_retries(prompt, **kwargs)
+        self.cassette.record(self.name, self.model, prompt, response, params)
+        return response
+
+    async def _afetch(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``_fetch``."""
+        if self.cassette is None:
+            return await self._acall_with_retries(prompt, **kwargs)
+        params = self._key_params(kwargs)
+        replayed = self.cassette.play(self.name, self.model, prompt, params)
+        if replayed is not None:
+            return replayed
+        response = await self._acall_with_retries(prompt, **kwargs)
+        self.cassette.record(self.name, self.model, prompt, response, params)
+        return response
+
+    def _execute_tracked(self, prompt: str, **kwargs) -> ProviderResponse:
+        """``_execute_cli``, counted as in flight while it runs."""
+        started = self.metrics.start()
+        try:
+            return self._execute_cli(prompt, **kwargs)
+        finally:
+            self.metrics.finish(started)
+
+    async def _aexecute_tracked(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``_execute_tracked``."""
+        started = self.metrics.start()
+        try:
+            return await self._aexecute_cli(prompt, **kwargs)
+        finally:
+            self.metrics.finish(started)
+
+    def _call_with_retries(self, prompt: str, **kwargs) -> ProviderResponse:
         """
         Call the provider with retry logic for rate limits.
 
@@ -95,31 +579,32 @@ class BaseProvider(ABC):
             ProviderResponse with result
         """
         if not self.rate_limit.enabled:
-            return self._execute_cli(prompt, **kwargs)
+            return self._execute_tracked(prompt, **kwargs)
 
         max_retries = self.rate_limit.max_retries
-        backoff = self.rate_limit.backoff_factor
+        waited = 0.0
 
         for attempt in range(max_retries + 1):
-            response = self._execute_cli(prompt, **kwargs)
+            self.metrics.queued(self.limiter.acquire())
+            response = self._execute_tracked(prompt, **kwargs)
 
             if response.success:
-                self._retry_count = 0
-                return response
+                return self._note_retries(response, attempt, waited)
 
             if not response.rate_limited:
-                return response
+                return self._note_retries(response, attempt, waited)
 
             if attempt < max_retries:
-                wait_time = min(backoff * (2**attempt), self.rate_limit.max_backoff)
+                wait_time = self._backoff_delay(attempt, response)
                 logger.warning(
                     f"Rate limited by {self.name}, retrying in {wait_time}s "
                     f"(attempt {attempt + 1}/{max_retries})"
                 )
                 time.sleep(wait_time)
+                waited += wait_time
             else:
                 logger.error(f"Max retries exceeded for {self.name}")
-                return response
+                return self._note_retries(response, attempt, waited)
 
         return ProviderResponse(
             success=False,
@@ -128,27 +613,287 @@ class BaseProvider(ABC):
             model=self.model,
         )
 
+    async def _acall_with_retries(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``_call_with_retries``."""
+        if not self.rate_limit.enabled:
+            return await self._aexecute_tracked(prompt, **kwargs)
+
+        max_retries = self.rate_limit.max_retries
+        waited = 0.0
+
+        for attempt in range(max_retries + 1):
+            self.metrics.queued(await self.limiter.aacquire())
+            response = await self._aexecute_tracked(prompt, **kwargs)
+
+            if response.success:
+                return self._note_retries(response, attempt, waited)
+
+            if not response.rate_limited:
+                return self._note_retries(response, attempt, waited)
+
+            if attempt < max_retries:
+                wait_time = self._backoff_delay(attempt, response)
+                logger.warning(
+                    f"Rate limited by {self.name}, retrying in {wait_time}s "
+                    f"(attempt {attempt + 1}/{max_retries})"
+                )
+                await asyncio.sleep(wait_time)
+                waited += wait_time
+            else:
+                logger.error(f"Max retries exceeded for {self.name}")
+                return self._note_retries(response, attempt, waited)
+
+        return ProviderResponse(
+            success=False,
+            error="Max retries exceeded",
+            provider=self.name,
+            model=self.model,
+        )
+
+    @staticmethod
+    def _note_retries(
+        response: ProviderResponse, attempt: int, waited: float
+    ) -> ProviderResponse:
+        """Record rate-limit retries and the time spent backing off."""
+        if attempt:
+            response.metadata["retries"] = attempt
+            response.metadata["retry_wait_seconds"] = round(waited, 3)
+        return response
+
+    def is_configured(self) -> bool:
+        """Check if the provider has the credentials it needs."""
+        return True
+
+    def warm_up(self) -> bool:
+        """
+        Prepare the provider so the next request does not pay a cold start.
+
+        Returns:
+            True if the provider is ready (nothing to prepare by default)
+        """
+        return True
+
     def __repr__(self) -> str:
         return f"{self.name}(model={self.model})"
 
 
+def served_locally(response: ProviderResponse) -> bool:
+    """
+    Whether a response was answered without asking the provider.
+
+    Cache hits, cassette replays (and replay misses) and calls coalesced
+    onto another caller's request say nothing about the provider's
+    latency or health.
+    """
+    metadata = response.metadata
+    return (
+        metadata.get("cache") in ("hit", "semantic_hit")
+        or metadata.get("cassette") in ("replay", "miss")
+        or bool(metadata.get("coalesced"))
+    )
+
+
 class ProviderChain:
     """
     Chain of providers with failover support.
 
     Manages rotation through providers when rate limits
-    are encountered.
+    are encountered. With a HedgeConfig, a provider that is slower than
+    its recent latency percentile is raced against the next provider.
+    With a CircuitBreakerConfig, providers that keep failing are skipped
+    until a probe shows they have recovered. With a RoutingConfig, the
+    order is re-ranked per request from each provider's recent latency,
+    success rate and rate-limit frequency. With a RunBudget, calls are
+    refused once the run's token, request or time limit is reached.
+    Providers whose context window cannot hold the prompt are skipped;
+    with a ContextConfig, a prompt too large for all of them is shrunk
+    to fit the largest window instead of being rejected.
     """
 
-    def __init__(self, providers: List[BaseProvider]):
+    def __init__(
+        self,
+        providers: List[BaseProvider],
+        hedge: Optional[HedgeConfig] = None,
+        circuit_breaker: Optional[CircuitBreakerConfig] = None,
+        routing: Optional[RoutingConfig] = None,
+        budget: Optional["RunBudget"] = None,
+        context: Optional[ContextConfig] = None,
+    ):
         """
         Initialize provider chain.
 
         Args:
             providers: List of providers in priority order
+            hedge: Hedged request configuration (None = sequential failover)
+            circuit_breaker: Per-provider breaker configuration (None = disabled)
+            routing: Adaptive ordering configuration (None = fixed order)
+            budget: Run-level token/request/time budget (None = unlimited)
+            context: Fitting for prompts too large for every provider
+                (None = reject them without sending)
         """
         self.providers = providers
-        self._current_index = 0
+        self.hedge = hedge
+        self.latency = LatencyTracker(window_size=hedge.window_size if hedge else 100)
+        self.hedge_stats = HedgeStats()
+        self._stats_lock = threading.Lock()
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.circuit_breaker = circuit_breaker
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.router = AdaptiveRouter(routing) if routing else None
+        self.budget = budget
+        self.context = context
+
+    @property
+    def hedging(self) -> bool:
+        """Whether hedged requests are enabled."""
+        return bool(self.hedge and self.hedge.enabled and len(self.providers) > 1)
+
+    def _record(self, provider: BaseProvider, response: ProviderResponse, start: float):
+        if self.budget is not None:
+            self.budget.charge(response)
+        if served_locally(response):
+            # Near-zero latencies would skew routing and hedge delays
+            return
+
+        elapsed = time.time() - start
+        # A model still loading is retried like a 429 but is not out of
+        # quota; it counts as an ordinary failure
+        rate_limited = response.rate_limited and not response.metadata.get(
+            "model_loading"
+        )
+        if response.success:
+            self.latency.record(provider.name, elapsed)
+        if self.router is not None:
+            self.router.record(provider.name, elapsed, response.success, rate_limited)
+
+        breaker = self._breaker(provider)
+        if breaker is not None:
+            if response.success:
+                breaker.record_success()
+            else:
+                breaker.record_failure(response.error, rate_limited)
+
+    def _breaker(self, provider: BaseProvider) -> Optional[CircuitBreaker]:
+        """The provider's circuit breaker, or None if breakers are disabled."""
+        if self.circuit_breaker is None:
+            return None
+        breaker = self.breakers.get(provider.name)
+        if breaker is None:
+            with self._stats_lock:
+                breaker = self.breakers.setdefault(
+                    provider.name, CircuitBreaker(self.circuit_breaker)
+                )
+        return breaker
+
+    def _available(self, provider: BaseProvider) -> bool:
+        """
+        Whether the chain should send a request to ``provider`` now.
+
+        O(1) for a known-bad provider: its open breaker is checked before
+        anything else. Unconfigured providers trip their breaker.
+        """
+        breaker = self._breaker(provider)
+        if breaker is None:
+            return True
+
+        if self.circuit_breaker.background_probe:
+            if breaker.probe_due():
+                self._start_probe(provider, breaker)
+            if breaker.state is not CircuitState.CLOSED:
+                return False
+        elif not breaker.allow_request():
+            return False
+
+        if not provider.is_configured():
+            breaker.trip(f"{provider.name} is not configured")
+            return False
+        return True
+
+    def _start_probe(self, provider: BaseProvider, breaker: CircuitBreaker) -> None:
+        """Check a half-open provider on a background thread."""
+
+        def probe() -> None:
+            if not provider.is_configured():
+                breaker.trip(f"{provider.name} is not configured")
+                return
+            start = time.time()
+            response = provider.call(
+                self.circuit_breaker.probe_prompt, cache_bypass=True
+            )
+            self._record(provider, response, start)
+            logger.info(
+                f"Probe of {provider.name} "
+                f"{'succeeded' if response.success else 'failed'}: "
+                f"circuit {breaker.state.value}"
+            )
+
+        threading.Thread(
+            target=probe, name=f"probe-{provider.name}", daemon=True
+        ).start()
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-provider breaker state and health score.
+
+        Returns:
+            Mapping of provider name to a JSON-serializable snapshot
+        """
+        report = {}
+        for provider in self.providers:
+            breaker = self._breaker(provider)
+            report[provider.name] = (
+                breaker.snapshot()
+                if breaker is not None
+                else {"state": CircuitState.CLOSED.value, "health": 1.0}
+            )
+        return report
+
+    def concurrency(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-provider in-flight requests and queue wait.
+
+        Compare ``mean_concurrency`` with the caller's thread count:
+        threads beyond it mostly wait on rate limits.
+
+        Returns:
+            Mapping of provider name to ``ConcurrencyMetrics.stats()``
+        """
+        return {provider.name: provider.metrics.stats() for provider in self.providers}
+
+    def routing_state(self) -> Dict[str, Any]:
+        """
+        Routing state for debugging routing decisions.
+
+        Returns:
+            JSON-serializable router export, or the fixed order when
+            adaptive routing is disabled
+        """
+        if self.router is None:
+            return {"mode": "fixed", "order": [p.name for p in self.providers]}
+        return self.router.export()
+
+    def _ordered(self) -> List[BaseProvider]:
+        """Providers in the order this request should try them."""
+        if self.router is None:
+            return self.providers
+        return self.router.order(self.providers)
+
+    def _call_provider(self, provider: BaseProvider, prompt: str, **kwargs):
+        start = time.time()
+        response = provider.call(prompt, **kwargs)
+        self._record(provider, response, start)
+        return response
+
+    async def _acall_provider(self, provider: BaseProvider, prompt: str, **kwargs):
+        start = time.time()
+        response = await provider.acall(prompt, **kwargs)
+        self._record(provider, response, start)
+        return response
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                setattr(self.hedge_stats, key, getattr(self.hedge_stats, key) + delta)
 
     def call(self, prompt: str, **kwargs) -> ProviderResponse:
         """
@@ -161,23 +906,518 @@ class ProviderChain:
         Returns:
             ProviderResponse from first successful provider
         """
+        prompt, size, rejected = self._preflight(prompt)
+        if rejected is not None:
+            return rejected
+        return self._note_fit(self._call(prompt, size, **kwargs), size)
+
+    def _call(self, prompt: str, size: PromptSize, **kwargs) -> ProviderResponse:
+        if self.hedging:
+            rejected = self._over_budget()
+            if rejected is not None:
+                return rejected
+            return self._call_hedged(prompt, size, **kwargs)
+
         last_error = None
+        failed = 0
+
+        for provider in self._ordered():
+            rejected = self._over_budget()
+            if rejected is not None:
+                return rejected
+            if not size.fits(provider.prompt_token_limit):
+                continue
+            if not self._available(provider):
+                continue
+
+            response = self._call_provider(provider, prompt, **kwargs)
+
+            if response.success:
+                if failed:
+                    response.metadata["failovers"] = failed
+                return response
+
+            failed += 1
+            last_error = response.error
+            logger.info(
+                f"Provider {provider.name} failed: {response.error}. "
+                f"Trying next provider..."
+            )
+
+        return self._all_failed(last_error)
+
+    async def acall(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Async version of ``call`` with the same failover order.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse from first successful provider
+        """
+        prompt, size, rejected = self._preflight(prompt)
+        if rejected is not None:
+            return rejected
+        return self._note_fit(await self._acall(prompt, size, **kwargs), size)
+
+    async def _acall(self, prompt: str, size: PromptSize, **kwargs) -> ProviderResponse:
+        if self.hedging:
+            rejected = self._over_budget()
+            if rejected is not None:
+                return rejected
+            return await self._acall_hedged(prompt, size, **kwargs)
+
+        last_error = None
+        failed = 0
+
+        for provider in self._ordered():
+            rejected = self._over_budget()
+            if rejected is not None:
+                return rejected
+            if not size.fits(provider.prompt_token_limit):
+                continue
+            if not self._available(provider):
+                continue
+
+            response = await self._acall_provider(provider, prompt, **kwargs)
+
+            if response.success:
+                if failed:
+                    response.metadata["failovers"] = failed
+                return response
+
+            failed += 1
+            last_error = response.error
+            logger.info(
+                f"Provider {provider.name} failed: {response.error}. "
+                f"Trying next provider..."
+            )
+
+        return self._all_failed(last_error)
+
+    def call_many(
+        self,
+        prompts: Iterable[str],
+        max_concurrency: int = 8,
+        per_provider_limits: Optional[Dict[str, int]] = None,
+        ordered: bool = False,
+        **kwargs,
+    ) -> Iterator[Tuple[int, ProviderResponse]]:
+        """
+        Call the chain for many prompts with bounded concurrency.
+
+        Each prompt fails over like ``call``, but a provider whose
+        concurrency slots are all busy is passed over for the next one
+        with a free slot, so a batch fans out across providers instead
+        of queueing on the first. Hedging is not applied to batches.
+
+        Args:
+            prompts: Prompts to send (may be a lazy iterable)
+            max_concurrency: Maximum prompts in flight
+            per_provider_limits: Concurrent requests per provider name
+                (default: each provider's rate_limit.burst, else unbounded)
+            ordered: Yield results in input order instead of completion order
+            **kwargs: Additional arguments
+
+        Yields:
+            (prompt index, ProviderResponse) pairs
+        """
+        from .sessions import ensure_pool_size
+
+        ensure_pool_size(max_concurrency)
+        slots = self._provider_slots(per_provider_limits)
+        indexed = enumerate(prompts)
+        pending: Dict[Future, int] = {}
+        finished: Dict[int, ProviderResponse] = {}
+        next_index = 0
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="provider-batch"
+        )
+
+        def submit_next() -> None:
+            item = next(indexed, None)
+            if item is not None:
+                index, prompt = item
+                future = executor.submit(self._call_limited, prompt, slots, **kwargs)
+                pending[future] = index
+
+        try:
+            for _ in range(max_concurrency):
+                submit_next()
 
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    submit_next()
+                    if ordered:
+                        finished[index] = future.result()
+                    else:
+                        yield index, future.result()
+
+                while next_index in finished:
+                    yield next_index, finished.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _provider_slots(
+        self, limits: Optional[Dict[str, int]]
+    ) -> Dict[str, threading.BoundedSemaphore]:
+        """Concurrency slots per provider for a batch."""
+        slots = {}
         for provider in self.providers:
-            response = provider.call(prompt, **kwargs)
+            limit = (limits or {}).get(provider.name, provider.rate_limit.burst)
+            if limit:
+                slots[provider.name] = threading.BoundedSemaphore(int(limit))
+        return slots
+
+    def _call_limited(
+        self,
+        prompt: str,
+        slots: Dict[str, threading.BoundedSemaphore],
+        **kwargs,
+    ) -> ProviderResponse:
+        """
+        Failover for one batch prompt, preferring providers with a free slot.
+
+        Blocks on the highest-priority provider only when every remaining
+        provider is at its limit.
+        """
+        prompt, size, rejected = self._preflight(prompt)
+        if rejected is not None:
+            return rejected
+        return self._note_fit(self._call_slotted(prompt, size, slots, **kwargs), size)
+
+    def _call_slotted(
+        self,
+        prompt: str,
+        size: PromptSize,
+        slots: Dict[str, threading.BoundedSemaphore],
+        **kwargs,
+    ) -> ProviderResponse:
+        tried = set()
+        last_error = None
+
+        while True:
+            rejected = self._over_budget()
+            if rejected is not None:
+                return rejected
+
+            candidates = [
+                p
+                for p in self._ordered()
+                if p.name not in tried
+                and size.fits(p.prompt_token_limit)
+                and self._available(p)
+            ]
+            if not candidates:
+                return self._all_failed(last_error)
+
+            provider = next(
+                (
+                    p
+                    for p in candidates
+                    if p.name not in slots or slots[p.name].acquire(blocking=False)
+                ),
+                None,
+            )
+            if provider is None:
+                provider = candidates[0]
+                slots[provider.name].acquire()
+
+            try:
+                response = self._call_provider(provider, prompt, **kwargs)
+            finally:
+                if provider.name in slots:
+                    slots[provider.name].release()
 
             if response.success:
                 return response
 
+            tried.add(provider.name)
             last_error = response.error
             logger.info(
                 f"Provider {provider.name} failed: {response.error}. "
                 f"Trying next provider..."
             )
 
+    def stream(
+        self,
+        prompt: str,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        **kwargs,
+    ) -> "ProviderStream":
+        """
+        Stream from the first provider that starts producing text.
+
+        Failover happens before the first chunk; once text has been
+        yielded the stream stays on that provider.
+
+        Args:
+            prompt: Prompt to send
+            stop_when: Predicate on the text so far; True stops the stream
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderStream over the response text
+        """
+        from .streaming import ProviderStream, replay
+
+        prompt, size, rejected = self._preflight(prompt)
+        if rejected is not None:
+            return ProviderStream(replay(rejected), "none", "none")
+
+        last_error = None
+
+        for provider in self._ordered():
+            rejected = self._over_budget()
+            if rejected is not None:
+                return ProviderStream(replay(rejected), "none", "none")
+            if not size.fits(provider.prompt_token_limit):
+                continue
+            if not self._available(provider):
+                continue
+
+            start = time.time()
+            stream = provider.stream(prompt, stop_when=stop_when, **kwargs)
+            if stream.start():
+                stream.add_done_callback(
+                    lambda response: self._record(provider, response, start)
+                )
+                stream.add_done_callback(
+                    lambda response: self._note_fit(response, size)
+                )
+                return stream
+
+            self._record(provider, stream.response, start)
+            last_error = stream.response.error
+            logger.info(
+                f"Provider {provider.name} failed: {last_error}. "
+                f"Trying next provider..."
+            )
+
+        return ProviderStream(replay(self._all_failed(last_error)), "none", "none")
+
+    def _hedge_candidates(self, size: PromptSize) -> List[BaseProvider]:
+        """Providers eligible to serve (or hedge) a request, in order."""
+        return [
+            p
+            for p in self._ordered()
+            if p.is_configured()
+            and size.fits(p.prompt_token_limit)
+            and (self.circuit_breaker is None or self._available(p))
+        ]
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._stats_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    thread_name_prefix="provider-hedge"
+                )
+            return self._hedge_executor
+
+    def _call_hedged(self, prompt: str, size: PromptSize, **kwargs) -> ProviderResponse:
+        """
+        Race providers: start the next one when the current one is slow.
+
+        Threads cannot be interrupted, so a losing request that has already
+        started runs to completion in the background and its result is
+        discarded; queued losers are cancelled.
+        """
+        candidates = self._hedge_candidates(size)
+        if not candidates:
+            return self._all_failed("No configured providers")
+
+        executor = self._get_hedge_executor()
+        self._count(calls=1)
+        pending: Dict[Future, tuple] = {}
+        next_index = 0
+        hedges = 0
+        last_error = None
+
+        def launch(is_hedge: bool) -> None:
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            future = executor.submit(self._call_provider, provider, prompt, **kwargs)
+            pending[future] = (provider, is_hedge, time.time())
+
+        launch(is_hedge=False)
+
+        while pending:
+            timeout = None
+            if next_index < len(candidates) and hedges < self.hedge.max_hedges:
+                provider, _, started = list(pending.values())[-1]
+                delay = self.latency.hedge_delay(provider.name, self.hedge)
+                timeout = max(0.0, started + delay - time.time())
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                hedges += 1
+                self._count(hedges_started=1)
+                logger.info(
+                    f"Provider {provider.name} slower than "
+                    f"p{self.hedge.percentile * 100:g}; hedging on "
+                    f"{candidates[next_index].name}"
+                )
+                launch(is_hedge=True)
+                continue
+
+            for future in done:
+                provider, is_hedge, _ = pending.pop(future)
+                response = future.result()
+                if response.success:
+                    self._finish_hedged(is_hedge, pending)
+                    for loser in pending:
+                        loser.cancel()
+                    return response
+                last_error = response.error
+                logger.info(f"Provider {provider.name} failed: {response.error}.")
+
+            if not pending and next_index < len(candidates):
+                launch(is_hedge=False)
+
+        return self._all_failed(last_error)
+
+    async def _acall_hedged(
+        self, prompt: str, size: PromptSize, **kwargs
+    ) -> ProviderResponse:
+        """Async hedged call; losing requests are cancelled outright."""
+        candidates = self._hedge_candidates(size)
+        if not candidates:
+            return self._all_failed("No configured providers")
+
+        self._count(calls=1)
+        pending: Dict[asyncio.Task, tuple] = {}
+        next_index = 0
+        hedges = 0
+        last_error = None
+
+        def launch(is_hedge: bool) -> None:
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            task = asyncio.ensure_future(
+                self._acall_provider(provider, prompt, **kwargs)
+            )
+            pending[task] = (provider, is_hedge, time.time())
+
+        launch(is_hedge=False)
+
+        try:
+            while pending:
+                timeout = None
+                if next_index < len(candidates) and hedges < self.hedge.max_hedges:
+                    provider, _, started = list(pending.values())[-1]
+                    delay = self.latency.hedge_delay(provider.name, self.hedge)
+                    timeout = max(0.0, started + delay - time.time())
+
+                done, _ = await asyncio.wait(
+                    list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedges += 1
+                    self._count(hedges_started=1)
+                    launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    provider, is_hedge, _ = pending.pop(task)
+                    response = task.result()
+                    if response.success:
+                        self._finish_hedged(is_hedge, pending)
+                        return response
+                    last_error = response.error
+                    logger.info(f"Provider {provider.name} failed: {response.error}.")
+
+                if not pending and next_index < len(candidates):
+                    launch(is_hedge=False)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return self._all_failed(last_error)
+
+    def _finish_hedged(self, winner_is_hedge: bool, losers: Dict[Any, tuple]) -> None:
+        """Update hedge counters once a winner is known."""
+        wasted = sum(1 for _, is_hedge, _ in losers.values() if is_hedge)
+        self._count(hedges_won=int(winner_is_hedge), hedges_wasted=wasted)
+
+    def _over_budget(self) -> Optional[ProviderResponse]:
+        """Failed response if the run budget is exhausted, else None."""
+        if self.budget is None:
+            return None
+        reason = self.budget.exhausted_reason()
+        if reason is None:
+            return None
+        self.budget.reject()
+        return ProviderResponse(
+            success=False,
+            error=f"Run budget exhausted: {reason}",
+            provider="none",
+            model="none",
+            metadata={"budget_exhausted": True},
+        )
+
+    def _preflight(
+        self, prompt: str
+    ) -> Tuple[str, PromptSize, Optional[ProviderResponse]]:
+        """
+        Check a prompt against the providers' context windows.
+
+        Returns:
+            (prompt to send, its size, failed response if no provider can
+            accept it and no fitting strategy is configured)
+        """
+        size = PromptSize(prompt)
+        limits = [p.prompt_token_limit for p in self.providers]
+        if not limits or any(size.fits(limit) for limit in limits):
+            return prompt, size, None
+
+        largest = max(limits)
+        if self.context is not None and self.context.strategy is not None:
+            fitted = self.context.fit(prompt, largest)
+            logger.info(
+                f"Prompt of ~{size.tokens} tokens exceeds every provider; "
+                f"fitted to {largest} tokens with {self.context.strategy}"
+            )
+            return fitted, PromptSize(fitted, self.context.strategy), None
+
+        return (
+            prompt,
+            size,
+            ProviderResponse(
+                success=False,
+                error=(
+                    f"Prompt too large for every provider: ~{size.tokens} tokens "
+                    f"> largest limit of {largest}"
+                ),
+                provider="none",
+                model="none",
+                metadata={"context_exceeded": True},
+            ),
+        )
+
+    @staticmethod
+    def _note_fit(response: ProviderResponse, size: PromptSize) -> ProviderResponse:
+        """Mark responses to prompts that were shrunk to fit."""
+        if size.fitted_by is not None:
+            response.metadata["prompt_fitted"] = size.fitted_by
+        return response
+
+    @staticmethod
+    def _all_failed(last_error: Optional[str]) -> ProviderResponse:
         return ProviderResponse(
             success=False,
-            error=f"All providers failed: {last_error}",
+            error=f"All providers failed: {last_error or 'no provider available'}",
             provider="none",
             model="none",
         )
@@ -0,0 +1,372 @@
+"""
+Provider benchmark.
+
+Runs a fixed prompt corpus against a set of providers (and, with
+``--chain``, a ProviderChain over them in the given order) at each level
+of a concurrency sweep, then writes JSON and Markdown reports with
+latency percentiles and histograms, tokens/sec, retry overhead and
+failover counts. The suggested order at the end is the data-driven
+candidate for ``create_provider_chain``.
+
+With ``--cassette`` the providers record to, or replay from, a cassette.
+A replayed run needs no network or API keys; its latencies are the
+recorded ones, while throughput reflects only the client overhead.
+
+Usage:
+    python -m dspy_helm.providers.bench --providers groq,openrouter,google \\
+        --concurrency 1,4,8 --chain
+    python -m dspy_helm.providers.bench --standin --providers groq,openrouter
+    python -m dspy_helm.providers.bench --providers groq \\
+        --cassette cassettes/bench.jsonl --cassette-mode record
+"""
+
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import argparse
+import json
+import logging
+
+from .base import BaseProvider, ProviderChain, RateLimitConfig
+from .cassette import CASSETTE_MODES, Cassette, use_cassette
+from .loadtest import LOADTEST_PROVIDERS, build_provider, run_load_test
+from .standin import StandInConfig, StandInServer
+
+logger = logging.getLogger(__name__)
+
+# Fixed corpus: short answers, classification, extraction, reasoning, code
+# and a longer context, so runs are comparable across providers and days
+BENCH_CORPUS = [
+    "What is the capital of Australia? Answer in one word.",
+    "Classify the sentiment of this review as positive, negative or neutral: "
+    "'The battery lasts all day but the screen scratches easily.'",
+    "Extract every date from: 'The contract was signed on 3 March 2021, "
+    "amended on 14 July 2022 and terminates on 31 December 2025.'",
+    "A train leaves at 09:40 and arrives at 13:15. How long is the journey? "
+    "Think step by step, then give the answer.",
+    "Write a Python function that returns the n-th Fibonacci number iteratively.",
+    "Translate to French: 'The meeting has been moved to next Thursday.'",
+    "Summarize in two sentences: "
+    + (
+        "Large language model APIs on free tiers enforce per-minute request "
+        "limits, per-day token limits and occasional capacity-based throttling. "
+        "Clients that retry immediately amplify load, while clients that honour "
+        "Retry-After headers and spread requests across providers keep both "
+        "latency and error rates low. "
+    )
+    * 4,
+    "List three differences between TCP and UDP as short bullet points.",
+]
+
+# Upper bounds (seconds) of the latency histogram buckets
+HISTOGRAM_BOUNDS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+def latency_histogram(
+    latencies: Sequence[float], bounds: Sequence[float] = HISTOGRAM_BOUNDS
+) -> List[Dict[str, Any]]:
+    """
+    Bucket latencies (non-cumulative).
+
+    Args:
+        latencies: Samples in seconds
+        bounds: Ascending bucket upper bounds
+
+    Returns:
+        One ``{"le": bound, "count": n}`` per bucket, plus ``"+Inf"``
+    """
+    counts = [0] * (len(bounds) + 1)
+    for latency in latencies:
+        for i, bound in enumerate(bounds):
+            if latency <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels: List[Any] = list(bounds) + ["+Inf"]
+    return [{"le": le, "count": n} for le, n in zip(labels, counts)]
+
+
+def run_benchmark(
+    targets: Dict[str, Union[BaseProvider, ProviderChain]],
+    concurrency_levels: Sequence[int],
+    corpus: Sequence[str] = BENCH_CORPUS,
+    repeats: int = 1,
+    cassette: Optional[Cassette] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmark each target at each concurrency level.
+
+    Args:
+        targets: Label -> provider or chain
+        concurrency_levels: Concurrent in-flight requests to sweep
+        corpus: Prompts sent per run
+        repeats: Times the corpus is sent per run
+        cassette: Cassette the targets' providers record to / replay from
+            for the duration of the benchmark (None = always send)
+
+    Returns:
+        JSON-serializable report
+    """
+    prompts = list(corpus) * max(1, repeats)
+    runs = []
+    attached = (
+        use_cassette(cassette, _target_providers(targets))
+        if cassette is not None
+        else nullcontext()
+    )
+    with attached:
+        for concurrency in concurrency_levels:
+            for label, target in targets.items():
+                logger.info(f"Benchmarking {label} at concurrency {concurrency}")
+                report = run_load_test(target, prompts, concurrency)
+                summary = report.summary()
+                summary["provider"] = label
+                summary["concurrency"] = concurrency
+                summary["histogram"] = latency_histogram(report.latencies)
+                runs.append(summary)
+
+    result = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "corpus_size": len(corpus),
+        "repeats": max(1, repeats),
+        "concurrency_levels": list(concurrency_levels),
+        "runs": runs,
+        "suggested_order": suggest_order(runs),
+    }
+    if cassette is not None:
+        result["cassette"] = cassette.stats()
+    return result
+
+
+def _target_providers(
+    targets: Dict[str, Union[BaseProvider, ProviderChain]],
+) -> List[BaseProvider]:
+    """Distinct providers behind the targets (chains included)."""
+    providers: List[BaseProvider] = []
+    for target in targets.values():
+        members = target.providers if isinstance(target, ProviderChain) else [target]
+        providers += [p for p in members if all(p is not q for q in providers)]
+    return providers
+
+
+def suggest_order(runs: List[Dict[str, Any]]) -> List[str]:
+    """
+    Rank single providers for ``create_provider_chain``.
+
+    Uses each provider's run at the highest concurrency measured: higher
+    success rate first, then lower p95 latency.
+
+    Args:
+        runs: Run summaries from ``run_benchmark``
+
+    Returns:
+        Provider labels, best first (chains excluded)
+    """
+    best: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        if run["provider"].startswith("chain:"):
+            continue
+        current = best.get(run["provider"])
+        if current is None or run["concurrency"] > current["concurrency"]:
+            best[run["provider"]] = run
+
+    def rank(run: Dict[str, Any]) -> Tuple[float, float]:
+        success_rate = run["successes"] / (run["requests"] or 1)
+        return (-success_rate, run["p95"])
+
+    return [run["provider"] for run in sorted(best.values(), key=rank)]
+
+
+def format_markdown(report: Dict[str, Any]) -> str:
+    """Render a benchmark report as Markdown."""
+    lines = [
+        "# Provider benchmark",
+        "",
+        f"Generated {report['generated_at']}; corpus of {report['corpus_size']} "
+        f"prompts x {report['repeats']}.",
+        "",
+        "| provider | conc | reqs | ok % | p50 s | p95 s | p99 s | req/s "
+        "| tok/s | retries | retry overhead | failovers |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for run in report["runs"]:
+        ok = 100 * run["successes"] / (run["requests"] or 1)
+        lines.append(
+            f"| {run['provider']} | {run['concurrency']} | {run['requests']} "
+            f"| {ok:.1f} | {run['p50']:.3f} | {run['p95']:.3f} | {run['p99']:.3f} "
+            f"| {run['throughput_rps']:.2f} | {run['tokens_per_second']:.1f} "
+            f"| {run['retries']} | {run['retry_overhead'] * 100:.1f}% "
+            f"| {run['failovers']} |"
+        )
+
+    bounds = [b["le"] for b in report["runs"][0]["histogram"]] if report["runs"] else []
+    if bounds:
+        lines += [
+            "",
+            "## Latency histogram",
+            "",
+            "| provider | conc | "
+            + " | ".join(f"<= {b}s" if b != "+Inf" else "> max" for b in bounds)
+            + " |",
+            "|---|---:|" + "---:|" * len(bounds),
+        ]
+        for run in report["runs"]:
+            counts = " | ".join(str(b["count"]) for b in run["histogram"])
+            lines.append(f"| {run['provider']} | {run['concurrency']} | {counts} |")
+
+    errors = [run for run in report["runs"] if run["errors"]]
+    if errors:
+        lines += ["", "## Errors", ""]
+        for run in errors:
+            for error, count in run["errors"].items():
+                lines.append(
+                    f"- {run['provider']} @ {run['concurrency']}: {count} x `{error}`"
+                )
+
+    if report["suggested_order"]:
+        lines += [
+            "",
+            "## Suggested chain order",
+            "",
+            " -> ".join(report["suggested_order"]),
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(report: Dict[str, Any], output_dir: str) -> Tuple[Path, Path]:
+    """
+    Write ``bench-<timestamp>.json`` and ``.md`` into a directory.
+
+    Returns:
+        (json path, markdown path)
+    """
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = "bench-" + report["generated_at"].replace(":", "").replace("-", "")
+    json_path = directory / f"{stem}.json"
+    md_path = directory / f"{stem}.md"
+    json_path.write_text(json.dumps(report, indent=2))
+    md_path.write_text(format_markdown(report))
+    return json_path, md_path
+
+
+def _build_targets(
+    names: List[str],
+    server: Optional[StandInServer],
+    chain: bool,
+    replay: bool = False,
+) -> Dict[str, Union[BaseProvider, ProviderChain]]:
+    from . import get_provider_by_name
+
+    targets: Dict[str, Union[BaseProvider, ProviderChain]] = {}
+    for name in names:
+        if server is not None and name not in LOADTEST_PROVIDERS:
+            logger.warning(f"Skipping {name}: the stand-in only serves the OpenAI API")
+            continue
+        if server is not None:
+            rate_limit = RateLimitConfig(max_retries=2, backoff_factor=0.1)
+            provider = build_provider(name, server, rate_limit)
+        else:
+            provider = get_provider_by_name(name)
+        # Replays need no API key
+        if not replay and not provider.is_configured():
+            logger.warning(f"Skipping {name}: not configured")
+            continue
+        targets[name] = provider
+
+    if chain and len(targets) > 1:
+        providers = [t for t in targets.values() if isinstance(t, BaseProvider)]
+        targets["chain:" + ">".join(targets)] = ProviderChain(providers)
+    return targets
+
+
+# Providers benchmarked when --providers is not given
+DEFAULT_PROVIDERS = "groq,huggingface,openrouter,google"
+
+# The stand-in speaks chat/completions only (see loadtest.LOADTEST_PROVIDERS)
+DEFAULT_STANDIN_PROVIDERS = "groq,openrouter"
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark LLM providers")
+    parser.add_argument(
+        "--providers",
+        default=None,
+        help=(
+            "Comma-separated provider names (see get_provider_by_name; "
+            f"default: {DEFAULT_PROVIDERS}, or {DEFAULT_STANDIN_PROVIDERS} "
+            "with --standin)"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency", default="1,4,8", help="Comma-separated concurrency sweep"
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument(
+        "--chain",
+        action="store_true",
+        help="Also benchmark a ProviderChain over the providers, in order",
+    )
+    parser.add_argument(
+        "--standin",
+        action="store_true",
+        help="Point HTTP providers at a local stand-in server instead of the APIs",
+    )
+    parser.add_argument("--standin-latency", type=float, default=0.2)
+    parser.add_argument("--standin-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--cassette",
+        default=None,
+        metavar="PATH",
+        help="JSONL cassette to record responses to or replay them from",
+    )
+    parser.add_argument(
+        "--cassette-mode",
+        default="replay",
+        choices=CASSETTE_MODES,
+        help="replay: offline from the cassette; record_new: record only misses",
+    )
+    parser.add_argument("--output-dir", default="bench-results")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    providers = args.providers or (
+        DEFAULT_STANDIN_PROVIDERS if args.standin else DEFAULT_PROVIDERS
+    )
+    names = [n.strip() for n in providers.split(",") if n.strip()]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    cassette = Cassette(args.cassette, args.cassette_mode) if args.cassette else None
+    replay = cassette is not None and cassette.mode == "replay"
+
+    server = None
+    if args.standin:
+        server = StandInServer(
+            StandInConfig(
+                latency_mean=args.standin_latency,
+                rate_limit_rate=args.standin_rate_limit_rate,
+                retry_after=0.2,
+            )
+        ).start()
+    try:
+        targets = _build_targets(names, server, args.chain, replay)
+        if not targets:
+            parser.error("no configured providers to benchmark")
+        report = run_benchmark(targets, levels, repeats=args.repeats, cassette=cassette)
+    finally:
+        if server is not None:
+            server.stop()
+
+    json_path, md_path = write_reports(report, args.output_dir)
+    print(format_markdown(report))
+    if cassette is not None:
+        print(cassette.miss_report())
+    print(f"Reports written to {json_path} and {md_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Run-level budgets for ProviderChain.
+
+A RunBudget caps the tokens, provider requests, wall time and cost a run
+may use, so long optimizer runs stop cleanly instead of burning through a
+free tier's daily quota.
+"""
+
+from typing import Any, Dict, Optional
+import threading
+import time
+
+from .base import ProviderResponse
+
+
+class RunBudget:
+    """Thread-safe token/request/wall-time/cost budget for one run."""
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        cost_per_1k_tokens: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize budget; the wall-time clock starts now.
+
+        Args:
+            max_tokens: Total prompt + completion tokens (None = unlimited)
+            max_requests: Provider requests, failed ones included (None = unlimited)
+            max_seconds: Wall time in seconds (None = unlimited)
+            max_cost: Total cost in USD (None = unlimited)
+            cost_per_1k_tokens: USD per 1000 tokens by provider name
+                (providers.yaml ``cost_per_1k_tokens``; missing = free)
+        """
+        self.max_tokens = max_tokens
+        self.max_requests = max_requests
+        self.max_seconds = max_seconds
+        self.max_cost = max_cost
+        self.cost_per_1k_tokens = dict(cost_per_1k_tokens or {})
+        self.cost = 0.0
+        self.tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall time since the budget was created."""
+        return time.time() - self.started_at
+
+    def charge(self, response: ProviderResponse) -> None:
+        """
+        Account for one provider request.
+
+        Cache hits, cassette replays and coalesced calls cost nothing and
+        are only counted.
+
+        Args:
+            response: Response returned by the provider
+        """
+        with self._lock:
+            if response.metadata.get("cache") in ("hit", "semantic_hit"):
+                self.cache_hits += 1
+                return
+            if response.metadata.get("coalesced"):
+                self.coalesced += 1
+                return
+            if response.metadata.get("cassette") in ("replay", "miss"):
+                self.replayed += 1
+                return
+            self.requests += 1
+            self.tokens += response.tokens_used
+            self.prompt_tokens += response.prompt_tokens
+            self.completion_tokens += response.completion_tokens
+            rate = self.cost_per_1k_tokens.get(response.provider, 0.0)
+            self.cost += response.tokens_used / 1000 * rate
+
+    def exhausted_reason(self) -> Optional[str]:
+        """
+        Why the budget is exhausted, if it is.
+
+        Returns:
+            Human-readable reason, or None while budget remains
+        """
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return f"token budget of {self.max_tokens} used ({self.tokens})"
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return f"request budget of {self.max_requests} used"
+        if self.max_seconds is not None and self.elapsed_seconds >= self.max_seconds:
+            return f"time budget of {self.max_seconds:g}s used"
+        if self.max_cost is not None and self.cost >= self.max_cost:
+            return f"cost budget of ${self.max_cost:g} used (${self.cost:.4f})"
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether any limit has been reached."""
+        return self.exhausted_reason() is not None
+
+    def reject(self) -> None:
+        """Count a call refused because the budget was exhausted."""
+        with self._lock:
+            self.rejected += 1
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Usage against each limit.
+
+        Returns:
+            JSON-serializable usage summary
+        """
+        with self._lock:
+            return {
+                "tokens": self.tokens,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "replayed": self.replayed,
+                "rejected": self.rejected,
+                "cost": round(self.cost, 6),
+                "elapsed_seconds": round(self.elapsed_seconds, 3),
+                "max_tokens": self.max_tokens,
+                "max_requests": self.max_requests,
+                "max_seconds": self.max_seconds,
+                "max_cost": self.max_cost,
+                "exhausted": self.exhausted_reason(),
+            }
@@ -0,0 +1,194 @@
+"""
+Persistent response cache for providers.
+
+Content-addressed SQLite store keyed by provider, model, prompt and
+generation parameters, with TTL expiry and size-bounded LRU eviction.
+"""
+
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .base import ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path() -> Path:
+    """Cache location: $DSPY_HELM_CACHE_DIR or ~/.cache/dspy_helm."""
+    cache_dir = os.environ.get("DSPY_HELM_CACHE_DIR") or (
+        Path.home() / ".cache" / "dspy_helm"
+    )
+    return Path(cache_dir) / "responses.sqlite3"
+
+
+class ResponseCache:
+    """SQLite-backed cache of successful ProviderResponses."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite file (default: default_cache_path(); ":memory:" for tests)
+            ttl_seconds: Entry lifetime (None = never expire)
+            max_bytes: Total payload size kept before LRU eviction
+        """
+        self.path = str(path or default_cache_path())
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed"
+                " ON responses (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(
+        provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Content-address a request.
+
+        Args:
+            provider: Provider name
+            model: Model name
+            prompt: Prompt text
+            params: Generation parameters
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        material = json.dumps(
+            [provider, model, prompt, params or {}],
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[ProviderResponse]:
+        """
+        Look up a cached response, refreshing its LRU position.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached ProviderResponse, or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self._expired(row[1], now):
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+
+        return ProviderResponse(**json.loads(row[0]))
+
+    def set(self, key: str, response: ProviderResponse) -> None:
+        """
+        Store a response and evict least-recently-used entries over budget.
+
+        Args:
+            key: Key from make_key()
+            response: Response to store
+        """
+        payload = json.dumps(asdict(response), default=str)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict(now)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then LRU entries until under max_bytes."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} cached responses from {self.path}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and entry count."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
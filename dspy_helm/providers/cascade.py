@@ -0,0 +1,293 @@
+"""
+Quality-gated model cascade.
+
+A request goes to the cheapest, fastest tier first (e.g., Groq's
+llama-3.1-8b-instant); an acceptance check decides whether the answer is
+good enough, and only rejected or failed answers escalate to the next,
+larger tier (e.g., llama-3.3-70b-versatile). Per-tier acceptance rates
+are tracked so the cascade and its checks can be tuned.
+
+Acceptance checks are ``check(prompt, response) -> bool``. Built in:
+``confidence_check`` (a heuristic), ``json_check`` and ``regex_check``
+(format validators) and ``metric_check`` (a scenario metric against a
+known example).
+
+Example:
+    cascade = cascade_from_config("groq", check=json_check(["review"]))
+    response = cascade.call(prompt)
+    print(cascade.stats())
+"""
+
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+import json
+import logging
+import re
+import threading
+
+from .base import BaseProvider, ProviderChain, ProviderResponse
+
+logger = logging.getLogger(__name__)
+
+AcceptanceCheck = Callable[[str, ProviderResponse], bool]
+Tier = Union[BaseProvider, ProviderChain]
+
+# Phrases that suggest the model is unsure or declined
+HEDGE_PHRASES = (
+    "i'm not sure",
+    "i am not sure",
+    "i don't know",
+    "i do not know",
+    "i cannot",
+    "i can't",
+    "unable to",
+    "as an ai",
+)
+
+
+def confidence_check(
+    min_chars: int = 20, hedge_phrases: Sequence[str] = HEDGE_PHRASES
+) -> AcceptanceCheck:
+    """
+    Heuristic check: long enough and free of hedging or refusals.
+
+    Args:
+        min_chars: Shortest acceptable answer
+        hedge_phrases: Lower-case phrases that reject an answer
+
+    Returns:
+        Acceptance check
+    """
+
+    def check(prompt: str, response: ProviderResponse) -> bool:
+        content = response.content.strip()
+        if len(content) < min_chars:
+            return False
+        lowered = content.lower()
+        return not any(phrase in lowered for phrase in hedge_phrases)
+
+    return check
+
+
+def json_check(required_keys: Sequence[str] = ()) -> AcceptanceCheck:
+    """
+    Format check: the answer is a JSON object with the given keys.
+
+    A fenced ```json block is accepted.
+
+    Args:
+        required_keys: Keys the object must have
+
+    Returns:
+        Acceptance check
+    """
+
+    def check(prompt: str, response: ProviderResponse) -> bool:
+        text = response.content.strip()
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1)
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and all(key in data for key in required_keys)
+
+    return check
+
+
+def regex_check(pattern: str, flags: int = 0) -> AcceptanceCheck:
+    """
+    Format check: the answer matches a regular expression (re.search).
+
+    Args:
+        pattern: Regular expression
+        flags: ``re`` flags
+
+    Returns:
+        Acceptance check
+    """
+    compiled = re.compile(pattern, flags)
+
+    def check(prompt: str, response: ProviderResponse) -> bool:
+        return compiled.search(response.content) is not None
+
+    return check
+
+
+def metric_check(
+    metric: Callable[..., float],
+    example: Any,
+    output_field: str,
+    threshold: float = 0.5,
+) -> AcceptanceCheck:
+    """
+    Scenario check: score the answer with a scenario's ``metric``.
+
+    Args:
+        metric: ``metric(example, pred)`` returning a score
+        example: Example with the expected output
+        output_field: Prediction field the answer fills (e.g., "review")
+        threshold: Lowest accepted score
+
+    Returns:
+        Acceptance check
+    """
+
+    def check(prompt: str, response: ProviderResponse) -> bool:
+        pred = SimpleNamespace(**{output_field: response.content})
+        return (metric(example, pred) or 0.0) >= threshold
+
+    return check
+
+
+def _tier_label(tier: Tier, index: int) -> str:
+    if isinstance(tier, BaseProvider):
+        return f"{tier.name}/{tier.model}"
+    return f"tier{index}"
+
+
+class ModelCascade:
+    """Cheapest tier first; escalate answers the acceptance check rejects."""
+
+    def __init__(
+        self,
+        tiers: List[Tier],
+        check: Optional[AcceptanceCheck] = None,
+        labels: Optional[List[str]] = None,
+    ):
+        """
+        Initialize cascade.
+
+        Args:
+            tiers: Providers (or chains), cheapest first
+            check: Default acceptance check (None = any successful answer)
+            labels: Tier names for stats (default: "<provider>/<model>")
+
+        Raises:
+            ValueError: If no tiers are given
+        """
+        if not tiers:
+            raise ValueError("A cascade needs at least one tier")
+        self.tiers = tiers
+        self.check = check
+        self.labels = labels or [_tier_label(t, i) for i, t in enumerate(tiers)]
+        self._lock = threading.Lock()
+        self._stats = {
+            label: {"attempts": 0, "accepted": 0, "rejected": 0, "failed": 0}
+            for label in self.labels
+        }
+
+    def _judge(
+        self,
+        index: int,
+        prompt: str,
+        response: ProviderResponse,
+        check: Optional[AcceptanceCheck],
+    ) -> bool:
+        """Record a tier's outcome; True if its answer is served."""
+        label = self.labels[index]
+        last = index == len(self.tiers) - 1
+        if not response.success:
+            outcome = "failed"
+        elif check is None:
+            outcome = "accepted"
+        else:
+            try:
+                outcome = "accepted" if check(prompt, response) else "rejected"
+            except Exception as e:
+                logger.warning(f"Acceptance check failed on {label}: {e}")
+                outcome = "rejected"
+
+        with self._lock:
+            stats = self._stats[label]
+            stats["attempts"] += 1
+            stats[outcome] += 1
+
+        if outcome != "accepted" and not last:
+            logger.debug(f"Escalating from {label}: answer {outcome}")
+            return False
+        response.metadata["cascade_tier"] = label
+        response.metadata["cascade_escalations"] = index
+        response.metadata["cascade_accepted"] = outcome == "accepted"
+        return True
+
+    def call(
+        self, prompt: str, check: Optional[AcceptanceCheck] = None, **kwargs
+    ) -> ProviderResponse:
+        """
+        Answer from the cheapest tier whose answer is accepted.
+
+        The last tier's answer is returned even if rejected
+        (``metadata["cascade_accepted"]`` is then False).
+
+        Args:
+            prompt: Prompt to send
+            check: Acceptance check for this call (default: the cascade's)
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with ``cascade_tier`` and ``cascade_escalations``
+            metadata
+        """
+        check = check or self.check
+        for index, tier in enumerate(self.tiers):
+            response = tier.call(prompt, **kwargs)
+            if self._judge(index, prompt, response, check):
+                return response
+        return response
+
+    async def acall(
+        self, prompt: str, check: Optional[AcceptanceCheck] = None, **kwargs
+    ) -> ProviderResponse:
+        """Async version of ``call`` (checks run on the event loop thread)."""
+        check = check or self.check
+        for index, tier in enumerate(self.tiers):
+            response = await tier.acall(prompt, **kwargs)
+            if self._judge(index, prompt, response, check):
+                return response
+        return response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-tier outcomes.
+
+        Returns:
+            label -> attempts, accepted, rejected, failed and
+            acceptance_rate (accepted / attempts)
+        """
+        with self._lock:
+            return {
+                label: dict(
+                    stats,
+                    acceptance_rate=round(stats["accepted"] / stats["attempts"], 4)
+                    if stats["attempts"]
+                    else None,
+                )
+                for label, stats in self._stats.items()
+            }
+
+
+def cascade_from_config(
+    name: str = "groq", check: Optional[AcceptanceCheck] = None
+) -> ModelCascade:
+    """
+    Build a cascade from a provider's ``cascade`` model list in providers.yaml.
+
+    Args:
+        name: Provider key in providers.yaml
+        check: Default acceptance check
+
+    Returns:
+        ModelCascade over the shared provider instances
+
+    Raises:
+        ValueError: If the provider has no cascade configured
+    """
+    from . import get_provider_by_name
+    from ..config import get_provider_config
+
+    models = get_provider_config(name).get("cascade") or []
+    if not models:
+        raise ValueError(f"No cascade configured for provider: '{name}'")
+    return ModelCascade([get_provider_by_name(name, model) for model in models], check)
@@ -0,0 +1,246 @@
+"""
+Record/replay cassettes for providers.
+
+A cassette stores provider responses in an append-only JSONL file, one
+compact line per response keyed by a hash of (provider, model, prompt,
+parameters). Regression runs of the Evaluator and optimizers can then
+replay a recorded session offline, without rate limiting or network
+latency.
+
+Modes:
+    record      send every request and record it (the file is rewritten)
+    replay      answer only from the cassette; unrecorded requests fail
+    record_new  replay recorded requests, send and record the rest
+
+A request recorded several times (e.g., sampled at temperature > 0) is
+replayed in recorded order, wrapping around.
+
+Streams are recorded once complete (not when stopped early) and replayed
+as a single chunk.
+
+Example:
+    cassette = Cassette("cassettes/security_review.jsonl", mode="replay")
+    with use_cassette(cassette, chain.providers):
+        evaluator.evaluate(program, devset)
+    print(cassette.miss_report())
+"""
+
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+import json
+import logging
+import threading
+
+from .base import BaseProvider, ProviderResponse
+from .cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("record", "replay", "record_new")
+
+# Prompt characters kept per miss for the report
+_MISS_PREVIEW_CHARS = 80
+
+
+class Cassette:
+    """Append-only JSONL store of provider responses."""
+
+    def __init__(self, path: Union[str, Path], mode: str = "replay"):
+        """
+        Initialize cassette.
+
+        Args:
+            path: JSONL file (created on first recording)
+            mode: "record", "replay" or "record_new"
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in CASSETTE_MODES:
+            available = ", ".join(CASSETTE_MODES)
+            raise ValueError(f"Unknown cassette mode: '{mode}'. Available: {available}")
+        self.path = Path(path)
+        self.mode = mode
+        self.hits = 0
+        self.recorded = 0
+        self.misses: List[Dict[str, str]] = []
+        self._takes: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a partial last line
+                    logger.warning(f"Skipping corrupt line {number} of {self.path}")
+                    continue
+                self._takes.setdefault(entry["k"], []).append(entry["r"])
+
+    def play(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[ProviderResponse]:
+        """
+        Replay the next recorded response for a request.
+
+        Args:
+            provider: Provider name
+            model: Model name
+            prompt: Prompt text
+            params: Generation parameters
+
+        Returns:
+            Recorded response; a failed response for a miss in replay mode;
+            None if the request should be sent (and then recorded)
+        """
+        if self.mode == "record":
+            return None
+        key = ResponseCache.make_key(provider, model, prompt, params)
+        with self._lock:
+            takes = self._takes.get(key)
+            if not takes:
+                if self.mode == "record_new":
+                    return None
+                self.misses.append(
+                    {
+                        "provider": provider,
+                        "model": model,
+                        "prompt": prompt[:_MISS_PREVIEW_CHARS],
+                    }
+                )
+                return ProviderResponse(
+                    success=False,
+                    content="",
+                    provider=provider,
+                    model=model,
+                    error=f"No recorded response in cassette {self.path}",
+                    metadata={"cassette": "miss"},
+                )
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            self.hits += 1
+            take = takes[index % len(takes)]
+
+        response = ProviderResponse(**take)
+        response.metadata = {
+            "cassette": "replay",
+            "recorded_latency_seconds": response.latency_seconds,
+        }
+        response.latency_seconds = 0.0
+        return response
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        response: ProviderResponse,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Append a successful response (no-op in replay mode).
+
+        Args:
+            provider: Provider name
+            model: Model name
+            prompt: Prompt text
+            response: Response to record
+            params: Generation parameters
+        """
+        if self.mode == "replay" or not response.success:
+            return
+        key = ResponseCache.make_key(provider, model, prompt, params)
+        # Defaults are left out to keep lines short; metadata is per-run
+        take = {
+            name: value
+            for name, value in asdict(response).items()
+            if name != "metadata" and value not in (None, "", 0, 0.0)
+        }
+        line = json.dumps({"k": key, "r": take}, separators=(",", ":"), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._takes.setdefault(key, []).append(take)
+            self.recorded += 1
+        response.metadata["cassette"] = "recorded"
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode, file, recorded requests and this session's hits/misses."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": str(self.path),
+                "requests": len(self._takes),
+                "hits": self.hits,
+                "misses": len(self.misses),
+                "recorded": self.recorded,
+            }
+
+    def miss_report(self, limit: int = 20) -> str:
+        """
+        Summarize the requests replay mode could not answer.
+
+        Args:
+            limit: Misses listed individually
+
+        Returns:
+            Human-readable report
+        """
+        stats = self.stats()
+        lines = [
+            f"Cassette {stats['path']} ({stats['mode']}): {stats['hits']} replayed, "
+            f"{stats['misses']} missed, {stats['recorded']} recorded"
+        ]
+        with self._lock:
+            misses = list(self.misses)
+        for miss in misses[:limit]:
+            lines.append(
+                f"  miss {miss['provider']}/{miss['model']}: {miss['prompt']!r}"
+            )
+        if len(misses) > limit:
+            lines.append(f"  ... and {len(misses) - limit} more")
+        return "\n".join(lines)
+
+
+@contextmanager
+def use_cassette(
+    cassette: Cassette, providers: Iterable[BaseProvider]
+) -> Iterator[Cassette]:
+    """
+    Attach a cassette to providers for the duration of a block.
+
+    Args:
+        cassette: Cassette to record to / replay from
+        providers: Providers to attach it to (e.g., ``chain.providers``)
+
+    Yields:
+        The cassette
+    """
+    providers = list(providers)
+    previous = [provider.cassette for provider in providers]
+    for provider in providers:
+        provider.cassette = cassette
+    try:
+        yield cassette
+    finally:
+        for provider, old in zip(providers, previous):
+            provider.cassette = old
@@ -0,0 +1,175 @@
+"""
+Circuit breakers for ProviderChain.
+
+Tracks each provider's recent outcomes so the chain can skip providers
+that are down, unconfigured or rate limited in O(1), and probe them
+again after a cooldown.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict, Optional
+import threading
+import time
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"  # healthy, requests flow
+    OPEN = "open"  # failing, requests skipped until cooldown expires
+    HALF_OPEN = "half_open"  # cooldown expired, one probe decides
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Configuration for per-provider circuit breakers."""
+
+    window_size: int = 20
+    min_calls: int = 5
+    failure_threshold: float = 0.5
+    cooldown_seconds: float = 30.0
+    max_cooldown_seconds: float = 300.0
+    open_on_rate_limit: bool = True
+    background_probe: bool = True
+    probe_prompt: str = "Reply with OK."
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open breaker with an error-rate window."""
+
+    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+        """
+        Initialize breaker.
+
+        Args:
+            config: Breaker configuration
+        """
+        self.config = config or CircuitBreakerConfig()
+        self.state = CircuitState.CLOSED
+        self.opened_count = 0
+        self.last_error: Optional[str] = None
+        self._outcomes: Deque[bool] = deque(maxlen=self.config.window_size)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._cooldown = self.config.cooldown_seconds
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def error_rate(self) -> float:
+        """Failure fraction in the current window."""
+        return self._failures / len(self._outcomes) if self._outcomes else 0.0
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may be sent to the provider now.
+
+        In HALF_OPEN exactly one caller is let through as the probe.
+        """
+        if self.state is CircuitState.CLOSED:
+            return True
+        with self._lock:
+            if self.state is CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self._cooldown:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+            if self.state is CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return self.state is CircuitState.CLOSED
+
+    def probe_due(self) -> bool:
+        """
+        Claim the half-open probe for a background check.
+
+        Returns:
+            True if the caller should run the probe now
+        """
+        if self.state is not CircuitState.OPEN:
+            return False
+        with self._lock:
+            if self.state is not CircuitState.OPEN or self._probing:
+                return False
+            if time.monotonic() - self._opened_at < self._cooldown:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful call; closes a half-open breaker."""
+        with self._lock:
+            if self.state is not CircuitState.CLOSED:
+                self._reset()
+            self._push(True)
+
+    def record_failure(self, error: Optional[str] = None, rate_limited: bool = False):
+        """
+        Record a failed call.
+
+        Args:
+            error: Failure message
+            rate_limited: Failure was a rate limit that outlasted the retries
+        """
+        with self._lock:
+            self.last_error = error
+            if self.state is CircuitState.HALF_OPEN:
+                self._open(backoff=True)
+                return
+            self._push(False)
+            if rate_limited and self.config.open_on_rate_limit:
+                self._open()
+            elif (
+                len(self._outcomes) >= self.config.min_calls
+                and self.error_rate >= self.config.failure_threshold
+            ):
+                self._open()
+
+    def trip(self, error: Optional[str] = None) -> None:
+        """Open the breaker immediately (e.g. provider not configured)."""
+        with self._lock:
+            self.last_error = error
+            self._open(backoff=self.state is CircuitState.HALF_OPEN)
+
+    def health(self) -> float:
+        """Health score in [0, 1]: 0 while open, else window success rate."""
+        if self.state is CircuitState.OPEN:
+            return 0.0
+        return 1.0 - self.error_rate
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable breaker state."""
+        with self._lock:
+            return {
+                "state": self.state.value,
+                "health": round(self.health(), 3),
+                "error_rate": round(self.error_rate, 3),
+                "calls_in_window": len(self._outcomes),
+                "opened_count": self.opened_count,
+                "cooldown_seconds": self._cooldown,
+                "last_error": self.last_error,
+            }
+
+    def _push(self, success: bool) -> None:
+        if len(self._outcomes) == self._outcomes.maxlen and not self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(success)
+        if not success:
+            self._failures += 1
+
+    def _open(self, backoff: bool = False) -> None:
+        if backoff:
+            self._cooldown = min(self._cooldown * 2, self.config.max_cooldown_seconds)
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.opened_count += 1
+
+    def _reset(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._cooldown = self.config.cooldown_seconds
+        self._probing = False
@@ -0,0 +1,329 @@
+"""
+Base class for providers that shell out to a local CLI tool.
+
+Runs ``<command> <subcommand> <prompt>`` either blocking (subprocess.run)
+or on the event loop (asyncio.create_subprocess_exec). Prompts too large
+for argv are sent over stdin or through a temporary file, and an optional
+pool of pre-spawned workers hides the CLI's startup time.
+
+Of the generation parameters, ``timeout`` bounds the process and ``stop``
+is applied to its output; the others reach the CLI only through
+PARAM_FLAGS, since most tools expose no such options.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from .params import GenerationParams, truncate_at_stop
+from .workers import WarmProcessPool, WorkerPoolConfig
+
+
+class CLIProvider(BaseProvider):
+    """Abstract base class for CLI-backed providers."""
+
+    # Seconds before the CLI process is killed (a call's ``timeout``
+    # parameter overrides it)
+    TIMEOUT_SECONDS: float = 120
+
+    # CLI option per generation parameter the tool accepts, e.g.
+    # {"max_tokens": "--max-tokens"}; pooled workers are spawned once, so
+    # they do not get per-call options
+    PARAM_FLAGS: Dict[str, str] = {}
+
+    # Lower-case substrings in CLI output that indicate rate limiting
+    RATE_LIMIT_INDICATORS: List[str] = [
+        "rate limit",
+        "too many requests",
+        "429",
+    ]
+
+    # Prompts larger than this (UTF-8 bytes) are not put on argv; Linux
+    # rejects any single argument over 128 KiB (MAX_ARG_STRLEN)
+    MAX_ARGV_PROMPT_BYTES: int = 100_000
+
+    # How large prompts reach the CLI: "stdin" or "file"
+    LARGE_PROMPT_MODE: str = "stdin"
+
+    # Prompt argument in "file" mode (e.g., Gemini CLI's @path references)
+    FILE_PROMPT_TEMPLATE: str = "@{path}"
+
+    def __init__(
+        self,
+        name: str,
+        command: str,
+        model: str,
+        subcommand: str = "ask",
+        rate_limit: Optional[RateLimitConfig] = None,
+        workers: Optional[WorkerPoolConfig] = None,
+        **kwargs,
+    ):
+        """
+        Initialize CLI provider.
+
+        Args:
+            name: Provider display name
+            command: CLI executable
+            model: Default model to use
+            subcommand: CLI subcommand (default: "ask")
+            rate_limit: Rate limiting configuration
+            workers: Keep pre-spawned CLI processes that read the prompt
+                from stdin (None = spawn per call)
+            **kwargs: Additional BaseProvider options (e.g., cache)
+        """
+        super().__init__(
+            name=name,
+            command=command,
+            subcommand=subcommand,
+            model=model,
+            rate_limit=rate_limit,
+            **kwargs,
+        )
+        self.workers = workers
+        self._pool: Optional[WarmProcessPool] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def default_params(self) -> GenerationParams:
+        return GenerationParams(timeout=self.TIMEOUT_SECONDS)
+
+    def _param_args(self, kwargs: Dict[str, Any]) -> List[str]:
+        """CLI options for the call's generation parameters (see PARAM_FLAGS)."""
+        params = GenerationParams.from_kwargs(kwargs).without(self.UNSUPPORTED_PARAMS)
+        args: List[str] = []
+        for name, flag in self.PARAM_FLAGS.items():
+            value = getattr(params, name)
+            if value is None:
+                continue
+            if name == "stop":
+                for sequence in value:
+                    args.extend([flag, sequence])
+            else:
+                args.extend([flag, str(value)])
+        return args
+
+    def _build_command(self, prompt: str, **kwargs) -> List[str]:
+        """Build the argv for a single prompt."""
+        return [self.command, self.subcommand, *self._param_args(kwargs), prompt]
+
+    def _build_stdin_command(self, **kwargs) -> List[str]:
+        """Build the argv for a CLI that reads the prompt from stdin."""
+        return [self.command, self.subcommand, *self._param_args(kwargs)]
+
+    def _prepare(
+        self, prompt: str, **kwargs
+    ) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """
+        Decide how the prompt reaches the CLI.
+
+        Returns:
+            (argv, text for stdin or None, temporary prompt file or None)
+        """
+        if self.workers is not None:
+            return self._build_stdin_command(**kwargs), prompt, None
+
+        if len(prompt.encode("utf-8")) <= self.MAX_ARGV_PROMPT_BYTES:
+            return self._build_command(prompt, **kwargs), None, None
+
+        if self.LARGE_PROMPT_MODE == "file":
+            fd, path = tempfile.mkstemp(prefix="dspy_helm_prompt_", suffix=".txt")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(prompt)
+            argument = self.FILE_PROMPT_TEMPLATE.format(path=path)
+            return self._build_command(argument, **kwargs), None, path
+
+        return self._build_stdin_command(**kwargs), prompt, None
+
+    def _get_pool(self) -> WarmProcessPool:
+        """Return the warm worker pool, creating it on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = WarmProcessPool(self._build_stdin_command(), self.workers)
+            return self._pool
+
+    def warm_up(self) -> bool:
+        """Pre-spawn the worker pool (no-op without workers)."""
+        if self.workers is not None:
+            self._get_pool().fill()
+        return True
+
+    def close(self) -> None:
+        """Terminate idle pooled workers."""
+        if self._pool is not None:
+            self._pool.close()
+
+    def _to_response(
+        self, returncode: int, stdout: str, stderr: str, latency: float
+    ) -> ProviderResponse:
+        """
+        Map a finished CLI process to a ProviderResponse.
+
+        Args:
+            returncode: Process exit status
+            stdout: Captured standard output
+            stderr: Captured standard error
+            latency: Wall-clock time in seconds
+
+        Returns:
+            ProviderResponse with result
+        """
+        if returncode != 0:
+            error_output = stderr or stdout
+
+            return ProviderResponse(
+                success=False,
+                error=error_output,
+                provider=self.name,
+                model=self.model,
+                rate_limited=self._is_rate_limited(error_output),
+                latency_seconds=latency,
+            )
+
+        return ProviderResponse(
+            success=True,
+            content=stdout.strip(),
+            provider=self.name,
+            model=self.model,
+            latency_seconds=latency,
+        )
+
+    def _timeout_response(self, latency: float, timeout: float) -> ProviderResponse:
+        return ProviderResponse(
+            success=False,
+            error=f"Command timed out after {timeout:g} seconds",
+            provider=self.name,
+            model=self.model,
+            latency_seconds=latency,
+        )
+
+    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Execute prompt via the CLI.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        start_time = time.time()
+        prompt_file = None
+        params = self.generation_params(kwargs)
+
+        try:
+            argv, stdin_text, prompt_file = self._prepare(prompt, **kwargs)
+            if self.workers is not None:
+                returncode, stdout, stderr = self._get_pool().run(
+                    stdin_text, timeout=params.timeout
+                )
+            else:
+                result = subprocess.run(
+                    argv,
+                    input=stdin_text,
+                    capture_output=True,
+                    text=True,
+                    timeout=params.timeout,
+                )
+                returncode, stdout, stderr = (
+                    result.returncode,
+                    result.stdout,
+                    result.stderr,
+                )
+            response = self._to_response(
+                returncode, stdout, stderr, time.time() - start_time
+            )
+            return self._apply_stop(response, params)
+
+        except subprocess.TimeoutExpired:
+            return self._timeout_response(time.time() - start_time, params.timeout)
+
+        except Exception as e:
+            return ProviderResponse(
+                success=False,
+                error=str(e),
+                provider=self.name,
+                model=self.model,
+                latency_seconds=time.time() - start_time,
+            )
+
+        finally:
+            if prompt_file is not None:
+                os.unlink(prompt_file)
+
+    async def _aexecute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Execute prompt via the CLI without blocking the event loop.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        if self.workers is not None:
+            # Pooled workers are plain Popen objects; drive them from a thread
+            return await super()._aexecute_cli(prompt, **kwargs)
+
+        start_time = time.time()
+        prompt_file = None
+        params = self.generation_params(kwargs)
+
+        try:
+            argv, stdin_text, prompt_file = self._prepare(prompt, **kwargs)
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=None if stdin_text is None else asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdin_bytes = None if stdin_text is None else stdin_text.encode("utf-8")
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(stdin_bytes), timeout=params.timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return self._timeout_response(time.time() - start_time, params.timeout)
+
+            response = self._to_response(
+                process.returncode,
+                stdout.decode(errors="replace"),
+                stderr.decode(errors="replace"),
+                time.time() - start_time,
+            )
+            return self._apply_stop(response, params)
+
+        except Exception as e:
+            return ProviderResponse(
+                success=False,
+                error=str(e),
+                provider=self.name,
+                model=self.model,
+                latency_seconds=time.time() - start_time,
+            )
+
+        finally:
+            if prompt_file is not None:
+                os.unlink(prompt_file)
+
+    def _apply_stop(
+        self, response: ProviderResponse, params: GenerationParams
+    ) -> ProviderResponse:
+        """Cut successful output at the first stop sequence."""
+        if response.success and params.stop:
+            response.content = truncate_at_stop(response.content, params.stop).strip()
+        return response
+
+    def _is_rate_limited(self, output: str) -> bool:
+        """Detect rate limiting indicators."""
+        output_lower = output.lower()
+        return any(
+            indicator in output_lower for indicator in self.RATE_LIMIT_INDICATORS
+        )
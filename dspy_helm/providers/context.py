@@ -0,0 +1,174 @@
+"""
+Context-window awareness for providers.
+
+Providers declare each model's context window; before a request is sent
+the prompt's size is estimated and providers that cannot accept it are
+skipped instead of failing slowly. When no provider can, a fitting
+strategy (truncation or compaction) can shrink the prompt to the largest
+window available.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import re
+
+from .tokens import estimate_tokens
+
+TRUNCATION_MARKER = "\n\n[... {dropped} tokens omitted ...]\n\n"
+
+
+def prompt_fits(prompt: str, limit: Optional[int]) -> bool:
+    """
+    Whether a prompt fits a token limit.
+
+    Short prompts are accepted from their length alone (a token never
+    covers less than one UTF-8 byte), so only large prompts are tokenized.
+
+    Args:
+        prompt: Prompt to check
+        limit: Prompt token limit (None = unknown, always fits)
+
+    Returns:
+        True if the prompt should be accepted
+    """
+    if limit is None or len(prompt) * 4 <= limit:
+        return True
+    if len(prompt.encode("utf-8")) <= limit:
+        return True
+    return estimate_tokens(prompt) <= limit
+
+
+class PromptSize:
+    """A prompt's token count, estimated at most once per request."""
+
+    def __init__(self, prompt: str, fitted_by: Optional[str] = None):
+        self.prompt = prompt
+        self.fitted_by = fitted_by  # strategy that shrank the prompt, if any
+        self._tokens: Optional[int] = None
+
+    @property
+    def tokens(self) -> int:
+        """Estimated prompt tokens."""
+        if self._tokens is None:
+            self._tokens = estimate_tokens(self.prompt)
+        return self._tokens
+
+    def fits(self, limit: Optional[int]) -> bool:
+        """Whether the prompt fits ``limit`` (None = unknown, always fits)."""
+        if limit is None or len(self.prompt) * 4 <= limit:
+            return True
+        return self.tokens <= limit
+
+
+def _shrink(prompt: str, limit: int, cut: Callable[[int], str]) -> str:
+    """Shrink ``keep`` characters until ``cut(keep)`` fits ``limit`` tokens."""
+    tokens = estimate_tokens(prompt)
+    keep = int(len(prompt) * limit / max(tokens, 1))
+    while keep > 0:
+        fitted = cut(keep)
+        if estimate_tokens(fitted) <= limit:
+            return fitted
+        keep = int(keep * 0.9)
+    return cut(0)
+
+
+def truncate_middle(prompt: str, limit: int) -> str:
+    """
+    Drop the middle of a prompt, keeping its instructions and final input.
+
+    Args:
+        prompt: Prompt to shrink
+        limit: Token limit to fit
+
+    Returns:
+        Prompt of at most ``limit`` estimated tokens
+    """
+    if prompt_fits(prompt, limit):
+        return prompt
+    total = estimate_tokens(prompt)
+
+    def cut(keep: int) -> str:
+        head = prompt[: keep // 2]
+        tail = prompt[len(prompt) - (keep - keep // 2) :] if keep else ""
+        dropped = max(0, total - estimate_tokens(head) - estimate_tokens(tail))
+        return head + TRUNCATION_MARKER.format(dropped=dropped) + tail
+
+    return _shrink(prompt, limit, cut)
+
+
+def truncate_end(prompt: str, limit: int) -> str:
+    """
+    Drop the end of a prompt.
+
+    Args:
+        prompt: Prompt to shrink
+        limit: Token limit to fit
+
+    Returns:
+        Prompt of at most ``limit`` estimated tokens
+    """
+    if prompt_fits(prompt, limit):
+        return prompt
+    return _shrink(prompt, limit, lambda keep: prompt[:keep])
+
+
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+_INNER_SPACES = re.compile(r"(?<=\S)[ \t]{2,}")
+
+
+def compact(prompt: str, limit: int) -> str:
+    """
+    Squeeze whitespace (indentation is kept), then truncate the middle.
+
+    Args:
+        prompt: Prompt to shrink
+        limit: Token limit to fit
+
+    Returns:
+        Prompt of at most ``limit`` estimated tokens
+    """
+    if prompt_fits(prompt, limit):
+        return prompt
+    squeezed = _TRAILING_SPACE.sub("", prompt)
+    squeezed = _BLANK_LINES.sub("\n\n", squeezed)
+    squeezed = _INNER_SPACES.sub(" ", squeezed)
+    return truncate_middle(squeezed, limit)
+
+
+FIT_STRATEGIES: Dict[str, Callable[[str, int], str]] = {
+    "truncate_middle": truncate_middle,
+    "truncate_end": truncate_end,
+    "compact": compact,
+}
+
+
+@dataclass
+class ContextConfig:
+    """What ProviderChain does with a prompt too large for every provider."""
+
+    strategy: Optional[str] = "truncate_middle"  # None = reject without sending
+    safety_margin: float = 0.05  # fraction of the window left unused when fitting
+
+    def __post_init__(self):
+        if self.strategy is not None and self.strategy not in FIT_STRATEGIES:
+            available = ", ".join(FIT_STRATEGIES)
+            raise ValueError(
+                f"Unknown fitting strategy: '{self.strategy}'. Available: {available}"
+            )
+
+    def fit(self, prompt: str, limit: int) -> str:
+        """
+        Shrink a prompt to a provider's prompt token limit.
+
+        Args:
+            prompt: Prompt to shrink
+            limit: Prompt token limit of the target provider
+
+        Returns:
+            Fitted prompt (unchanged if no strategy is configured)
+        """
+        if self.strategy is None:
+            return prompt
+        target = max(1, int(limit * (1 - self.safety_margin)))
+        return FIT_STRATEGIES[self.strategy](prompt, target)
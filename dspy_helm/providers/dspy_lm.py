@@ -0,0 +1,374 @@
+"""
+DSPy language model backed by a ProviderChain.
+
+``dspy.settings.configure(lm=ProviderLM(chain))`` sends every request a
+DSPy program, optimizer or evaluator makes through the chain, so it gets
+failover, retries, rate limiting, circuit breakers and budgets. Results
+can be cached across runs in a ResponseCache, and a concurrency limit
+caps in-flight requests across DSPy's worker threads. ``batch`` answers
+many prompts in one dispatch: ``ProviderChain.call_many`` fans them out
+across providers, or a PromptPacker packs several into each request.
+
+This module imports dspy, so it is not re-exported from the providers
+package.
+
+Example:
+    lm = ProviderLM(create_provider_chain(), response_cache=ResponseCache())
+    dspy.settings.configure(lm=lm)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+import asyncio
+import copy
+import threading
+import time
+
+import dspy
+
+from .base import ProviderChain, ProviderResponse
+from .cache import ResponseCache
+
+if TYPE_CHECKING:
+    from .scheduler import ScheduledClient
+
+# DSPy options that are not generation parameters
+_DSPY_ONLY_KWARGS = ("n", "num_retries", "cache")
+
+
+def messages_to_prompt(
+    prompt: Optional[str] = None, messages: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """
+    Flatten chat messages into the single prompt providers accept.
+
+    A lone message is sent as-is; a conversation (system instructions,
+    few-shot demos) is labelled turn by turn.
+
+    Args:
+        prompt: Plain prompt (used when there are no messages)
+        messages: OpenAI-style chat messages
+
+    Returns:
+        Prompt text
+    """
+    if not messages:
+        return prompt or ""
+
+    def text(content: Any) -> str:
+        if isinstance(content, list):  # content parts; keep the text ones
+            return "\n".join(
+                part.get("text", "") for part in content if isinstance(part, dict)
+            )
+        return str(content or "")
+
+    if len(messages) == 1:
+        return text(messages[0].get("content"))
+    return "\n\n".join(
+        f"{message.get('role', 'user').capitalize()}:\n{text(message.get('content'))}"
+        for message in messages
+    )
+
+
+def to_completion(responses: List[ProviderResponse], model: str) -> SimpleNamespace:
+    """
+    Wrap provider responses as an OpenAI-style chat completion.
+
+    Args:
+        responses: One successful response per choice
+        model: Model reported when the responses do not name one
+
+    Returns:
+        Object with ``choices``, ``usage`` (a dict) and ``model``, as
+        dspy.BaseLM expects from ``forward``
+    """
+    choices = [
+        SimpleNamespace(
+            index=i,
+            message=SimpleNamespace(
+                role="assistant", content=response.content, tool_calls=None
+            ),
+            finish_reason="stop",
+        )
+        for i, response in enumerate(responses)
+    ]
+    fresh = [
+        r for r in responses if r.metadata.get("cache") not in ("hit", "semantic_hit")
+    ]
+    prompt_tokens = sum(r.prompt_tokens for r in fresh)
+    completion_tokens = sum(r.completion_tokens for r in fresh)
+    first = responses[0] if responses else None
+    return SimpleNamespace(
+        id=f"provider-lm-{time.time_ns()}",
+        object="chat.completion",
+        model=(first.model if first and first.model else model),
+        provider=first.provider if first else None,
+        choices=choices,
+        usage={
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    )
+
+
+class ProviderLM(dspy.BaseLM):
+    """dspy.BaseLM that answers through a ProviderChain."""
+
+    def __init__(
+        self,
+        chain: Optional[Union[ProviderChain, "ScheduledClient"]] = None,
+        model: str = "dspy-helm/provider-chain",
+        response_cache: Optional[ResponseCache] = None,
+        max_concurrency: Optional[int] = None,
+        temperature: float = 0.0,
+        max_tokens: int = 1000,
+        **kwargs,
+    ):
+        """
+        Initialize LM.
+
+        Args:
+            chain: Providers to call, or a PriorityScheduler client
+                (default: create_provider_chain())
+            model: Name DSPy reports for this LM
+            response_cache: Cache of completions keyed by prompt and
+                parameters (None = no caching)
+            max_concurrency: In-flight requests allowed across threads and
+                tasks (None = unlimited)
+            temperature: Default sampling temperature
+            max_tokens: Default completion token limit
+            **kwargs: Further default generation parameters
+        """
+        # DSPy's own cache is litellm-based; ours is response_cache
+        super().__init__(
+            model=model,
+            model_type="chat",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cache=False,
+            **kwargs,
+        )
+        if chain is None:
+            from . import create_provider_chain
+
+            chain = create_provider_chain()
+        self.chain = chain
+        self.response_cache = response_cache
+        self.max_concurrency = max_concurrency
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self._stats_lock = threading.Lock()
+        self._counts = {"requests": 0, "cache_hits": 0}
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ProviderLM":
+        # DSPy copies LMs (lm.copy(temperature=...)); copies share the
+        # chain, cache, concurrency limit and counters with the original
+        clone = copy.copy(self)
+        clone.kwargs = copy.deepcopy(self.kwargs, memo)
+        clone.history = []
+        return clone
+
+    def _params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        params = {**self.kwargs, **kwargs}
+        for key in _DSPY_ONLY_KWARGS:
+            params.pop(key, None)
+        return params
+
+    def _cache_key(self, prompt: str, params: Dict[str, Any], sample: int) -> str:
+        material = dict(params, sample=sample) if sample else params
+        return ResponseCache.make_key("ProviderLM", self.model, prompt, material)
+
+    def _cached(self, key: Optional[str]) -> Optional[ProviderResponse]:
+        if key is None:
+            return None
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            cached.metadata["cache"] = "hit"
+            with self._stats_lock:
+                self._counts["cache_hits"] += 1
+        return cached
+
+    def _finish(
+        self, key: Optional[str], response: ProviderResponse
+    ) -> ProviderResponse:
+        """Count, cache and check a fresh chain response."""
+        with self._stats_lock:
+            self._counts["requests"] += 1
+        if not response.success:
+            raise RuntimeError(f"Provider chain failed: {response.error}")
+        if key is not None:
+            self.response_cache.set(key, response)
+        return response
+
+    def _complete(
+        self, prompt: str, params: Dict[str, Any], sample: int = 0
+    ) -> ProviderResponse:
+        key = None
+        if self.response_cache is not None:
+            key = self._cache_key(prompt, params, sample)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        # Extra samples must not be served from the providers' own caches
+        call_kwargs = dict(params, cache_bypass=True) if sample else params
+        if self._slots is None:
+            response = self.chain.call(prompt, **call_kwargs)
+        else:
+            with self._slots:
+                response = self.chain.call(prompt, **call_kwargs)
+        return self._finish(key, response)
+
+    async def _acomplete(
+        self, prompt: str, params: Dict[str, Any], sample: int = 0
+    ) -> ProviderResponse:
+        key = None
+        if self.response_cache is not None:
+            key = self._cache_key(prompt, params, sample)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        call_kwargs = dict(params, cache_bypass=True) if sample else params
+        if self._slots is None:
+            response = await self.chain.acall(prompt, **call_kwargs)
+        else:
+            await asyncio.to_thread(self._slots.acquire)
+            try:
+                response = await self.chain.acall(prompt, **call_kwargs)
+            finally:
+                self._slots.release()
+        return self._finish(key, response)
+
+    def forward(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        **kwargs,
+    ) -> SimpleNamespace:
+        """
+        Complete a prompt or conversation through the chain.
+
+        ``n`` > 1 requests independent samples, sent concurrently.
+
+        Args:
+            prompt: Plain prompt
+            messages: OpenAI-style chat messages
+            **kwargs: Generation parameters overriding the defaults
+
+        Returns:
+            OpenAI-style chat completion
+
+        Raises:
+            RuntimeError: If every provider in the chain failed
+        """
+        text = messages_to_prompt(prompt, messages)
+        n = max(1, int(kwargs.get("n") or self.kwargs.get("n") or 1))
+        params = self._params(kwargs)
+        if n == 1:
+            return to_completion([self._complete(text, params)], self.model)
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            responses = list(
+                pool.map(lambda i: self._complete(text, params, i), range(n))
+            )
+        return to_completion(responses, self.model)
+
+    def batch(
+        self,
+        prompts: Sequence[Union[str, List[Dict[str, Any]]]],
+        pack_size: Optional[int] = None,
+        **kwargs,
+    ) -> List[SimpleNamespace]:
+        """
+        Complete many prompts in one batched dispatch.
+
+        Cached completions are served first; the rest go to the chain in
+        one ``call_many`` (bounded by ``max_concurrency``, default 8), or
+        to a PromptPacker with ``pack_size`` > 1. A PriorityScheduler
+        client has no ``call_many``, so its prompts are sent one by one.
+
+        Args:
+            prompts: Plain prompts or OpenAI-style message lists
+            pack_size: Prompts per packed request (None = no packing)
+            **kwargs: Generation parameters overriding the defaults
+
+        Returns:
+            One OpenAI-style chat completion per prompt, in input order
+
+        Raises:
+            RuntimeError: If any prompt failed on every provider (the
+                successful ones are cached first)
+        """
+        texts = [
+            messages_to_prompt(prompt=p)
+            if isinstance(p, str)
+            else messages_to_prompt(messages=p)
+            for p in prompts
+        ]
+        params = self._params(kwargs)
+        keys: List[Optional[str]] = [None] * len(texts)
+        responses: Dict[int, ProviderResponse] = {}
+        for i, text in enumerate(texts):
+            if self.response_cache is not None:
+                keys[i] = self._cache_key(text, params, 0)
+            cached = self._cached(keys[i])
+            if cached is not None:
+                responses[i] = cached
+
+        pending = [i for i in range(len(texts)) if i not in responses]
+        fresh = self._dispatch([texts[i] for i in pending], pack_size, params)
+        error: Optional[RuntimeError] = None
+        for i, response in zip(pending, fresh):
+            try:
+                responses[i] = self._finish(keys[i], response)
+            except RuntimeError as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return [to_completion([responses[i]], self.model) for i in range(len(texts))]
+
+    def _dispatch(
+        self, texts: List[str], pack_size: Optional[int], params: Dict[str, Any]
+    ) -> List[ProviderResponse]:
+        """Send uncached prompts as one batch; responses in input order."""
+        if not texts:
+            return []
+        max_concurrency = self.max_concurrency or 8
+        if pack_size and pack_size > 1:
+            from .packing import PackingConfig, PromptPacker
+
+            packer = PromptPacker(
+                self.chain,
+                PackingConfig(pack_size=pack_size, max_concurrency=max_concurrency),
+            )
+            return packer.call_many(texts, **params)
+        if isinstance(self.chain, ProviderChain):
+            results = dict(
+                self.chain.call_many(texts, max_concurrency=max_concurrency, **params)
+            )
+            return [results[i] for i in range(len(texts))]
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(lambda text: self.chain.call(text, **params), texts))
+
+    async def aforward(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        **kwargs,
+    ) -> SimpleNamespace:
+        """Async version of ``forward``."""
+        text = messages_to_prompt(prompt, messages)
+        n = max(1, int(kwargs.get("n") or self.kwargs.get("n") or 1))
+        params = self._params(kwargs)
+        responses = await asyncio.gather(
+            *(self._acomplete(text, params, i) for i in range(n))
+        )
+        return to_completion(list(responses), self.model)
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests sent to the chain and completions served from the cache."""
+        with self._stats_lock:
+            return dict(self._counts)
@@ -0,0 +1,97 @@
+"""
+Hedged requests for ProviderChain.
+
+When the primary provider has not answered within a percentile of its
+recent latency, the same prompt is started on the next provider and the
+first successful response wins.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+import threading
+
+
+@dataclass
+class HedgeConfig:
+    """Configuration for hedged requests."""
+
+    enabled: bool = True
+    percentile: float = 0.95
+    min_samples: int = 5
+    initial_delay: float = 5.0
+    min_delay: float = 0.05
+    max_hedges: int = 1
+    window_size: int = 100
+
+
+@dataclass
+class HedgeStats:
+    """Counters describing what hedging cost and what it won."""
+
+    calls: int = 0
+    hedges_started: int = 0
+    hedges_won: int = 0
+    hedges_wasted: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "hedges_started": self.hedges_started,
+            "hedges_won": self.hedges_won,
+            "hedges_wasted": self.hedges_wasted,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of successful-call latencies per provider."""
+
+    def __init__(self, window_size: int = 100):
+        """
+        Initialize tracker.
+
+        Args:
+            window_size: Number of recent samples kept per provider
+        """
+        self.window_size = window_size
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider_name: str, latency: float) -> None:
+        """Record a successful call's latency."""
+        with self._lock:
+            samples = self._samples.get(provider_name)
+            if samples is None:
+                samples = deque(maxlen=self.window_size)
+                self._samples[provider_name] = samples
+            samples.append(latency)
+
+    def count(self, provider_name: str) -> int:
+        """Number of samples recorded for a provider."""
+        with self._lock:
+            return len(self._samples.get(provider_name, ()))
+
+    def percentile(self, provider_name: str, q: float) -> Optional[float]:
+        """
+        Latency percentile for a provider.
+
+        Args:
+            provider_name: Provider to look up
+            q: Percentile in [0, 1]
+
+        Returns:
+            Latency in seconds, or None if no samples were recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(provider_name, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[index]
+
+    def hedge_delay(self, provider_name: str, config: HedgeConfig) -> float:
+        """Seconds to wait on a provider before starting a hedge."""
+        if self.count(provider_name) < config.min_samples:
+            return config.initial_delay
+        delay = self.percentile(provider_name, config.percentile)
+        return max(config.min_delay, delay or config.initial_delay)
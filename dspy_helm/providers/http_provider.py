@@ -0,0 +1,481 @@
+"""
+Base classes for HTTP API providers.
+
+Shares the request/response handling of the HTTP-backed providers so the
+blocking (requests) and asyncio (httpx) transports stay in sync:
+- HTTPProvider: generic JSON-over-HTTP inference endpoint
+- OpenAICompatibleProvider: chat/completions dialect (Groq, OpenRouter, ...),
+  including server-sent event (SSE) streaming
+"""
+
+import asyncio
+from abc import abstractmethod
+from typing import Optional, Dict, Any, Tuple, TYPE_CHECKING
+import json
+import logging
+import threading
+import time
+import requests
+from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from .params import GenerationParams, truncate_at_stop
+from .sessions import get_pool_size, get_session
+from .streaming import iter_sse_data
+
+if TYPE_CHECKING:
+    from .streaming import ChunkSource
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPProvider(BaseProvider):
+    """Abstract base class for providers backed by an HTTP endpoint."""
+
+    # Request timeout in seconds (a call's ``timeout`` parameter overrides it)
+    TIMEOUT_SECONDS: float = 60
+
+    # Error messages for well-known status codes; others become "HTTP <code>: ..."
+    STATUS_ERRORS: Dict[int, str] = {}
+
+    # Status codes that mark a response as rate limited (triggers retry/backoff)
+    RATE_LIMIT_STATUS = (429,)
+
+    # Headers sent with every request (auth headers come from _headers())
+    DEFAULT_HEADERS: Dict[str, str] = {
+        "User-Agent": "DSPy-HELM/1.0",
+        "Content-Type": "application/json",
+    }
+
+    def __init__(
+        self,
+        name: str,
+        subcommand: str,
+        model: str,
+        base_url: str,
+        rate_limit: Optional[RateLimitConfig] = None,
+        **kwargs,
+    ):
+        """
+        Initialize HTTP provider.
+
+        Args:
+            name: Provider display name
+            subcommand: Provider identifier (e.g., "groq")
+            model: Default model to use
+            base_url: API base URL
+            rate_limit: Rate limiting configuration
+            **kwargs: Additional BaseProvider options (e.g., cache)
+        """
+        super().__init__(
+            name=name,
+            command="api",
+            subcommand=subcommand,
+            model=model,
+            rate_limit=rate_limit,
+            **kwargs,
+        )
+        self.base_url = base_url
+        self.session = get_session(base_url)
+        # Event loops run in one thread each (e.g., asyncio.run in several
+        # worker threads), so each thread keeps the client of its own loop
+        self._async_local = threading.local()
+
+    @property
+    def endpoint(self) -> str:
+        """URL that prompts are POSTed to."""
+        return self.base_url
+
+    @property
+    def default_params(self) -> GenerationParams:
+        return GenerationParams(timeout=self.TIMEOUT_SECONDS)
+
+    def _headers(self) -> Dict[str, str]:
+        """Headers for every request (override to add authentication)."""
+        return dict(self.DEFAULT_HEADERS)
+
+    def _not_configured_error(self) -> str:
+        """Error message returned when is_configured() is False."""
+        return f"{self.name} is not configured."
+
+    @abstractmethod
+    def _build_payload(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Build the JSON request body.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Call arguments (see ``generation_params``)
+
+        Returns:
+            JSON-serializable request body
+        """
+        ...
+
+    @abstractmethod
+    def _parse_success(
+        self, data: Any, prompt: str, latency: float
+    ) -> ProviderResponse:
+        """
+        Convert a decoded 200 response body into a ProviderResponse.
+
+        Args:
+            data: Decoded JSON body
+            prompt: Prompt that was sent
+            latency: Request latency in seconds
+
+        Returns:
+            ProviderResponse with result
+        """
+        ...
+
+    def _failure(self, error: str, latency: float, **kwargs) -> ProviderResponse:
+        """Build a failed ProviderResponse for this provider."""
+        return ProviderResponse(
+            success=False,
+            error=error,
+            provider=self.name,
+            model=self.model,
+            latency_seconds=latency,
+            **kwargs,
+        )
+
+    def _to_response(
+        self, status_code: int, http_response: Any, prompt: str, latency: float
+    ) -> ProviderResponse:
+        """
+        Map an HTTP response (requests or httpx) to a ProviderResponse.
+
+        Args:
+            status_code: HTTP status code
+            http_response: Response object exposing json() and text
+            prompt: Prompt that was sent
+            latency: Request latency in seconds
+
+        Returns:
+            ProviderResponse with result
+        """
+        retry_after = self.limiter.observe_headers(
+            getattr(http_response, "headers", None)
+        )
+
+        if status_code == 200:
+            return self._parse_success(http_response.json(), prompt, latency)
+
+        error = self.STATUS_ERRORS.get(status_code)
+        if error is None:
+            error = f"HTTP {status_code}: {http_response.text[:200]}"
+        response = self._failure(
+            error, latency, rate_limited=status_code in self.RATE_LIMIT_STATUS
+        )
+        if retry_after is not None:
+            response.metadata["retry_after"] = retry_after
+        return response
+
+    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Execute prompt via the HTTP API.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        start_time = time.time()
+
+        if not self.is_configured():
+            return self._failure(self._not_configured_error(), time.time() - start_time)
+
+        timeout = self.generation_params(kwargs).timeout
+        try:
+            response = self.session.post(
+                self.endpoint,
+                json=self._build_payload(prompt, **kwargs),
+                headers=self._headers(),
+                timeout=timeout,
+            )
+            return self._to_response(
+                response.status_code, response, prompt, time.time() - start_time
+            )
+
+        except requests.exceptions.Timeout:
+            return self._failure(
+                f"Request timed out after {timeout:g} seconds",
+                time.time() - start_time,
+            )
+
+        except Exception as e:
+            return self._failure(str(e), time.time() - start_time)
+
+    def _get_async_client(self):
+        """Return an httpx.AsyncClient bound to the running event loop."""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        local = self._async_local
+        if getattr(local, "loop", None) is not loop:
+            pool_size = get_pool_size()
+            local.client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                )
+            )
+            local.loop = loop
+        return local.client
+
+    async def _aexecute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """
+        Execute prompt via the HTTP API on the running event loop.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse with result
+        """
+        import httpx
+
+        start_time = time.time()
+
+        if not self.is_configured():
+            return self._failure(self._not_configured_error(), time.time() - start_time)
+
+        timeout = self.generation_params(kwargs).timeout
+        try:
+            response = await self._get_async_client().post(
+                self.endpoint,
+                json=self._build_payload(prompt, **kwargs),
+                headers=self._headers(),
+                timeout=timeout,
+            )
+            return self._to_response(
+                response.status_code, response, prompt, time.time() - start_time
+            )
+
+        except httpx.TimeoutException:
+            return self._failure(
+                f"Request timed out after {timeout:g} seconds",
+                time.time() - start_time,
+            )
+
+        except Exception as e:
+            return self._failure(str(e), time.time() - start_time)
+
+    async def aclose(self) -> None:
+        """Close this thread's async client, if one was created."""
+        client = getattr(self._async_local, "client", None)
+        if client is not None:
+            await client.aclose()
+            self._async_local.client = None
+            self._async_local.loop = None
+
+
+class OpenAICompatibleProvider(HTTPProvider):
+    """Base class for providers speaking the OpenAI chat/completions dialect."""
+
+    # Generation defaults sent when a call does not set them (None = omit
+    # from payload)
+    MAX_TOKENS: Optional[int] = 1000
+    TEMPERATURE: Optional[float] = 0.7
+
+    # Stop sequences the API accepts; further ones are applied client-side
+    MAX_STOP_SEQUENCES = 4
+
+    STATUS_ERRORS = {
+        401: "Invalid API key.",
+        429: "Rate limit exceeded. Try again later.",
+    }
+
+    @property
+    def default_params(self) -> GenerationParams:
+        return GenerationParams(
+            max_tokens=self.MAX_TOKENS,
+            temperature=self.TEMPERATURE,
+            timeout=self.TIMEOUT_SECONDS,
+        )
+
+    def _build_payload(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Build a chat/completions request body."""
+        params = self.generation_params(kwargs)
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if params.max_tokens is not None:
+            payload["max_tokens"] = params.max_tokens
+        if params.temperature is not None:
+            payload["temperature"] = params.temperature
+        if params.stop:
+            payload["stop"] = list(params.stop[: self.MAX_STOP_SEQUENCES])
+        if params.seed is not None:
+            payload["seed"] = params.seed
+        return payload
+
+    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Send the prompt; stop sequences past the API's limit are cut locally."""
+        response = super()._execute_cli(prompt, **kwargs)
+        return self._apply_extra_stops(response, kwargs)
+
+    async def _aexecute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``_execute_cli``."""
+        response = await super()._aexecute_cli(prompt, **kwargs)
+        return self._apply_extra_stops(response, kwargs)
+
+    def _extra_stops(self, kwargs: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+        """The call's stop sequences if some must be applied locally."""
+        stop = self.generation_params(kwargs).stop
+        if stop and len(stop) > self.MAX_STOP_SEQUENCES:
+            return stop
+        return None
+
+    def _apply_extra_stops(
+        self, response: ProviderResponse, kwargs: Dict[str, Any]
+    ) -> ProviderResponse:
+        stop = self._extra_stops(kwargs)
+        if response.success and stop:
+            response.content = truncate_at_stop(response.content, stop)
+        return response
+
+    def _parse_success(
+        self, data: Any, prompt: str, latency: float
+    ) -> ProviderResponse:
+        """Extract the first choice from a chat/completions response."""
+        usage = data.get("usage") or {}
+        return ProviderResponse(
+            success=True,
+            content=data["choices"][0]["message"]["content"],
+            provider=self.name,
+            model=self.model,
+            latency_seconds=latency,
+            tokens_used=usage.get("total_tokens", 0),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    def _stream_chunks(self, prompt: str, **kwargs) -> "ChunkSource":
+        """
+        Stream chat/completions deltas over server-sent events.
+
+        Rate-limited attempts are retried before the first token; once text
+        is flowing, a broken connection ends the stream with an error. Stop
+        sequences past MAX_STOP_SEQUENCES are matched on the text so far:
+        a possible partial match is held back and the stream ends at a hit.
+
+        Args:
+            prompt: Prompt to send
+            **kwargs: Additional arguments
+
+        Returns:
+            Generator of text chunks returning the final response
+        """
+        start_time = time.time()
+
+        if not self.is_configured():
+            return self._failure(self._not_configured_error(), time.time() - start_time)
+
+        timeout = self.generation_params(kwargs).timeout
+        payload = self._build_payload(prompt, **kwargs)
+        payload["stream"] = True
+        max_retries = self.rate_limit.max_retries if self.rate_limit.enabled else 0
+
+        for attempt in range(max_retries + 1):
+            self.metrics.queued(self.limiter.acquire())
+            # In flight from the request until the body is read or closed
+            started = self.metrics.start()
+            try:
+                http_response = self.session.post(
+                    self.endpoint,
+                    json=payload,
+                    headers=self._headers(),
+                    timeout=timeout,
+                    stream=True,
+                )
+            except requests.exceptions.Timeout:
+                self.metrics.finish(started)
+                return self._failure(
+                    f"Request timed out after {timeout:g} seconds",
+                    time.time() - start_time,
+                )
+            except Exception as e:
+                self.metrics.finish(started)
+                return self._failure(str(e), time.time() - start_time)
+
+            if http_response.status_code == 200:
+                break
+
+            response = self._to_response(
+                http_response.status_code,
+                http_response,
+                prompt,
+                time.time() - start_time,
+            )
+            http_response.close()
+            self.metrics.finish(started)
+            if not response.rate_limited or attempt == max_retries:
+                return response
+
+            wait_time = self._backoff_delay(attempt, response)
+            logger.warning(
+                f"Rate limited by {self.name}, retrying stream in {wait_time}s "
+                f"(attempt {attempt + 1}/{max_retries})"
+            )
+            time.sleep(wait_time)
+
+        self.limiter.observe_headers(getattr(http_response, "headers", None))
+        usage: Dict[str, Any] = {}
+        finish_reason = None
+        stop = self._extra_stops(kwargs)
+        # Text received, and how much of it has been yielded
+        text_so_far, sent = "", 0
+        hold_back = max(len(sequence) for sequence in stop) - 1 if stop else 0
+        try:
+            for data in iter_sse_data(http_response.iter_lines()):
+                event = json.loads(data)
+                # OpenRouter reports usage on the last chunk, Groq in x_groq
+                usage = (
+                    event.get("usage")
+                    or (event.get("x_groq") or {}).get("usage")
+                    or usage
+                )
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                finish_reason = choices[0].get("finish_reason") or finish_reason
+                text = (choices[0].get("delta") or {}).get("content")
+                if not text:
+                    continue
+                if not stop:
+                    yield text
+                    continue
+                text_so_far += text
+                cut = truncate_at_stop(text_so_far, stop)
+                if len(cut) < len(text_so_far):
+                    if len(cut) > sent:
+                        yield cut[sent:]
+                    text_so_far, finish_reason = cut, "stop"
+                    break
+                ready = len(text_so_far) - hold_back
+                if ready > sent:
+                    yield text_so_far[sent:ready]
+                    sent = ready
+            else:
+                if len(text_so_far) > sent:
+                    yield text_so_far[sent:]
+        except Exception as e:
+            return self._failure(f"Stream interrupted: {e}", time.time() - start_time)
+        finally:
+            http_response.close()
+            self.metrics.finish(started)
+
+        response = ProviderResponse(
+            success=True,
+            provider=self.name,
+            model=self.model,
+            tokens_used=usage.get("total_tokens", 0),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+        if finish_reason:
+            response.metadata["finish_reason"] = finish_reason
+        return response
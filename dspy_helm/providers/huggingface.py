@@ -7,14 +7,17 @@ Works well for code generation and text tasks.
 https://huggingface.co/inference-api
 """
 
+import logging
 import os
-from typing import Optional
-import requests
-import time
-from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from typing import Optional, Dict, Any
+from .base import ProviderResponse, RateLimitConfig
+from .http_provider import HTTPProvider
+from .params import GenerationParams, truncate_at_stop
 
+logger = logging.getLogger(__name__)
 
-class HuggingFaceProvider(BaseProvider):
+
+class HuggingFaceProvider(HTTPProvider):
     """Provider for HuggingFace Inference API - free tier available."""
 
     # Free tier models available on HuggingFace
@@ -26,10 +29,35 @@ class HuggingFaceProvider(BaseProvider):
         "deepseek-coder-1.3b-instruct": "DeepSeek Coder 1.3B (code specialized)",
     }
 
+    # Serverless Inference API limits (input + max_new_tokens), well below
+    # the models' native context lengths
+    CONTEXT_WINDOWS = {
+        "meta-llama/Llama-3.2-3B-Instruct": 8192,
+        "meta-llama/Llama-3.2-1B-Instruct": 4096,
+        "microsoft/Phi-3.5-mini-instruct": 4096,
+        "Qwen/Qwen2.5-Coder-1.5B-Instruct": 8192,
+        "deepseek-coder-1.3b-instruct": 4096,
+    }
+
+    STATUS_ERRORS = {
+        401: "Invalid API key. Check HF_API_KEY (or HUGGINGFACE_API_KEY).",
+        503: "Model is loading. Please try again later.",
+        429: "Rate limit exceeded. Try again later.",
+    }
+
+    # Cold models answer 503 with an estimated_time; the rate-limit retry
+    # path waits for them, at most this long per retry (0 = fail immediately)
+    MAX_LOADING_WAIT_SECONDS = 60.0
+
+    # Wait used when a loading response carries no estimated_time
+    DEFAULT_LOADING_WAIT_SECONDS = 10.0
+
     def __init__(
         self,
         model: str = "meta-llama/Llama-3.2-3B-Instruct",
         rate_limit: Optional[RateLimitConfig] = None,
+        max_loading_wait: Optional[float] = None,
+        **kwargs,
     ):
         """
         Initialize HuggingFace provider.
@@ -37,135 +65,162 @@ class HuggingFaceProvider(BaseProvider):
         Args:
             model: Model to use (default: meta-llama/Llama-3.2-3B-Instruct)
             rate_limit: Rate limiting configuration
+            max_loading_wait: Longest wait for a cold model before each
+                retry (default: MAX_LOADING_WAIT_SECONDS)
+            **kwargs: Additional BaseProvider options (e.g., cache)
         """
         super().__init__(
             name="HuggingFace Inference API",
-            command="api",
             subcommand="huggingface",
             model=model,
+            base_url="https://api-inference.huggingface.co/models/",
             rate_limit=rate_limit,
+            **kwargs,
         )
-        self.base_url = "https://api-inference.huggingface.co/models/"
         self.api_key = os.environ.get("HF_API_KEY", "") or os.environ.get(
             "HUGGINGFACE_API_KEY", ""
         )
-        self.session = requests.Session()
-        headers = {
-            "User-Agent": "DSPy-HELM/1.0",
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        self.session.headers.update(headers)
+        self.max_loading_wait = (
+            self.MAX_LOADING_WAIT_SECONDS
+            if max_loading_wait is None
+            else max_loading_wait
+        )
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}{self.model}"
 
     def is_configured(self) -> bool:
         """Check if HuggingFace API key is configured (optional for free tier)."""
         # Free tier works without API key but has rate limits
         return True  # Always available, optionally with API key for higher limits
 
+    def _headers(self) -> Dict[str, str]:
+        headers = {"User-Agent": "DSPy-HELM/1.0"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    @property
+    def default_params(self) -> GenerationParams:
+        return GenerationParams(
+            max_tokens=1000, temperature=0.7, timeout=self.TIMEOUT_SECONDS
+        )
+
+    def _build_payload(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        # HF uses a different format - inputs field instead of messages
+        params = self.generation_params(kwargs)
+        parameters: Dict[str, Any] = {
+            "max_new_tokens": params.max_tokens,
+            "return_full_text": False,
+        }
+        # The API rejects temperature 0; greedy decoding is do_sample=False
+        if params.temperature:
+            parameters["temperature"] = params.temperature
+        else:
+            parameters["do_sample"] = False
+        if params.stop:
+            parameters["stop"] = list(params.stop)
+        if params.seed is not None:
+            parameters["seed"] = params.seed
+        return {"inputs": prompt, "parameters": parameters}
+
+    def _to_response(
+        self, status_code: int, http_response: Any, prompt: str, latency: float
+    ) -> ProviderResponse:
+        response = super()._to_response(status_code, http_response, prompt, latency)
+        if status_code != 503:
+            return response
+
+        # {"error": "Model ... is currently loading", "estimated_time": 20.5}
+        try:
+            body = http_response.json()
+        except Exception:
+            body = None
+        if not isinstance(body, dict):
+            return response
+        estimated_time = body.get("estimated_time")
+        if estimated_time is None and "loading" not in str(body.get("error", "")):
+            return response
+
+        response.metadata["model_loading"] = True
+        if isinstance(estimated_time, (int, float)):
+            response.metadata["estimated_time"] = float(estimated_time)
+            response.error = (
+                f"Model {self.model} is loading (ready in ~{estimated_time:.0f}s)."
+            )
+        if self.max_loading_wait > 0:
+            # Retry like a 429 so the wait goes through the limiter, the
+            # retry budget and the metrics instead of a private sleep loop
+            delay = response.metadata.get(
+                "estimated_time", self.DEFAULT_LOADING_WAIT_SECONDS
+            )
+            response.rate_limited = True
+            response.metadata["retry_after"] = min(
+                max(delay, 1.0), self.max_loading_wait
+            )
+        return response
+
     def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Send the prompt and cut the reply at any stop sequence."""
+        return self._apply_stop(super()._execute_cli(prompt, **kwargs), kwargs)
+
+    async def _aexecute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``_execute_cli``."""
+        response = await super()._aexecute_cli(prompt, **kwargs)
+        return self._apply_stop(response, kwargs)
+
+    def _apply_stop(
+        self, response: ProviderResponse, kwargs: Dict[str, Any]
+    ) -> ProviderResponse:
+        # Some models behind the API ignore "stop"; cut the text locally too
+        if response.success:
+            stop = self.generation_params(kwargs).stop
+            response.content = truncate_at_stop(response.content, stop)
+        return response
+
+    def warm_up(self) -> bool:
         """
-        Execute prompt via HuggingFace Inference API.
+        Ping the model so the Inference API loads it, or keeps it loaded.
 
-        Args:
-            prompt: Prompt to send
-            **kwargs: Additional arguments
+        Does not wait for loading to finish.
 
         Returns:
-            ProviderResponse with result
+            True if the model answered, False if it is loading or unreachable
         """
-        start_time = time.time()
-
+        self.limiter.acquire()
         try:
-            # HF uses a different format - inputs field instead of messages
             response = self.session.post(
-                f"{self.base_url}{self.model}",
+                self.endpoint,
                 json={
-                    "inputs": prompt,
-                    "parameters": {
-                        "max_new_tokens": 1000,
-                        "temperature": 0.7,
-                        "return_full_text": False,
-                    },
+                    "inputs": "ping",
+                    "parameters": {"max_new_tokens": 1, "return_full_text": False},
                 },
-                timeout=60,
+                headers=self._headers(),
+                timeout=self.TIMEOUT_SECONDS,
             )
-
-            latency = time.time() - start_time
-
-            if response.status_code == 200:
-                data = response.json()
-                # HF returns array with generated text
-                if isinstance(data, list) and len(data) > 0:
-                    content = data[0].get("generated_text", "")
-                    # Remove the input prompt from response if included
-                    if content.startswith(prompt):
-                        content = content[len(prompt) :].strip()
-                    return ProviderResponse(
-                        success=True,
-                        content=content,
-                        provider=self.name,
-                        model=self.model,
-                        latency_seconds=latency,
-                    )
-                else:
-                    return ProviderResponse(
-                        success=False,
-                        error=f"Unexpected response format: {data}",
-                        provider=self.name,
-                        model=self.model,
-                        latency_seconds=latency,
-                    )
-            elif response.status_code == 401:
-                return ProviderResponse(
-                    success=False,
-                    error="Model loading. Try again in a few seconds.",
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-            elif response.status_code == 503:
-                return ProviderResponse(
-                    success=False,
-                    error="Model is loading. Please try again later.",
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-            elif response.status_code == 429:
-                return ProviderResponse(
-                    success=False,
-                    error="Rate limit exceeded. Try again later.",
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-            else:
-                error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                return ProviderResponse(
-                    success=False,
-                    error=error_msg,
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-
-        except requests.exceptions.Timeout:
-            return ProviderResponse(
-                success=False,
-                error="Request timed out after 60 seconds",
-                provider=self.name,
-                model=self.model,
-                latency_seconds=time.time() - start_time,
-            )
-
         except Exception as e:
+            logger.debug(f"Warm-up ping to {self.model} failed: {e}")
+            return False
+        return response.status_code == 200
+
+    def _parse_success(
+        self, data: Any, prompt: str, latency: float
+    ) -> ProviderResponse:
+        # HF returns array with generated text
+        if isinstance(data, list) and len(data) > 0:
+            content = data[0].get("generated_text", "")
+            # Remove the input prompt from response if included
+            if content.startswith(prompt):
+                content = content[len(prompt) :].strip()
             return ProviderResponse(
-                success=False,
-                error=str(e),
+                success=True,
+                content=content,
                 provider=self.name,
                 model=self.model,
-                latency_seconds=time.time() - start_time,
+                latency_seconds=latency,
             )
+        return self._failure(f"Unexpected response format: {data}", latency)
 
     def list_models(self) -> list:
         """List all available free models."""
@@ -0,0 +1,272 @@
+"""
+Provider load-test harness.
+
+Drives the real HTTP providers (request building, retries, rate limiting,
+SSE parsing) against the local stand-in server and reports latency
+percentiles, throughput and error rates.
+
+Usage:
+    python -m dspy_helm.providers.loadtest --requests 200 --concurrency 16 \\
+        --rate-limit-rate 0.05 --unavailable-rate 0.02 --stream
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+import argparse
+import json
+import math
+import time
+
+from .base import BaseProvider, ProviderChain, ProviderResponse, RateLimitConfig
+from .standin import LATENCY_DISTRIBUTIONS, StandInConfig, StandInServer
+
+LOADTEST_PROVIDERS = ("groq", "openrouter", "opencode_zen")
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples (any order)
+        q: Percentile in [0, 100]
+
+    Returns:
+        The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class LoadTestReport:
+    """Results of one load-test run against one provider."""
+
+    provider: str
+    requests: int = 0
+    successes: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    retry_wait_seconds: float = 0.0
+    failovers: int = 0
+    wall_seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list, repr=False)
+    ttfts: List[float] = field(default_factory=list, repr=False)
+    error_samples: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, response: ProviderResponse, latency: float) -> None:
+        """Account for one finished request."""
+        self.requests += 1
+        self.latencies.append(latency)
+        self.retries += response.metadata.get("retries", 0)
+        self.retry_wait_seconds += response.metadata.get("retry_wait_seconds", 0.0)
+        if response.success:
+            self.successes += 1
+            self.completion_tokens += response.completion_tokens
+            self.failovers += response.metadata.get("failovers", 0)
+            ttft = response.metadata.get("ttft_seconds")
+            if ttft is not None:
+                self.ttfts.append(ttft)
+            return
+        if response.rate_limited:
+            self.rate_limited += 1
+        else:
+            self.errors += 1
+        key = (response.error or "unknown")[:80]
+        self.error_samples[key] = self.error_samples.get(key, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate metrics.
+
+        Returns:
+            JSON-serializable summary (latencies in seconds)
+        """
+        total = self.requests or 1
+        wall = self.wall_seconds or 1.0
+        summary = {
+            "provider": self.provider,
+            "requests": self.requests,
+            "successes": self.successes,
+            "throughput_rps": round(self.requests / wall, 2),
+            "tokens_per_second": round(self.completion_tokens / wall, 2),
+            "error_rate": round((self.errors + self.rate_limited) / total, 4),
+            "rate_limited_rate": round(self.rate_limited / total, 4),
+            "p50": round(percentile(self.latencies, 50), 4),
+            "p95": round(percentile(self.latencies, 95), 4),
+            "p99": round(percentile(self.latencies, 99), 4),
+            "retries": self.retries,
+            "retry_overhead": round(
+                self.retry_wait_seconds / (sum(self.latencies) or 1.0), 4
+            ),
+            "failovers": self.failovers,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "errors": dict(self.error_samples),
+        }
+        if self.ttfts:
+            summary["ttft_p50"] = round(percentile(self.ttfts, 50), 4)
+            summary["ttft_p95"] = round(percentile(self.ttfts, 95), 4)
+        return summary
+
+
+def run_load_test(
+    provider: Union[BaseProvider, ProviderChain],
+    prompts: Sequence[str],
+    concurrency: int = 8,
+    stream: bool = False,
+) -> LoadTestReport:
+    """
+    Send every prompt through a provider with bounded concurrency.
+
+    Latency is measured end to end per call, so retries and rate-limit
+    waits are included.
+
+    Args:
+        provider: Provider or ProviderChain under test
+        prompts: Prompts to send, one request each
+        concurrency: Concurrent in-flight requests
+        stream: Use ``provider.stream`` and record time to first token
+
+    Returns:
+        LoadTestReport for the run
+    """
+    report = LoadTestReport(provider=getattr(provider, "name", str(provider)))
+
+    def one(prompt: str):
+        start = time.time()
+        if stream:
+            response = provider.stream(prompt, cache_bypass=True).collect()
+        else:
+            response = provider.call(prompt, cache_bypass=True)
+        latency = time.time() - start
+        # A cassette replay takes no time; count the recorded request's
+        return response, response.metadata.get("recorded_latency_seconds", latency)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for response, latency in pool.map(one, prompts):
+            report.record(response, latency)
+    report.wall_seconds = time.time() - started
+    return report
+
+
+def build_provider(
+    name: str, server: StandInServer, rate_limit: Optional[RateLimitConfig] = None
+) -> BaseProvider:
+    """
+    Create a real provider pointed at the stand-in server.
+
+    Args:
+        name: One of LOADTEST_PROVIDERS
+        server: Running stand-in server
+        rate_limit: Rate limiting configuration for the provider
+
+    Returns:
+        Configured provider (uncached, with a placeholder API key)
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    from .groq import GroqProvider
+    from .opencode_zen import OpenCodeZenProvider
+    from .openrouter import OpenRouterProvider
+
+    if name == "groq":
+        provider = GroqProvider(
+            base_url=server.chat_completions_url, rate_limit=rate_limit
+        )
+        provider.api_key = "standin"
+        return provider
+    if name == "openrouter":
+        return OpenRouterProvider(
+            api_key="standin", base_url=server.api_base_url, rate_limit=rate_limit
+        )
+    if name == "opencode_zen":
+        return OpenCodeZenProvider(
+            base_url=server.chat_completions_url, rate_limit=rate_limit
+        )
+
+    available = ", ".join(LOADTEST_PROVIDERS)
+    raise ValueError(f"Unknown provider: '{name}'. Available: {available}")
+
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    """Render summaries as a fixed-width text table."""
+    header = (
+        f"{'provider':<32} {'reqs':>6} {'rps':>8} {'err%':>7} {'429%':>7} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for s in summaries:
+        lines.append(
+            f"{s['provider'][:32]:<32} {s['requests']:>6} {s['throughput_rps']:>8.2f} "
+            f"{s['error_rate'] * 100:>6.1f}% {s['rate_limited_rate'] * 100:>6.1f}% "
+            f"{s['p50']:>7.3f}s {s['p95']:>7.3f}s {s['p99']:>7.3f}s"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Load-test HTTP providers against a local stand-in server"
+    )
+    parser.add_argument(
+        "--providers",
+        default="groq,openrouter",
+        help=f"Comma-separated providers ({', '.join(LOADTEST_PROVIDERS)})",
+    )
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true", help="Use SSE streaming")
+    parser.add_argument(
+        "--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal"
+    )
+    parser.add_argument("--latency-mean", type=float, default=0.2)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--unavailable-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument(
+        "--max-retries", type=int, default=2, help="Provider retries on 429"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print JSON summaries")
+    args = parser.parse_args(argv)
+
+    config = StandInConfig(
+        latency_distribution=args.latency_distribution,
+        latency_mean=args.latency_mean,
+        latency_spread=args.latency_spread,
+        rate_limit_rate=args.rate_limit_rate,
+        unavailable_rate=args.unavailable_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    rate_limit = RateLimitConfig(
+        max_retries=args.max_retries, backoff_factor=0.1, max_backoff=5.0
+    )
+    prompts = [f"Load test prompt {i}" for i in range(args.requests)]
+
+    summaries = []
+    with StandInServer(config) as server:
+        for name in [n.strip() for n in args.providers.split(",") if n.strip()]:
+            provider = build_provider(name, server, rate_limit)
+            report = run_load_test(provider, prompts, args.concurrency, args.stream)
+            summaries.append(report.summary())
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print(format_table(summaries))
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
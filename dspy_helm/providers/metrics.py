@@ -0,0 +1,136 @@
+"""
+Concurrency counters for providers.
+
+Evaluator and the optimizers call one provider instance from many threads
+(``num_threads``, 16 by default). ConcurrencyMetrics counts requests in
+flight upstream, time spent queued in the rate limiter and time spent
+busy, so ``num_threads`` can be sized from data: a mean concurrency well
+below ``num_threads`` with long queue waits means the threads are just
+waiting on the provider's rate limit.
+
+Each thread updates its own counters without taking a lock; readers sum
+the per-thread counters, so a snapshot taken mid-request may be off by
+the requests in progress at that instant.
+"""
+
+from typing import Any, Dict, List
+import threading
+import time
+
+
+class _ThreadCounters:
+    """Counters owned and written by a single thread."""
+
+    __slots__ = (
+        "started",
+        "finished",
+        "busy_seconds",
+        "queued",
+        "queue_wait_seconds",
+        "max_queue_wait",
+        "peak_in_flight",
+    )
+
+    def __init__(self):
+        self.started = 0
+        self.finished = 0
+        self.busy_seconds = 0.0
+        self.queued = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait = 0.0
+        self.peak_in_flight = 0
+
+
+class ConcurrencyMetrics:
+    """In-flight requests, queue wait and busy time of one provider."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._threads: List[_ThreadCounters] = []
+        self._register_lock = threading.Lock()
+        self._since = time.monotonic()
+
+    def _counters(self) -> _ThreadCounters:
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = _ThreadCounters()
+            # Once per thread; the hot path never takes this lock
+            with self._register_lock:
+                self._threads.append(counters)
+            self._local.counters = counters
+        return counters
+
+    @property
+    def in_flight(self) -> int:
+        """Requests sent upstream and not yet answered."""
+        threads = list(self._threads)
+        # Clamped: a request started before reset() finishes after it
+        return max(
+            0, sum(c.started for c in threads) - sum(c.finished for c in threads)
+        )
+
+    def start(self) -> float:
+        """
+        Count a request going upstream.
+
+        Returns:
+            Start timestamp to pass to ``finish``
+        """
+        counters = self._counters()
+        counters.started += 1
+        counters.peak_in_flight = max(counters.peak_in_flight, self.in_flight)
+        return time.monotonic()
+
+    def finish(self, started_at: float) -> None:
+        """Count a request's answer (or failure)."""
+        counters = self._counters()
+        counters.finished += 1
+        counters.busy_seconds += time.monotonic() - started_at
+
+    def queued(self, seconds: float) -> None:
+        """Record time a request waited before it could be sent."""
+        if seconds <= 0:
+            return
+        counters = self._counters()
+        counters.queued += 1
+        counters.queue_wait_seconds += seconds
+        counters.max_queue_wait = max(counters.max_queue_wait, seconds)
+
+    def reset(self) -> None:
+        """Start a new measurement window (e.g., per evaluation run)."""
+        with self._register_lock:
+            self._threads = []
+            self._local = threading.local()
+            self._since = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the counters.
+
+        Returns:
+            requests, in_flight, peak_in_flight, threads, queued,
+            queue_wait_seconds, mean_queue_wait, max_queue_wait,
+            busy_seconds and mean_concurrency (busy time per second of the
+            window, i.e. the average number of requests in flight)
+        """
+        threads = list(self._threads)
+        started = sum(c.started for c in threads)
+        finished = sum(c.finished for c in threads)
+        queued = sum(c.queued for c in threads)
+        queue_wait = sum(c.queue_wait_seconds for c in threads)
+        busy = sum(c.busy_seconds for c in threads)
+        window = max(time.monotonic() - self._since, 1e-9)
+        return {
+            "requests": finished,
+            "in_flight": max(0, started - finished),
+            "peak_in_flight": max((c.peak_in_flight for c in threads), default=0),
+            "threads": len(threads),
+            "queued": queued,
+            "queue_wait_seconds": round(queue_wait, 4),
+            "mean_queue_wait": round(queue_wait / queued, 4) if queued else 0.0,
+            "max_queue_wait": round(
+                max((c.max_queue_wait for c in threads), default=0.0), 4
+            ),
+            "busy_seconds": round(busy, 4),
+            "mean_concurrency": round(busy / window, 3),
+        }
@@ -9,20 +9,35 @@ Adapter for OpenCode Zen gateway with support for:
 - gpt-5-nano (FREE)
 """
 
-from typing import Optional
-import openai
-import time
-from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from typing import Optional, Dict
+from .base import RateLimitConfig
+from .http_provider import OpenAICompatibleProvider
 
 
-class OpenCodeZenProvider(BaseProvider):
+class OpenCodeZenProvider(OpenAICompatibleProvider):
     """Provider for OpenCode Zen gateway (OpenAI-compatible, all models FREE)."""
 
+    TIMEOUT_SECONDS = 120
+
+    # The gateway applies each model's own defaults
+    MAX_TOKENS = None
+    TEMPERATURE = None
+
+    CONTEXT_WINDOWS = {
+        "grok-code": 256000,
+        "minimax-m2.1-free": 204800,
+        "glm-4.7-free": 204800,
+        "big-pickle": 200000,
+        "gpt-5-nano": 400000,
+    }
+
     def __init__(
         self,
         model: str = "grok-code",
         api_key: Optional[str] = None,
         rate_limit: Optional[RateLimitConfig] = None,
+        base_url: Optional[str] = None,
+        **kwargs,
     ):
         """
         Initialize OpenCode Zen provider.
@@ -31,79 +46,20 @@ class OpenCodeZenProvider(BaseProvider):
             model: Model to use (default: grok-code)
             api_key: Not required for free models (use placeholder)
             rate_limit: Rate limiting configuration
+            base_url: Override the chat/completions endpoint (e.g. a local stand-in)
+            **kwargs: Additional BaseProvider options (e.g., cache)
         """
         super().__init__(
             name="OpenCode Zen (Grok Code Fast)",
-            command="api",
             subcommand="opencode-zen",
             model=model,
+            base_url=base_url or "https://opencode.ai/zen/v1/chat/completions",
             rate_limit=rate_limit,
+            **kwargs,
         )
         self.api_key = api_key or "not-required"  # Free models don't need key
-        self.base_url = "https://opencode.ai/zen/v1/chat/completions"
-
-    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
-        """
-        Execute prompt via OpenCode Zen API.
-
-        Args:
-            prompt: Prompt to send
-            **kwargs: Additional arguments
-
-        Returns:
-            ProviderResponse with result
-        """
-        start_time = time.time()
-
-        try:
-            client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                timeout=120,
-            )
-
-            latency = time.time() - start_time
-
-            content = response.choices[0].message.content
-
-            return ProviderResponse(
-                success=True,
-                content=content,
-                provider=self.name,
-                model=self.model,
-                latency_seconds=latency,
-                tokens_used=response.usage.total_tokens if response.usage else 0,
-            )
-
-        except openai.RateLimitError as e:
-            return ProviderResponse(
-                success=False,
-                error=str(e),
-                provider=self.name,
-                model=self.model,
-                rate_limited=True,
-                latency_seconds=time.time() - start_time,
-            )
-
-        except Exception as e:
-            return ProviderResponse(
-                success=False,
-                error=str(e),
-                provider=self.name,
-                model=self.model,
-                latency_seconds=time.time() - start_time,
-            )
-
-    def _is_rate_limited(self, output: str) -> bool:
-        """Detect rate limiting indicators."""
-        rate_limit_indicators = [
-            "rate limit",
-            "too many requests",
-            "429",
-            "quota exceeded",
-        ]
 
-        output_lower = output.lower()
-        return any(indicator in output_lower for indicator in rate_limit_indicators)
+    def _headers(self) -> Dict[str, str]:
+        headers = super()._headers()
+        headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
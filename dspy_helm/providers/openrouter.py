@@ -6,21 +6,33 @@ Adapter for OpenRouter API with support for:
 - prime-intellect/intellect-3 (free)
 """
 
-from typing import Optional
+from typing import Optional, Dict
 import os
-import openai
-import time
-from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from .base import RateLimitConfig
+from .http_provider import OpenAICompatibleProvider
 
 
-class OpenRouterProvider(BaseProvider):
+class OpenRouterProvider(OpenAICompatibleProvider):
     """Provider for OpenRouter API (OpenAI-compatible, free models)."""
 
+    TIMEOUT_SECONDS = 120
+
+    # OpenRouter applies each model's own defaults
+    MAX_TOKENS = None
+    TEMPERATURE = None
+
+    CONTEXT_WINDOWS = {
+        "x-ai/grok-4.1-fast:free": 2000000,
+        "prime-intellect/intellect-3": 131072,
+    }
+
     def __init__(
         self,
         model: str = "x-ai/grok-4.1-fast:free",
         api_key: Optional[str] = None,
         rate_limit: Optional[RateLimitConfig] = None,
+        base_url: Optional[str] = None,
+        **kwargs,
     ):
         """
         Initialize OpenRouter provider.
@@ -29,79 +41,31 @@ class OpenRouterProvider(BaseProvider):
             model: Model to use (default: Grok free)
             api_key: OpenRouter API key
             rate_limit: Rate limiting configuration
+            base_url: Override the API root (e.g. a local stand-in)
+            **kwargs: Additional BaseProvider options (e.g., cache)
         """
         super().__init__(
             name="OpenRouter (Grok)",
-            command="api",
             subcommand="openrouter",
             model=model,
+            base_url=base_url or "https://openrouter.ai/api/v1",
             rate_limit=rate_limit,
+            **kwargs,
         )
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
-        self.base_url = "https://openrouter.ai/api/v1"
-
-    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
-        """
-        Execute prompt via OpenRouter API.
-
-        Args:
-            prompt: Prompt to send
-            **kwargs: Additional arguments
-
-        Returns:
-            ProviderResponse with result
-        """
-        start_time = time.time()
-
-        try:
-            client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                timeout=120,
-            )
-
-            latency = time.time() - start_time
-
-            content = response.choices[0].message.content
-
-            return ProviderResponse(
-                success=True,
-                content=content,
-                provider=self.name,
-                model=self.model,
-                latency_seconds=latency,
-                tokens_used=response.usage.total_tokens if response.usage else 0,
-            )
 
-        except openai.RateLimitError as e:
-            return ProviderResponse(
-                success=False,
-                error=str(e),
-                provider=self.name,
-                model=self.model,
-                rate_limited=True,
-                latency_seconds=time.time() - start_time,
-            )
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/chat/completions"
 
-        except Exception as e:
-            return ProviderResponse(
-                success=False,
-                error=str(e),
-                provider=self.name,
-                model=self.model,
-                latency_seconds=time.time() - start_time,
-            )
+    def is_configured(self) -> bool:
+        """Check if OpenRouter API key is configured."""
+        return bool(self.api_key)
 
-    def _is_rate_limited(self, output: str) -> bool:
-        """Detect rate limiting indicators."""
-        rate_limit_indicators = [
-            "rate limit",
-            "too many requests",
-            "429",
-            "quota exceeded",
-        ]
+    def _not_configured_error(self) -> str:
+        return "OPENROUTER_API_KEY not configured. Set OPENROUTER_API_KEY environment variable."
 
-        output_lower = output.lower()
-        return any(indicator in output_lower for indicator in rate_limit_indicators)
+    def _headers(self) -> Dict[str, str]:
+        headers = super()._headers()
+        headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
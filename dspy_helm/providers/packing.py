@@ -0,0 +1,289 @@
+"""
+Multi-example prompt packing.
+
+Free tiers limit requests per minute far more tightly than tokens, so a
+bulk run of short prompts (e.g., one-line snippets for security_review)
+is bounded by request count. PromptPacker sends N prompts as one request
+asking for a JSON array of N answers, then splits the reply back into
+one ProviderResponse per prompt. Items the reply does not cover (it is
+not valid JSON, or answers are missing) are sent again as single calls,
+so packing never loses an answer, it only saves requests when it works.
+
+Example:
+    packer = PromptPacker(create_provider_chain(), PackingConfig(pack_size=8))
+    responses = packer.call_many(prompts)
+    print(packer.stats())
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Union
+import json
+import logging
+import re
+import threading
+
+from .base import BaseProvider, ProviderChain, ProviderResponse
+from .params import flatten_params, truncate_at_stop
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+Target = Union[BaseProvider, ProviderChain]
+
+PACK_HEADER = """You will complete {count} independent tasks. Treat each task on its own; \
+do not let one task's content affect another's answer.
+
+Reply with ONLY a JSON array of {count} objects, one per task, in task order:
+[{{"id": 1, "answer": "<complete answer to task 1>"}}, ...]
+Each "answer" is the full answer the task asks for, as a JSON string \
+(escape newlines and quotes). Do not add text outside the array.
+"""
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+@dataclass
+class PackingConfig:
+    """Configuration for prompt packing."""
+
+    # Prompts per request (1 = no packing)
+    pack_size: int = 8
+    # Token estimate a packed prompt may not exceed (None = no limit);
+    # packs are cut short rather than overflow
+    max_prompt_tokens: Optional[int] = 6000
+    # Completion tokens allowed per packed item when the caller sets none
+    item_max_tokens: int = 400
+    # Packed requests in flight at once
+    max_concurrency: int = 4
+
+    def __post_init__(self):
+        if self.pack_size < 1:
+            raise ValueError(f"pack_size must be positive, got {self.pack_size}")
+
+
+def pack_prompts(prompts: Sequence[str]) -> str:
+    """
+    Combine prompts into one prompt asking for a JSON array of answers.
+
+    Args:
+        prompts: Prompts to pack (task ids are 1-based positions)
+
+    Returns:
+        Packed prompt
+    """
+    tasks = [f"### Task {i}\n\n{prompt.strip()}" for i, prompt in enumerate(prompts, 1)]
+    return PACK_HEADER.format(count=len(prompts)) + "\n\n" + "\n\n".join(tasks) + "\n"
+
+
+def unpack_answers(content: str, count: int) -> Dict[int, str]:
+    """
+    Split a packed reply into per-task answers.
+
+    Accepts an array of ``{"id", "answer"}`` objects (matched by id) or of
+    plain strings (matched by position, only if there are exactly
+    ``count``), optionally inside a ```json fence or surrounding prose.
+
+    Args:
+        content: Model reply
+        count: Number of packed tasks
+
+    Returns:
+        0-based task index -> answer; tasks without a usable answer are
+        absent (empty if the reply could not be parsed)
+    """
+    text = content.strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        items = json.loads(text[start : end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    if all(isinstance(item, str) for item in items):
+        if len(items) != count:
+            return {}
+        return {i: item for i, item in enumerate(items) if item.strip()}
+
+    answers: Dict[int, str] = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        answer = item.get("answer")
+        if isinstance(answer, (dict, list)):
+            answer = json.dumps(answer)
+        if not isinstance(answer, str) or not answer.strip():
+            continue
+        task_id = item.get("id", position + 1)
+        try:
+            index = int(task_id) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count and index not in answers:
+            answers[index] = answer
+    return answers
+
+
+class PromptPacker:
+    """Send many short prompts as few packed requests."""
+
+    def __init__(self, target: Target, config: Optional[PackingConfig] = None):
+        """
+        Initialize packer.
+
+        Args:
+            target: Provider or chain the packed requests go to
+            config: Packing settings (default: PackingConfig())
+        """
+        self.target = target
+        self.config = config or PackingConfig()
+        self._lock = threading.Lock()
+        self._stats = {
+            "prompts": 0,
+            "requests": 0,
+            "packed_requests": 0,
+            "packed_answers": 0,
+            "fallbacks": 0,
+        }
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def packs(self, prompts: Sequence[str]) -> List[List[int]]:
+        """
+        Group prompt indices into packs.
+
+        Packs hold up to ``pack_size`` prompts and stay under
+        ``max_prompt_tokens``; a prompt too large to share a pack goes alone.
+
+        Args:
+            prompts: Prompts to group
+
+        Returns:
+            Lists of prompt indices, in input order
+        """
+        limit = self.config.max_prompt_tokens
+        overhead = estimate_tokens(PACK_HEADER)
+        packs: List[List[int]] = []
+        current: List[int] = []
+        tokens = overhead
+        for index, prompt in enumerate(prompts):
+            size = estimate_tokens(prompt) + 8
+            full = len(current) >= self.config.pack_size
+            too_big = limit is not None and current and tokens + size > limit
+            if full or too_big:
+                packs.append(current)
+                current, tokens = [], overhead
+            current.append(index)
+            tokens += size
+        if current:
+            packs.append(current)
+        return packs
+
+    def _packed_kwargs(self, count: int, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Call kwargs for a pack: room for every answer, no stop sequences."""
+        packed = dict(kwargs)
+        # A stop sequence would cut the JSON array; it is applied per answer
+        packed.pop("stop", None)
+        per_item = kwargs.get("max_tokens") or self.config.item_max_tokens
+        packed["max_tokens"] = per_item * count
+        return packed
+
+    def _split(
+        self, response: ProviderResponse, index: int, answer: str, count: int, stop
+    ) -> ProviderResponse:
+        """One prompt's response, carved out of a packed response."""
+        return replace(
+            response,
+            content=truncate_at_stop(answer, stop),
+            # Usage is shared evenly; the provider reports it per request
+            tokens_used=response.tokens_used // count,
+            prompt_tokens=response.prompt_tokens // count,
+            completion_tokens=response.completion_tokens // count,
+            metadata=dict(response.metadata, packed=count, pack_index=index),
+        )
+
+    def _call_pack(
+        self, prompts: Sequence[str], indices: List[int], kwargs: Dict[str, Any]
+    ) -> Dict[int, ProviderResponse]:
+        """Answer one pack, falling back to single calls for missing items."""
+        if len(indices) == 1:
+            self._count(requests=1)
+            return {indices[0]: self.target.call(prompts[indices[0]], **kwargs)}
+
+        count = len(indices)
+        packed = pack_prompts([prompts[i] for i in indices])
+        response = self.target.call(packed, **self._packed_kwargs(count, kwargs))
+        self._count(requests=1, packed_requests=1)
+
+        if not response.success and response.rate_limited:
+            # Retrying item by item would only spend more of the quota
+            return {i: response for i in indices}
+
+        answers = unpack_answers(response.content, count) if response.success else {}
+        stop = tuple(kwargs["stop"]) if kwargs.get("stop") else None
+        results = {
+            indices[position]: self._split(response, position, answer, count, stop)
+            for position, answer in answers.items()
+        }
+        missing = [i for i in indices if i not in results]
+        if missing:
+            reason = response.error if not response.success else "unparsed answers"
+            logger.debug(f"Pack of {count}: {len(missing)} single calls ({reason})")
+        for i in missing:
+            results[i] = self.target.call(prompts[i], **kwargs)
+        self._count(packed_answers=len(answers), fallbacks=len(missing))
+        self._count(requests=len(missing))
+        return results
+
+    def call_many(self, prompts: Sequence[str], **kwargs) -> List[ProviderResponse]:
+        """
+        Answer many prompts with as few requests as packing allows.
+
+        Args:
+            prompts: Prompts to answer
+            **kwargs: Call arguments (generation parameters apply per
+                prompt: ``max_tokens`` is scaled by the pack size and
+                ``stop`` is applied to each answer)
+
+        Returns:
+            One ProviderResponse per prompt, in input order; answers taken
+            from a packed reply have ``metadata["packed"]`` set
+        """
+        kwargs = flatten_params(kwargs)
+        prompts = list(prompts)
+        self._count(prompts=len(prompts))
+        results: Dict[int, ProviderResponse] = {}
+        workers = max(1, self.config.max_concurrency)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="provider-pack"
+        ) as executor:
+            futures = [
+                executor.submit(self._call_pack, prompts, indices, kwargs)
+                for indices in self.packs(prompts)
+            ]
+            for future in futures:
+                results.update(future.result())
+        return [results[i] for i in range(len(prompts))]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Packing counters.
+
+        Returns:
+            prompts, requests (packed + single), packed_requests,
+            packed_answers, fallbacks (single calls after a bad pack) and
+            requests_saved (prompts - requests)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["requests_saved"] = stats["prompts"] - stats["requests"]
+        return stats
@@ -0,0 +1,165 @@
+"""
+Per-request generation parameters.
+
+Providers used to send fixed generation settings (max_tokens=1000,
+temperature=0.7, a 60s/120s timeout) whatever the caller asked for.
+GenerationParams carries the caller's settings to every provider; fields
+left as None fall back to the provider's defaults. Scenarios whose metric
+only reads a few lines can cap max_tokens and stop early, which cuts
+generation latency.
+
+Parameters can be passed as an object or as loose keyword arguments:
+
+    provider.call(prompt, params=GenerationParams(max_tokens=200, stop=["\\n\\n"]))
+    provider.call(prompt, max_tokens=200, stop=["\\n\\n"])
+
+Providers that cannot apply a parameter ignore it; stop sequences are
+also applied client-side where the transport has no native support.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+# Keyword arguments that are read as generation parameters
+PARAM_NAMES = ("max_tokens", "temperature", "stop", "timeout", "seed")
+
+
+@dataclass(frozen=True)
+class GenerationParams:
+    """Generation settings for one request (None = provider default)."""
+
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop: Optional[Tuple[str, ...]] = None
+    # Seconds before the request (or CLI process) is abandoned
+    timeout: Optional[float] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        stop = self.stop
+        if isinstance(stop, str):
+            stop = (stop,)
+        elif stop is not None:
+            stop = tuple(s for s in stop if s)
+        object.__setattr__(self, "stop", stop or None)
+
+        if self.max_tokens is not None and self.max_tokens < 1:
+            raise ValueError(f"max_tokens must be positive, got {self.max_tokens}")
+        if self.temperature is not None and self.temperature < 0:
+            raise ValueError(
+                f"temperature must not be negative, got {self.temperature}"
+            )
+        if self.timeout is not None and self.timeout <= 0:
+            raise ValueError(f"timeout must be positive, got {self.timeout}")
+
+    @classmethod
+    def from_kwargs(cls, kwargs: Dict[str, Any]) -> "GenerationParams":
+        """
+        Read parameters from a call's keyword arguments.
+
+        Loose keys (``max_tokens=...``) override a ``params=`` object.
+
+        Args:
+            kwargs: Keyword arguments of a provider call
+
+        Returns:
+            GenerationParams (unset fields are None)
+        """
+        flat = flatten_params(kwargs)
+        return cls(**{name: flat[name] for name in PARAM_NAMES if name in flat})
+
+    def merged(self, defaults: "GenerationParams") -> "GenerationParams":
+        """
+        Fill unset fields from defaults.
+
+        Args:
+            defaults: Fallback values (e.g., a provider's)
+
+        Returns:
+            New GenerationParams
+        """
+        return GenerationParams(
+            **{
+                f.name: getattr(defaults, f.name)
+                if getattr(self, f.name) is None
+                else getattr(self, f.name)
+                for f in fields(self)
+            }
+        )
+
+    def without(self, names: Iterable[str]) -> "GenerationParams":
+        """Copy with the given fields unset (parameters a provider rejects)."""
+        names = set(names)
+        return GenerationParams(
+            **{
+                f.name: None if f.name in names else getattr(self, f.name)
+                for f in fields(self)
+            }
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Set fields only, with ``stop`` as a list (JSON-friendly)."""
+        data = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is not None:
+                data[f.name] = list(value) if f.name == "stop" else value
+        return data
+
+
+def flatten_params(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize call kwargs so equal parameters give equal cache keys.
+
+    A ``params=`` GenerationParams (or dict) is expanded into loose keys;
+    loose keys passed alongside it win and None values are dropped. Other
+    keyword arguments are kept as-is, and already-flat kwargs come back
+    unchanged.
+
+    Args:
+        kwargs: Keyword arguments of a provider call
+
+    Returns:
+        New kwargs dict with generation parameters as plain JSON values
+
+    Raises:
+        ValueError: If a parameter is out of range
+    """
+    params: Union[GenerationParams, Dict[str, Any], None] = kwargs.get("params")
+    if isinstance(params, GenerationParams):
+        merged = params.to_dict()
+    else:
+        merged = dict(params or {})
+    rest = {}
+    for key, value in kwargs.items():
+        if key == "params":
+            continue
+        if key in PARAM_NAMES:
+            if value is not None:
+                merged[key] = value
+        else:
+            rest[key] = value
+    # Round-trip to validate and normalize (e.g., stop="END" -> ["END"])
+    rest.update(GenerationParams(**merged).to_dict())
+    return rest
+
+
+def truncate_at_stop(text: str, stop: Optional[Tuple[str, ...]]) -> str:
+    """
+    Cut text at the earliest stop sequence (the sequence is not kept).
+
+    Args:
+        text: Generated text
+        stop: Stop sequences (None = no truncation)
+
+    Returns:
+        Truncated text
+    """
+    if not stop:
+        return text
+    cut = len(text)
+    for sequence in stop:
+        index = text.find(sequence)
+        if index != -1:
+            cut = min(cut, index)
+    return text[:cut]
@@ -8,12 +8,11 @@ https://developer.puter.com/tutorials/free-llm-api/
 """
 
 from typing import Optional
-import requests
-import time
-from .base import BaseProvider, ProviderResponse, RateLimitConfig
+from .base import RateLimitConfig
+from .http_provider import OpenAICompatibleProvider
 
 
-class PuterFreeProvider(BaseProvider):
+class PuterFreeProvider(OpenAICompatibleProvider):
     """Provider for Puter.js API - completely free, no API key needed."""
 
     # Available free models on Puter.js
@@ -25,10 +24,34 @@ class PuterFreeProvider(BaseProvider):
         "gemma-3": "Gemma 3 (multilingual)",
     }
 
+    CONTEXT_WINDOWS = {
+        "gpt-5-nano": 400000,
+        "claude-sonnet-4": 200000,
+        "deepseek-r1": 65536,
+        "grok-code": 256000,
+        "gemma-3": 131072,
+    }
+
+    TEMPERATURE = None
+
+    # The default gpt-5-nano only accepts its default temperature
+    UNSUPPORTED_PARAMS = ("temperature",)
+
+    # Every non-200 response is reported as "HTTP <code>: <body>"
+    STATUS_ERRORS = {}
+
+    # Add proper headers to avoid 403
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+    }
+
     def __init__(
         self,
         model: str = "gpt-5-nano",
         rate_limit: Optional[RateLimitConfig] = None,
+        **kwargs,
     ):
         """
         Initialize Puter.js free provider.
@@ -36,88 +59,16 @@ class PuterFreeProvider(BaseProvider):
         Args:
             model: Model to use (default: gpt-5-nano)
             rate_limit: Rate limiting configuration
+            **kwargs: Additional BaseProvider options (e.g., cache)
         """
         super().__init__(
             name="Puter.js Free API",
-            command="api",
             subcommand="puter-free",
             model=model,
+            base_url="https://api.puter.com/v1/chat/completions",
             rate_limit=rate_limit,
+            **kwargs,
         )
-        self.base_url = "https://api.puter.com/v1/chat/completions"
-        self.session = requests.Session()
-        # Add proper headers to avoid 403
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            }
-        )
-
-    def _execute_cli(self, prompt: str, **kwargs) -> ProviderResponse:
-        """
-        Execute prompt via Puter.js API (free).
-
-        Args:
-            prompt: Prompt to send
-            **kwargs: Additional arguments
-
-        Returns:
-            ProviderResponse with result
-        """
-        start_time = time.time()
-
-        try:
-            response = self.session.post(
-                self.base_url,
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 1000,
-                },
-                timeout=60,
-            )
-
-            latency = time.time() - start_time
-
-            if response.status_code == 200:
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                return ProviderResponse(
-                    success=True,
-                    content=content,
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-            else:
-                error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-                return ProviderResponse(
-                    success=False,
-                    error=error_msg,
-                    provider=self.name,
-                    model=self.model,
-                    latency_seconds=latency,
-                )
-
-        except requests.exceptions.Timeout:
-            return ProviderResponse(
-                success=False,
-                error="Request timed out after 60 seconds",
-                provider=self.name,
-                model=self.model,
-                latency_seconds=time.time() - start_time,
-            )
-
-        except Exception as e:
-            return ProviderResponse(
-                success=False,
-                error=str(e),
-                provider=self.name,
-                model=self.model,
-                latency_seconds=time.time() - start_time,
-            )
 
     def list_free_models(self) -> list:
         """List all available free models."""
@@ -0,0 +1,234 @@
+"""
+Proactive, header-driven rate limiting for providers.
+
+A token bucket sized from the configured free-tier limits paces requests
+before they are sent, and ``Retry-After`` / ``x-ratelimit-*`` response
+headers tighten it as the provider reports its remaining quota.
+"""
+
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+import asyncio
+import re
+import threading
+import time
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset value into seconds from now.
+
+    Accepts plain seconds ("12", "0.5"), Groq-style durations ("2m59.56s",
+    "450ms"), Unix timestamps in seconds or milliseconds (OpenRouter) and
+    HTTP dates (Retry-After).
+
+    Args:
+        value: Header value
+
+    Returns:
+        Seconds from now, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+
+    if number is not None:
+        if number > 1e12:  # epoch milliseconds
+            return max(0.0, number / 1000.0 - time.time())
+        if number > 1e9:  # epoch seconds
+            return max(0.0, number - time.time())
+        return max(0.0, number)
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with reservation semantics.
+
+    Each request reserves one token; when the bucket is empty the caller
+    is told how long to wait, so concurrent callers queue fairly instead
+    of racing into a 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+    ):
+        """
+        Initialize bucket.
+
+        Args:
+            requests_per_minute: Sustained rate (None = unlimited, header-driven only)
+            burst: Bucket capacity (default: one second's worth, at least 1)
+        """
+        self.rate = requests_per_minute / 60.0 if requests_per_minute else None
+        self.capacity = float(burst or max(1.0, self.rate or 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Reserve capacity for one request.
+
+        Args:
+            cost: Tokens to take from the bucket
+
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._blocked_until - now)
+            if self.rate is not None:
+                self._tokens -= cost
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+            return wait
+
+    def acquire(self, cost: float = 1.0) -> float:
+        """Block until a request may be sent; returns the time waited."""
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, cost: float = 1.0) -> float:
+        """Async version of ``acquire``."""
+        wait = self.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for ``seconds`` (e.g. from Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(
+                self._blocked_until, time.monotonic() + max(0.0, seconds)
+            )
+
+    def observe(
+        self, remaining: Optional[float], reset_after: Optional[float] = None
+    ) -> None:
+        """
+        Align the bucket with the quota the provider reports.
+
+        Args:
+            remaining: Requests left in the provider's current window
+            reset_after: Seconds until that window resets
+        """
+        if remaining is None:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, remaining)
+        if remaining <= 0 and reset_after:
+            self.pause(reset_after)
+
+    def stats(self) -> Dict[str, float]:
+        """Pacing counters."""
+        return {"waits": self.waits, "wait_seconds": round(self.wait_seconds, 3)}
+
+
+class RateLimiter:
+    """Per-provider limiter fed by config limits and response headers."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            requests_per_minute: Free-tier request limit
+            burst: Maximum back-to-back requests
+        """
+        self.bucket = TokenBucket(requests_per_minute, burst)
+
+    def acquire(self) -> float:
+        """Block until the next request may be sent."""
+        return self.bucket.acquire()
+
+    async def aacquire(self) -> float:
+        """Async version of ``acquire``."""
+        return await self.bucket.aacquire()
+
+    def observe_headers(self, headers: Any) -> Optional[float]:
+        """
+        Update pacing from response headers.
+
+        Understands ``Retry-After``, Groq's ``x-ratelimit-{remaining,reset}-
+        {requests,tokens}`` and OpenRouter's ``X-RateLimit-{Remaining,Reset}``.
+
+        Args:
+            headers: Case-insensitive response headers
+
+        Returns:
+            Retry-After in seconds, if the response carried one
+        """
+        if not isinstance(headers, Mapping) or not headers:
+            return None
+
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after is not None:
+            self.bucket.pause(retry_after)
+
+        for suffix in ("-requests", "-tokens", ""):
+            remaining = _header_float(headers, f"x-ratelimit-remaining{suffix}")
+            reset_after = parse_duration(headers.get(f"x-ratelimit-reset{suffix}"))
+            if suffix == "-tokens":
+                # Token quota only gates requests once it is exhausted
+                if remaining is not None and remaining <= 0 and reset_after:
+                    self.bucket.pause(reset_after)
+                continue
+            self.bucket.observe(remaining, reset_after)
+
+        return retry_after
+
+    def stats(self) -> Dict[str, float]:
+        """Pacing counters."""
+        return self.bucket.stats()
@@ -0,0 +1,329 @@
+"""
+Provider registry driven by providers.yaml.
+
+Every key under ``providers:`` in dspy_helm/config/providers.yaml names a
+provider. Its class is imported and its instance built on first use, so
+an entry point that talks to one provider never imports the others (or
+``requests``). Instances are cached per (name, model) and share their
+connection pools and rate limiters.
+
+``reload()`` re-reads the YAML without restarting: providers whose block
+changed are rebuilt on their next lookup, the others keep their state.
+Chains built before a reload keep the instances they were built with.
+
+The bundled providers are found by key; other entries name their class:
+
+    providers:
+      my_gateway:
+        class: "my_package.gateway:GatewayProvider"
+        models: {default: "some-model"}
+
+The default failover order is the top-level ``chain:`` list (default:
+groq, huggingface, openrouter, google).
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
+import importlib
+import inspect
+import logging
+import threading
+
+from .base import BaseProvider, ProviderChain, RateLimitConfig
+
+if TYPE_CHECKING:
+    from .budget import RunBudget
+    from .context import ContextConfig
+    from .routing import RoutingConfig
+
+logger = logging.getLogger(__name__)
+
+# Bundled provider classes by providers.yaml key ("module:Class")
+BUILTIN_PROVIDERS: Dict[str, str] = {
+    "groq": "dspy_helm.providers.groq:GroqProvider",
+    "huggingface": "dspy_helm.providers.huggingface:HuggingFaceProvider",
+    "puter": "dspy_helm.providers.puter:PuterFreeProvider",
+    "opencode_zen": "dspy_helm.providers.opencode_zen:OpenCodeZenProvider",
+    "openrouter": "dspy_helm.providers.openrouter:OpenRouterProvider",
+    "google": "dspy_helm.providers.gemini:GeminiProvider",
+}
+
+# Failover order when providers.yaml has no ``chain:`` list
+DEFAULT_CHAIN: Tuple[str, ...] = ("groq", "huggingface", "openrouter", "google")
+
+# Rate-limit defaults used when providers.yaml does not set them
+RATE_LIMIT_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "groq": {"enabled": True, "max_retries": 3, "backoff_factor": 1.0},
+    "huggingface": {"enabled": True, "max_retries": 3, "backoff_factor": 1.0},
+    "openrouter": {"enabled": True, "max_retries": 3, "backoff_factor": 1.0},
+    "google": {"enabled": True, "max_retries": 3, "backoff_factor": 2.0},
+}
+
+
+class ProviderRegistry:
+    """Lazily imported, cached provider instances configured from YAML."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Initialize registry (nothing is read or imported yet).
+
+        Args:
+            path: Provider YAML (default: dspy_helm/config/providers.yaml)
+        """
+        self.path = path
+        self._config: Optional[Dict[str, Any]] = None
+        self._classes: Dict[str, Type[BaseProvider]] = {}
+        self._instances: Dict[Tuple[str, Optional[str]], BaseProvider] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Parsed YAML, loaded on first access."""
+        with self._lock:
+            if self._config is None:
+                from ..config.providers import load_providers_config
+
+                self._config = load_providers_config(self.path)
+            return self._config
+
+    def provider_config(self, name: str) -> Dict[str, Any]:
+        """One provider's YAML block (empty if not configured)."""
+        from ..config.providers import get_provider_config
+
+        return get_provider_config(name, self.config)
+
+    def _class_path(self, name: str) -> Optional[str]:
+        return self.provider_config(name).get("class") or BUILTIN_PROVIDERS.get(name)
+
+    def names(self) -> List[str]:
+        """Providers that can be built (bundled, or YAML entries with a class)."""
+        configured = self.config.get("providers")
+        names = list(BUILTIN_PROVIDERS)
+        if isinstance(configured, dict):
+            names += [n for n in configured if n not in names and self._class_path(n)]
+        return names
+
+    def chain_order(self) -> List[str]:
+        """Provider names of the default failover chain."""
+        order = self.config.get("chain")
+        if not isinstance(order, list) or not order:
+            return list(DEFAULT_CHAIN)
+        known = set(self.names())
+        unknown = [name for name in order if name not in known]
+        if unknown:
+            logger.warning(f"Ignoring unknown providers in chain: {unknown}")
+        return [name for name in order if name in known]
+
+    def provider_class(self, name: str) -> Type[BaseProvider]:
+        """
+        Import a provider's class.
+
+        Args:
+            name: Provider key
+
+        Returns:
+            Provider class
+
+        Raises:
+            ValueError: If the provider is not known
+        """
+        with self._lock:
+            cls = self._classes.get(name)
+            if cls is not None:
+                return cls
+            path = self._class_path(name)
+            if path is None:
+                available = ", ".join(self.names())
+                raise ValueError(f"Unknown provider: '{name}'. Available: {available}")
+            module_name, _, class_name = path.partition(":")
+            cls = getattr(importlib.import_module(module_name), class_name)
+            self._classes[name] = cls
+            return cls
+
+    def get(self, name: str, model: Optional[str] = None) -> BaseProvider:
+        """
+        Get a provider, building it on first use.
+
+        Args:
+            name: Provider key (e.g., "groq")
+            model: Model to use (default: the YAML ``models.default``, else
+                the provider's own default)
+
+        Returns:
+            Cached provider instance
+
+        Raises:
+            ValueError: If the provider is not known
+        """
+        with self._lock:
+            cls = self.provider_class(name)
+            block = self.provider_config(name)
+            # Resolve the default first so get(name) and get(name, default)
+            # share one instance
+            model = (
+                model
+                or (block.get("models") or {}).get("default")
+                or _default_model(cls)
+            )
+            provider = self._instances.get((name, model))
+            if provider is not None:
+                return provider
+
+            settings = dict(RATE_LIMIT_DEFAULTS.get(name, {}))
+            settings.update(block.get("rate_limit") or {})
+            kwargs: Dict[str, Any] = {"rate_limit": RateLimitConfig.from_dict(settings)}
+            if model:
+                kwargs["model"] = model
+
+            provider = cls(**kwargs)
+            self._instances[(name, model)] = provider
+            return provider
+
+    def chain(
+        self,
+        routing: Optional["RoutingConfig"] = None,
+        context: Optional["ContextConfig"] = None,
+        budget: Optional["RunBudget"] = None,
+    ) -> ProviderChain:
+        """
+        Build the default failover chain (see ``chain_order``).
+
+        Args:
+            routing: Adaptive ordering (None = keep the configured order)
+            context: Fitting for prompts too large for every provider
+            budget: Run-level token/request/time/cost budget (None = unlimited)
+
+        Returns:
+            ProviderChain over the cached instances
+        """
+        providers = [self.get(name) for name in self.chain_order()]
+        return ProviderChain(providers, routing=routing, context=context, budget=budget)
+
+    def costs(self) -> Dict[str, float]:
+        """USD per 1000 tokens by provider (YAML ``cost_per_1k_tokens``)."""
+        return {
+            name: float(self.provider_config(name).get("cost_per_1k_tokens") or 0.0)
+            for name in self.names()
+        }
+
+    def loaded(self) -> List[Tuple[str, Optional[str]]]:
+        """(name, model) of the instances built so far."""
+        with self._lock:
+            return list(self._instances)
+
+    def clear(self) -> None:
+        """Forget every cached instance."""
+        with self._lock:
+            self._instances.clear()
+
+    def reload(self) -> List[str]:
+        """
+        Re-read the YAML, dropping instances whose configuration changed.
+
+        Returns:
+            Names of the providers whose block changed
+        """
+        with self._lock:
+            old = self._config
+            self._config = None
+            if old is None:
+                self._instances.clear()
+                return []
+            from ..config.providers import get_provider_config
+
+            names = {name for name, _ in self._instances} | set(self._classes)
+            changed = sorted(
+                name
+                for name in names
+                if get_provider_config(name, old) != self.provider_config(name)
+            )
+            for key in [key for key in self._instances if key[0] in changed]:
+                del self._instances[key]
+            for name in changed:
+                self._classes.pop(name, None)
+            if changed:
+                logger.info(f"Reloaded provider config; rebuilding {changed}")
+            return changed
+
+
+_default_registry = ProviderRegistry()
+
+
+def _default_model(cls: Type[BaseProvider]) -> Optional[str]:
+    """The ``model`` default of a provider class's constructor, if any."""
+    parameter = inspect.signature(cls).parameters.get("model")
+    if parameter is None or parameter.default is inspect.Parameter.empty:
+        return None
+    return parameter.default
+
+
+def get_registry() -> ProviderRegistry:
+    """The process-wide registry behind ``get_provider_by_name``."""
+    return _default_registry
+
+
+def get_provider_by_name(name: str, model: Optional[str] = None) -> BaseProvider:
+    """
+    Get a specific provider by name.
+
+    Instances are cached per (name, model), so repeated lookups share one
+    provider, its HTTP connections and its rate limiter.
+
+    Args:
+        name: Provider name (groq, huggingface, puter, opencode_zen, openrouter,
+            google, or another providers.yaml entry with a ``class``)
+        model: Model to use (default: the provider's default model)
+
+    Returns:
+        Provider instance
+
+    Raises:
+        ValueError: If provider not found
+    """
+    return _default_registry.get(name, model)
+
+
+def create_provider_chain(
+    routing: Optional["RoutingConfig"] = None,
+    context: Optional["ContextConfig"] = None,
+    budget: Optional["RunBudget"] = None,
+) -> ProviderChain:
+    """
+    Create provider chain with default providers.
+
+    Order: providers.yaml ``chain:``, by default Groq → HuggingFace →
+    OpenRouter → Gemini (all with free tiers!)
+
+    Chains share the cached provider instances, and with them their
+    connection pools and rate limiters.
+
+    Args:
+        routing: Adaptive ordering (None = keep the order above)
+        context: Fitting for prompts too large for every provider
+            (None = reject them without sending)
+        budget: Run-level token/request/time/cost budget (None = unlimited)
+
+    Returns:
+        ProviderChain with all providers configured
+    """
+    return _default_registry.chain(routing=routing, context=context, budget=budget)
+
+
+def get_default_provider() -> BaseProvider:
+    """Get the default (primary) provider - first in the chain (Groq)."""
+    return get_provider_by_name(_default_registry.chain_order()[0])
+
+
+def clear_provider_cache() -> None:
+    """Forget cached provider instances."""
+    _default_registry.clear()
+
+
+def reload_providers() -> List[str]:
+    """
+    Re-read providers.yaml (e.g., after editing it) without restarting.
+
+    Returns:
+        Names of the providers that will be rebuilt on next use
+    """
+    return _default_registry.reload()
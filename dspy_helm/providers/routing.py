@@ -0,0 +1,173 @@
+"""
+Latency-adaptive routing for ProviderChain.
+
+Keeps an exponentially weighted moving average (EWMA) of latency, success
+rate and rate-limit frequency per provider and orders the chain by expected
+cost, either strictly ("ewma") or with power-of-two-choices ("p2c"), which
+spreads load while still favouring the fastest endpoint.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence
+import random
+import threading
+import time
+
+
+@dataclass
+class RoutingConfig:
+    """Configuration for adaptive provider ordering."""
+
+    mode: str = "p2c"  # "p2c" (power-of-two-choices) or "ewma" (strict sort)
+    alpha: float = 0.3  # EWMA weight of the newest sample
+    rate_limit_penalty: float = 5.0  # seconds added at 100% rate-limited
+    min_success_rate: float = 0.05  # floor so a failing provider keeps a finite cost
+    history_size: int = 50  # routing decisions kept for export
+    seed: Optional[int] = None
+
+
+@dataclass
+class ProviderRouteStats:
+    """EWMA view of one provider."""
+
+    latency: Optional[float] = None
+    success_rate: float = 1.0
+    rate_limit_rate: float = 0.0
+    calls: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": None if self.latency is None else round(self.latency, 4),
+            "success_rate": round(self.success_rate, 4),
+            "rate_limit_rate": round(self.rate_limit_rate, 4),
+            "calls": self.calls,
+        }
+
+
+class AdaptiveRouter:
+    """Orders providers by their recent latency, success and rate-limit EWMAs."""
+
+    MODES = ("p2c", "ewma")
+
+    def __init__(self, config: Optional[RoutingConfig] = None):
+        """
+        Initialize router.
+
+        Args:
+            config: Routing configuration
+
+        Raises:
+            ValueError: If the routing mode is unknown
+        """
+        self.config = config or RoutingConfig()
+        if self.config.mode not in self.MODES:
+            available = ", ".join(self.MODES)
+            raise ValueError(
+                f"Unknown routing mode: '{self.config.mode}'. Available: {available}"
+            )
+        self.stats: Dict[str, ProviderRouteStats] = {}
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=self.config.history_size)
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    def record(
+        self, provider_name: str, latency: float, success: bool, rate_limited: bool
+    ) -> None:
+        """
+        Fold one call outcome into the provider's EWMAs.
+
+        Args:
+            provider_name: Provider that served the call
+            latency: Wall-clock time of the call in seconds
+            success: Whether the call succeeded
+            rate_limited: Whether the call hit a rate limit
+        """
+        alpha = self.config.alpha
+        with self._lock:
+            stats = self.stats.setdefault(provider_name, ProviderRouteStats())
+            stats.calls += 1
+            if success:
+                stats.latency = (
+                    latency
+                    if stats.latency is None
+                    else alpha * latency + (1 - alpha) * stats.latency
+                )
+            stats.success_rate = alpha * float(success) + (1 - alpha) * (
+                stats.success_rate
+            )
+            stats.rate_limit_rate = alpha * float(rate_limited) + (1 - alpha) * (
+                stats.rate_limit_rate
+            )
+
+    def score(self, provider_name: str) -> float:
+        """
+        Expected cost of sending a request to a provider (lower is better).
+
+        Latency is divided by the success rate (expected attempts until a
+        success) and rate-limit frequency adds a fixed penalty. Providers
+        without a successful sample score 0 so they get tried.
+        """
+        stats = self.stats.get(provider_name)
+        if stats is None or stats.latency is None:
+            return 0.0
+        success = max(self.config.min_success_rate, stats.success_rate)
+        return (
+            stats.latency / success
+            + self.config.rate_limit_penalty * stats.rate_limit_rate
+        )
+
+    def order(self, providers: Sequence[Any]) -> List[Any]:
+        """
+        Order providers for one request.
+
+        Args:
+            providers: Providers in their configured (tie-break) order
+
+        Returns:
+            Providers in the order they should be tried
+        """
+        with self._lock:
+            scores = {p.name: self.score(p.name) for p in providers}
+            if self.config.mode == "ewma":
+                ordered = sorted(providers, key=lambda p: scores[p.name])
+            else:
+                ordered = self._power_of_two(list(providers), scores)
+
+            self.decisions.append(
+                {
+                    "time": time.time(),
+                    "order": [p.name for p in ordered],
+                    "scores": {name: round(s, 4) for name, s in scores.items()},
+                }
+            )
+        return ordered
+
+    def _power_of_two(
+        self, remaining: List[Any], scores: Dict[str, float]
+    ) -> List[Any]:
+        """Repeatedly sample two candidates and keep the cheaper one."""
+        ordered = []
+        while len(remaining) > 1:
+            i, j = sorted(self._random.sample(range(len(remaining)), 2))
+            pick = j if scores[remaining[j].name] < scores[remaining[i].name] else i
+            ordered.append(remaining.pop(pick))
+        return ordered + remaining
+
+    def export(self) -> Dict[str, Any]:
+        """
+        JSON-serializable routing state for debugging.
+
+        Returns:
+            Mode, per-provider EWMAs and scores, and recent decisions
+        """
+        with self._lock:
+            return {
+                "mode": self.config.mode,
+                "alpha": self.config.alpha,
+                "providers": {
+                    name: {**stats.as_dict(), "score": round(self.score(name), 4)}
+                    for name, stats in self.stats.items()
+                },
+                "decisions": list(self.decisions),
+            }
@@ -0,0 +1,320 @@
+"""
+Priority scheduling in front of a ProviderChain.
+
+Interactive requests (a user waiting on a dispatch or a single query) and
+batch traffic (evaluation and optimizer runs) share the same free-tier
+quota. A PriorityScheduler caps concurrent requests per provider and,
+when a provider is at its cap, admits waiting requests by priority, so
+interactive requests overtake a saturating batch run. Waiting requests
+age: one that has waited ``aging_seconds`` ranks like a fresh request of
+the next higher class, so batch work is never starved.
+
+Priorities only apply between callers sharing one scheduler, that is
+within one process. A query from a separate process (e.g., a CLI
+``--prompt`` while an optimizer runs elsewhere) has its own scheduler and
+competes with the other process only through the providers' quotas.
+
+Example:
+    scheduler = PriorityScheduler(create_provider_chain())
+    lm = ProviderLM(scheduler.client("batch"))           # evaluation traffic
+    scheduler.call("Explain SQL injection", priority="interactive")
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+from .base import ProviderChain, ProviderResponse
+
+# Lower ranks are admitted first
+PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1}
+
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for PriorityScheduler."""
+
+    # Concurrent requests per provider name (default: the provider's
+    # rate_limit.burst, else default_limit)
+    per_provider_limits: Dict[str, int] = field(default_factory=dict)
+    default_limit: int = 4
+    # Waiting this long promotes a request by one priority class
+    aging_seconds: float = 10.0
+
+
+class PrioritySemaphore:
+    """Counting semaphore that admits waiters by aged priority."""
+
+    def __init__(self, limit: int, aging_seconds: float = 10.0):
+        """
+        Initialize semaphore.
+
+        Args:
+            limit: Concurrent holders allowed
+            aging_seconds: Wait that raises a waiter one priority class
+        """
+        self.limit = limit
+        self.aging_seconds = aging_seconds
+        self.in_flight = 0
+        self._waiters: List[Tuple[float, int]] = []  # heap of (key, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _key(self, rank: int, since: float) -> float:
+        # rank - waited / aging_seconds, minus the shared "now" term: every
+        # waiter ages at the same rate, so the order is fixed at arrival
+        return rank + since / self.aging_seconds
+
+    @property
+    def waiting(self) -> int:
+        """Requests blocked on this semaphore."""
+        with self._cond:
+            return len(self._waiters)
+
+    def try_acquire(self, rank: int, since: float) -> bool:
+        """Take a slot if one is free and nobody waiting ranks higher."""
+        with self._cond:
+            if self.in_flight >= self.limit:
+                return False
+            if self._waiters and self._waiters[0][0] <= self._key(rank, since):
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self, rank: int, since: float) -> None:
+        """Block until this request is the best-ranked waiter and a slot is free."""
+        with self._cond:
+            entry = (self._key(rank, since), next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            while self.in_flight >= self.limit or self._waiters[0] != entry:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            # Another slot may still be free for the next waiter
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        """Free a slot."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class _Ticket:
+    """One request's hold on a provider's slots, with the semaphore API."""
+
+    def __init__(self, semaphore: PrioritySemaphore, rank: int, since: float):
+        self.semaphore = semaphore
+        self.rank = rank
+        self.since = since
+        self.waited = 0.0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self.semaphore.try_acquire(self.rank, self.since):
+            return True
+        if not blocking:
+            return False
+        start = time.time()
+        self.semaphore.acquire(self.rank, self.since)
+        self.waited += time.time() - start
+        return True
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class PriorityScheduler:
+    """Per-provider concurrency caps with interactive/batch priority classes."""
+
+    def __init__(self, chain: ProviderChain, config: Optional[SchedulerConfig] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            chain: Chain whose providers are scheduled (its failover order,
+                breakers, routing, budget and context fitting still apply;
+                hedging does not)
+            config: Scheduler configuration
+        """
+        self.chain = chain
+        self.config = config or SchedulerConfig()
+        self.semaphores: Dict[str, PrioritySemaphore] = {}
+        for provider in chain.providers:
+            limit = self.config.per_provider_limits.get(
+                provider.name, provider.rate_limit.burst or self.config.default_limit
+            )
+            self.semaphores[provider.name] = PrioritySemaphore(
+                int(limit), self.config.aging_seconds
+            )
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {
+                "requests": 0,
+                "queued": 0,
+                "queue_wait_seconds": 0.0,
+                "max_wait": 0.0,
+            }
+            for name in PRIORITIES
+        }
+
+    @staticmethod
+    def _rank(priority: str) -> int:
+        if priority not in PRIORITIES:
+            available = ", ".join(PRIORITIES)
+            raise ValueError(f"Unknown priority: '{priority}'. Available: {available}")
+        return PRIORITIES[priority]
+
+    def call(
+        self,
+        prompt: str,
+        priority: str = "batch",
+        chain: Optional[ProviderChain] = None,
+        **kwargs,
+    ) -> ProviderResponse:
+        """
+        Call the chain once a provider slot is granted.
+
+        Args:
+            prompt: Prompt to send
+            priority: "interactive" or "batch"
+            chain: Chain to call instead of the scheduler's own (e.g., one
+                provider); its providers share the scheduler's slots by name
+            **kwargs: Additional arguments
+
+        Returns:
+            ProviderResponse, with ``metadata["queue_wait_seconds"]``
+
+        Raises:
+            ValueError: If the priority is unknown
+        """
+        rank = self._rank(priority)
+        since = time.time()
+        tickets = {
+            name: _Ticket(semaphore, rank, since)
+            for name, semaphore in self.semaphores.items()
+        }
+        chain = chain or self.chain
+        response = chain._call_limited(prompt, tickets, **kwargs)
+
+        waited = sum(ticket.waited for ticket in tickets.values())
+        response.metadata["priority"] = priority
+        response.metadata["queue_wait_seconds"] = round(waited, 4)
+        with self._lock:
+            stats = self._stats[priority]
+            stats["requests"] += 1
+            stats["queued"] += int(waited > 0)
+            stats["queue_wait_seconds"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+        return response
+
+    async def acall(
+        self,
+        prompt: str,
+        priority: str = "batch",
+        chain: Optional[ProviderChain] = None,
+        **kwargs,
+    ) -> ProviderResponse:
+        """Async version of ``call`` (waits for a slot in a worker thread)."""
+        self._rank(priority)
+        return await asyncio.to_thread(self.call, prompt, priority, chain, **kwargs)
+
+    def client(
+        self, priority: str, chain: Optional[ProviderChain] = None
+    ) -> "ScheduledClient":
+        """
+        A chain-like handle whose calls all use one priority.
+
+        Args:
+            priority: "interactive" or "batch"
+            chain: Chain the client calls (default: the scheduler's)
+
+        Returns:
+            Object with ``call``/``acall`` (e.g., for ProviderLM)
+        """
+        self._rank(priority)
+        return ScheduledClient(self, priority, chain)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queueing per priority class and load per provider.
+
+        Returns:
+            {"priorities": {class: counters and mean/max queue wait},
+             "providers": {name: limit, in_flight, waiting}}
+        """
+        with self._lock:
+            priorities = {}
+            for name, stats in self._stats.items():
+                requests = stats["requests"]
+                priorities[name] = {
+                    "requests": int(requests),
+                    "queued": int(stats["queued"]),
+                    "mean_queue_wait": round(stats["queue_wait_seconds"] / requests, 4)
+                    if requests
+                    else 0.0,
+                    "max_queue_wait": round(stats["max_wait"], 4),
+                }
+        providers = {
+            name: {
+                "limit": semaphore.limit,
+                "in_flight": semaphore.in_flight,
+                "waiting": semaphore.waiting,
+            }
+            for name, semaphore in self.semaphores.items()
+        }
+        return {"priorities": priorities, "providers": providers}
+
+
+class ScheduledClient:
+    """Calls through a PriorityScheduler at a fixed priority."""
+
+    def __init__(
+        self,
+        scheduler: PriorityScheduler,
+        priority: str,
+        chain: Optional[ProviderChain] = None,
+    ):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.chain = chain or scheduler.chain
+
+    @property
+    def providers(self):
+        """Providers of the scheduled chain."""
+        return self.chain.providers
+
+    def call(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Call the scheduler at this client's priority."""
+        return self.scheduler.call(prompt, self.priority, self.chain, **kwargs)
+
+    async def acall(self, prompt: str, **kwargs) -> ProviderResponse:
+        """Async version of ``call``."""
+        return await self.scheduler.acall(prompt, self.priority, self.chain, **kwargs)
+
+
+_default_scheduler: Optional[PriorityScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> PriorityScheduler:
+    """
+    The process-wide scheduler over ``create_provider_chain()``.
+
+    Interactive and batch callers in one process must share a scheduler
+    for priorities to apply between them; callers in other processes are
+    not scheduled against each other.
+
+    Returns:
+        Shared PriorityScheduler
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            from . import create_provider_chain
+
+            _default_scheduler = PriorityScheduler(create_provider_chain())
+        return _default_scheduler
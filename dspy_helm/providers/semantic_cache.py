@@ -0,0 +1,316 @@
+"""
+Semantic near-duplicate response cache.
+
+An opt-in layer behind the exact-match ResponseCache: prompts are
+normalised and embedded as signed, hashed character n-gram vectors
+(NumPy only, no model download), and a stored response is reused when a
+new prompt for the same provider, model and parameters is at least
+``threshold`` cosine-similar. Prompts that differ only in whitespace or
+case always match; small template edits match above the threshold.
+
+Prompts whose numbers differ never match, and neither do prompts whose
+lines are the same but in another order: reordered statements are other
+code. ``sort_lines=True`` opts in to treating line order as irrelevant
+(e.g. prompts rendering key/value variables). The threshold should stay
+high: two renderings of one long template with different short inputs
+can score 0.96-0.97.
+"""
+
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+import threading
+import time
+import zlib
+
+from .base import ProviderResponse
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace runs and strip the ends."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def canonical_prompt(prompt: str, sort_lines: bool = False) -> str:
+    """
+    Canonical form of a prompt: its normalised, lower-cased non-blank lines.
+
+    Two prompts with the same canonical form differ only in whitespace and
+    case (and, with ``sort_lines``, in the order of their lines).
+    """
+    lines = (normalize_prompt(line).lower() for line in prompt.splitlines())
+    lines = [line for line in lines if line]
+    return "\n".join(sorted(lines) if sort_lines else lines)
+
+
+class HashedNgramEmbedder:
+    """Character n-gram feature hashing into a fixed-size unit vector."""
+
+    def __init__(self, dim: int = 1024, ngram_sizes: Tuple[int, ...] = (3, 4, 5)):
+        """
+        Initialize embedder.
+
+        Args:
+            dim: Vector dimensions (a power of two keeps hashing unbiased)
+            ngram_sizes: Character n-gram lengths to hash
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError(
+                "The semantic cache requires NumPy. Install it with: pip install numpy"
+            ) from e
+        self.np = numpy
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def embed(self, normalized: str) -> Any:
+        """
+        Embed a normalised prompt.
+
+        Args:
+            normalized: Output of normalize_prompt()
+
+        Returns:
+            L2-normalised float32 vector of length ``dim``
+        """
+        np = self.np
+        text = normalized.lower()
+        hashes = [
+            zlib.crc32(text[i : i + n].encode("utf-8"))
+            for n in self.ngram_sizes
+            for i in range(max(1, len(text) - n + 1))
+        ]
+        hashed = np.asarray(hashes, dtype=np.uint32)
+        signs = np.where(hashed >> 31, -1.0, 1.0).astype(np.float32)
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        np.add.at(vector, hashed % self.dim, signs)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour cache of successful responses."""
+
+    def __init__(
+        self,
+        threshold: float = 0.98,
+        max_entries: int = 2000,
+        dim: int = 1024,
+        near_miss_margin: float = 0.05,
+        sort_lines: bool = False,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit (0-1)
+            max_entries: Entries kept; the oldest are overwritten when full
+            dim: Embedding dimensions
+            near_miss_margin: Misses this close below the threshold are
+                counted as near misses (to help tune the threshold)
+            sort_lines: Treat prompts whose lines differ only in order as
+                the same prompt (off: reordered prompts never match)
+        """
+        self.threshold = threshold
+        self.sort_lines = sort_lines
+        self.max_entries = max_entries
+        self.near_miss_margin = near_miss_margin
+        self.embedder = HashedNgramEmbedder(dim=dim)
+        np = self.embedder.np
+
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._namespaces = np.full(max_entries, -1, dtype=np.int64)
+        # (canonical, sorted lines, numbers, response) per slot
+        self._entries: List[
+            Optional[Tuple[str, str, Tuple[str, ...], ProviderResponse]]
+        ] = [None] * max_entries
+        self._canonical: Dict[Tuple[int, str], int] = {}  # -> entry index
+        self._namespace_ids: Dict[str, int] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.near_misses = 0
+        self.number_mismatches = 0
+        self.reorderings = 0
+        self._hit_similarity_sum = 0.0
+        self._min_hit_similarity: Optional[float] = None
+
+    @staticmethod
+    def _namespace(provider: str, model: str, params: Optional[Dict[str, Any]]) -> str:
+        return json.dumps([provider, model, params or {}], sort_keys=True, default=str)
+
+    def get(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[ProviderResponse]:
+        """
+        Find a stored response for a near-identical prompt.
+
+        Args:
+            provider: Provider name
+            model: Model name
+            prompt: Prompt text
+            params: Generation parameters (must match exactly)
+
+        Returns:
+            Copy of the cached response with ``metadata["semantic_similarity"]``,
+            or None on a miss
+        """
+        canonical = canonical_prompt(prompt, self.sort_lines)
+        namespace = self._namespace(provider, model, params)
+        with self._lock:
+            namespace_id = self._namespace_ids.get(namespace)
+            if namespace_id is None:
+                self.misses += 1
+                return None
+            index = self._canonical.get((namespace_id, canonical))
+            if index is not None:
+                return self._hit(self._entries[index][3], 1.0, exact=True)
+
+        lines = canonical_prompt(prompt, sort_lines=True)
+        normalized = normalize_prompt(prompt)
+        vector = self.embedder.embed(normalized)
+        numbers = tuple(_NUMBER.findall(normalized))
+        with self._lock:
+            np = self.embedder.np
+            similarities = self._vectors @ vector
+            similarities[self._namespaces != namespace_id] = -1.0
+            # Candidates from best to worst until one passes the number and
+            # line-order checks
+            for index in np.argsort(similarities)[::-1]:
+                similarity = float(similarities[index])
+                if similarity < self.threshold:
+                    break
+                _, stored_lines, stored_numbers, response = self._entries[index]
+                if stored_numbers != numbers:
+                    self.number_mismatches += 1
+                    continue
+                if stored_lines == lines:
+                    # Same lines in another order (an exact hit if opted in)
+                    self.reorderings += 1
+                    continue
+                return self._hit(response, similarity, exact=False)
+
+            self.misses += 1
+            best = float(similarities.max())
+            if best >= self.threshold - self.near_miss_margin:
+                self.near_misses += 1
+            return None
+
+    def _hit(
+        self, response: ProviderResponse, similarity: float, exact: bool
+    ) -> ProviderResponse:
+        self.hits += 1
+        self.exact_hits += int(exact)
+        self._hit_similarity_sum += similarity
+        if self._min_hit_similarity is None or similarity < self._min_hit_similarity:
+            self._min_hit_similarity = similarity
+        copy = replace(response, metadata=dict(response.metadata))
+        copy.metadata["semantic_similarity"] = round(similarity, 4)
+        return copy
+
+    def set(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        response: ProviderResponse,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Index a successful response.
+
+        Args:
+            provider: Provider name
+            model: Model name
+            prompt: Prompt text
+            response: Response to reuse for near-identical prompts
+            params: Generation parameters
+        """
+        if not response.success:
+            return
+        canonical = canonical_prompt(prompt, self.sort_lines)
+        lines = canonical_prompt(prompt, sort_lines=True)
+        normalized = normalize_prompt(prompt)
+        vector = self.embedder.embed(normalized)
+        numbers = tuple(_NUMBER.findall(normalized))
+        namespace = self._namespace(provider, model, params)
+        stored = replace(response, metadata=dict(response.metadata))
+        stored.metadata.pop("cache", None)
+        stored.metadata["semantic_cached_at"] = time.time()
+
+        with self._lock:
+            namespace_id = self._namespace_ids.setdefault(
+                namespace, len(self._namespace_ids)
+            )
+            index = self._canonical.get((namespace_id, canonical))
+            if index is None:
+                index = self._next % self.max_entries
+                self._next += 1
+                evicted = self._entries[index]
+                if evicted is not None:
+                    self._canonical.pop(
+                        (int(self._namespaces[index]), evicted[0]), None
+                    )
+            self._vectors[index] = vector
+            self._namespaces[index] = namespace_id
+            self._entries[index] = (canonical, lines, numbers, stored)
+            self._canonical[(namespace_id, canonical)] = index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return min(self._next, self.max_entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit rate and hit quality.
+
+        Returns:
+            Counters plus mean/min similarity of hits (exact_hits are
+            prompts identical up to whitespace and case; reorderings are
+            candidates rejected for differing only in line order)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "exact_hits": self.exact_hits,
+                "misses": self.misses,
+                "near_misses": self.near_misses,
+                "number_mismatches": self.number_mismatches,
+                "reorderings": self.reorderings,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "mean_hit_similarity": round(self._hit_similarity_sum / self.hits, 4)
+                if self.hits
+                else None,
+                "min_hit_similarity": round(self._min_hit_similarity, 4)
+                if self._min_hit_similarity is not None
+                else None,
+                "entries": min(self._next, self.max_entries),
+                "threshold": self.threshold,
+            }
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._namespaces[:] = -1
+            self._entries = [None] * self.max_entries
+            self._canonical.clear()
+            self._namespace_ids.clear()
+            self._next = 0
@@ -0,0 +1,91 @@
+"""
+Process-wide pooled HTTP sessions.
+
+Providers that talk to the same origin share one ``requests.Session``, so
+keep-alive connections (and their TLS handshakes) are reused across
+provider instances and threads. Pool sizes follow the number of threads
+issuing requests, e.g. ``Evaluator.num_threads``.
+"""
+
+from typing import Dict
+from urllib.parse import urlsplit
+import threading
+
+import requests
+
+# Connections kept per origin; matches Evaluator's default num_threads
+DEFAULT_POOL_MAXSIZE = 16
+
+_sessions: Dict[str, requests.Session] = {}
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+_lock = threading.Lock()
+
+
+def session_key(url: str) -> str:
+    """Origin (scheme://host[:port]) that a URL's connections belong to."""
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _mount(session: requests.Session, pool_maxsize: int) -> None:
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4, pool_maxsize=pool_maxsize
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get the shared session for a URL's origin.
+
+    Args:
+        url: Endpoint or base URL
+
+    Returns:
+        Session whose connection pool is shared process-wide
+    """
+    key = session_key(url)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            _mount(session, _pool_maxsize)
+            _sessions[key] = session
+        return session
+
+
+def get_pool_size() -> int:
+    """Connections kept per origin."""
+    return _pool_maxsize
+
+
+def configure_pool_size(pool_maxsize: int) -> None:
+    """
+    Set the connections kept per origin, resizing existing sessions.
+
+    Args:
+        pool_maxsize: Connections per origin (typically the thread count)
+    """
+    global _pool_maxsize
+    with _lock:
+        _pool_maxsize = max(1, int(pool_maxsize))
+        for session in _sessions.values():
+            _mount(session, _pool_maxsize)
+
+
+def ensure_pool_size(num_threads: int) -> None:
+    """Grow the pools so ``num_threads`` concurrent requests do not queue."""
+    if num_threads > _pool_maxsize:
+        configure_pool_size(num_threads)
+
+
+def close_sessions() -> None:
+    """Close and forget every shared session."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
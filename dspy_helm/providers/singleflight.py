@@ -0,0 +1,116 @@
+"""
+Single-flight request coalescing.
+
+When the same request is already in flight, later callers wait for it
+and share its result instead of sending a duplicate upstream call. The
+Evaluator's worker threads and parallel demo bootstrapping often issue
+identical prompts at the same time.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import threading
+
+
+class _Flight:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, Any, List]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless an identical call is in flight; then wait for it.
+
+        Args:
+            key: Identity of the request
+            fn: Performs the request
+
+        Returns:
+            (result, shared) where shared is True for coalesced callers
+
+        Raises:
+            Exception: Whatever ``fn`` raised, re-raised for every caller
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Async version of ``do`` (coalesces callers on the same event loop).
+
+        The shared request is cancelled only when every waiting caller has
+        been cancelled, so hedging can still abandon a losing request.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._tasks.get(key)
+            shared = entry is not None and entry[0] is loop
+            if shared:
+                _, task, waiters = entry
+                waiters.append(None)
+                self.coalesced += 1
+            else:
+                task = loop.create_task(fn())
+                waiters = [None]
+                self._tasks[key] = (loop, task, waiters)
+                self.leaders += 1
+                task.add_done_callback(lambda t: self._forget(key, t))
+
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            waiters.pop()
+            if not waiters:
+                task.cancel()
+            raise
+
+    def _forget(self, key: Hashable, task: Any) -> None:
+        with self._lock:
+            entry = self._tasks.get(key)
+            if entry is not None and entry[1] is task:
+                del self._tasks[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Upstream calls made and calls served by coalescing."""
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced}
@@ -0,0 +1,283 @@
+"""
+Local stand-in for OpenAI-compatible chat/completions APIs.
+
+Serves the dialect spoken by GroqProvider, OpenRouterProvider and
+OpenCodeZenProvider on localhost, with configurable latency
+distributions, injected 429/503 responses (with Retry-After) and SSE
+streaming, so ProviderChain and Evaluator throughput can be measured
+offline. Any POST path ending in ``/chat/completions`` is accepted.
+
+Example:
+    with StandInServer(StandInConfig(rate_limit_rate=0.05)) as server:
+        provider = GroqProvider(base_url=server.chat_completions_url)
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+import json
+import math
+import random
+import threading
+import time
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server."""
+
+    latency_distribution: str = "lognormal"
+    latency_mean: float = 0.2  # seconds before the response (or first token)
+    latency_spread: float = 0.5  # lognormal sigma / uniform +- fraction of mean
+    rate_limit_rate: float = 0.0  # fraction of requests answered 429
+    unavailable_rate: float = 0.0  # fraction of requests answered 503
+    retry_after: Optional[float] = 1.0  # Retry-After on 429/503 (None = omit)
+    chunk_delay: float = 0.01  # seconds between SSE chunks
+    response_words: int = 12  # words in each completion
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            available = ", ".join(LATENCY_DISTRIBUTIONS)
+            raise ValueError(
+                f"Unknown latency distribution: '{self.latency_distribution}'. "
+                f"Available: {available}"
+            )
+
+
+class StandInServer:
+    """Threaded local server speaking the chat/completions dialect."""
+
+    def __init__(
+        self,
+        config: Optional[StandInConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Initialize server (port 0 picks a free port).
+
+        Args:
+            config: Latency and fault-injection settings
+            host: Interface to bind
+            port: Port to bind
+        """
+        self.config = config or StandInConfig()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "ok": 0,
+            "rate_limited": 0,
+            "unavailable": 0,
+            "streamed": 0,
+        }
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL, e.g. http://127.0.0.1:54321."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def chat_completions_url(self) -> str:
+        """Full endpoint URL (GroqProvider / OpenCodeZenProvider base_url)."""
+        return f"{self.url}/v1/chat/completions"
+
+    @property
+    def api_base_url(self) -> str:
+        """API root URL (OpenRouterProvider base_url)."""
+        return f"{self.url}/v1"
+
+    def start(self) -> "StandInServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="standin-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def sample_latency(self) -> float:
+        """Draw one response latency from the configured distribution."""
+        config = self.config
+        mean = max(0.0, config.latency_mean)
+        with self._lock:
+            if config.latency_distribution == "fixed" or mean == 0:
+                return mean
+            if config.latency_distribution == "uniform":
+                spread = mean * config.latency_spread
+                return max(0.0, self._random.uniform(mean - spread, mean + spread))
+            if config.latency_distribution == "exponential":
+                return self._random.expovariate(1.0 / mean)
+            sigma = config.latency_spread
+            return self._random.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+
+    def completion_words(self, prompt: str):
+        """Deterministic filler words for a completion."""
+        seed_words = prompt.split() or ["ok"]
+        return [
+            seed_words[i % len(seed_words)] for i in range(self.config.response_words)
+        ]
+
+
+def _make_handler(server: StandInServer):
+    class ChatCompletionsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _send_json(
+            self,
+            status: int,
+            body: Dict[str, Any],
+            headers: Optional[Dict[str, str]] = None,
+        ) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": {"message": "invalid JSON"}})
+                return
+
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"no route {self.path}"}})
+                return
+
+            server._count("requests")
+            config = server.config
+            retry_headers = (
+                {"Retry-After": f"{config.retry_after:g}"}
+                if config.retry_after is not None
+                else {}
+            )
+
+            draw = server._draw()
+            if draw < config.rate_limit_rate:
+                server._count("rate_limited")
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit exceeded"}},
+                    {**retry_headers, "x-ratelimit-remaining-requests": "0"},
+                )
+                return
+            if draw < config.rate_limit_rate + config.unavailable_rate:
+                server._count("unavailable")
+                self._send_json(
+                    503, {"error": {"message": "Service unavailable"}}, retry_headers
+                )
+                return
+
+            time.sleep(server.sample_latency())
+
+            messages = request.get("messages") or [{}]
+            prompt = str(messages[-1].get("content", ""))
+            words = server.completion_words(prompt)
+            model = request.get("model", "standin")
+            usage = {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(words),
+                "total_tokens": len(prompt.split()) + len(words),
+            }
+
+            if request.get("stream"):
+                server._count("streamed")
+                self._stream(model, words, usage)
+            else:
+                self._send_json(
+                    200,
+                    {
+                        "id": "standin",
+                        "object": "chat.completion",
+                        "model": model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": " ".join(words),
+                                },
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": usage,
+                    },
+                )
+            server._count("ok")
+
+        def _stream(self, model: str, words, usage: Dict[str, int]) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def send(event: Any) -> None:
+                payload = event if isinstance(event, str) else json.dumps(event)
+                self.wfile.write(f"data: {payload}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(server.config.chunk_delay)
+                text = word if i == 0 else f" {word}"
+                send(
+                    {
+                        "model": model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": text},
+                                "finish_reason": None,
+                            }
+                        ],
+                    }
+                )
+            send(
+                {
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    "usage": usage,
+                }
+            )
+            send("[DONE]")
+
+    return ChatCompletionsHandler
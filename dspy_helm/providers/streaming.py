@@ -0,0 +1,174 @@
+"""
+Streaming responses for providers.
+
+A ProviderStream yields response text as it arrives, records the
+time-to-first-token, can stop early once a predicate on the text so far
+is satisfied, and collects into a normal ProviderResponse.
+"""
+
+from typing import Callable, Generator, Iterable, Iterator, List, Optional, Union
+import time
+
+from .base import ProviderResponse
+
+# Chunk source: yields text, returns the final response (content is filled in)
+ChunkSource = Generator[str, None, Optional[ProviderResponse]]
+
+
+def iter_sse_data(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """
+    Decode the ``data`` payloads of a server-sent event stream.
+
+    Multi-line events are joined with newlines; comments and other fields
+    are ignored, and the OpenAI ``[DONE]`` sentinel ends the stream.
+
+    Args:
+        lines: Raw lines of the response body
+
+    Yields:
+        One data payload per event
+    """
+    data: List[str] = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.rstrip("\r\n")
+
+        if not line:
+            if data:
+                payload = "\n".join(data)
+                data = []
+                if payload == "[DONE]":
+                    return
+                yield payload
+            continue
+
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+
+    if data and "\n".join(data) != "[DONE]":
+        yield "\n".join(data)
+
+
+def replay(response: ProviderResponse) -> ChunkSource:
+    """Chunk source for a response that is already complete."""
+    if response.content:
+        yield response.content
+    return response
+
+
+class ProviderStream:
+    """Iterator over response chunks that collects into a ProviderResponse."""
+
+    def __init__(
+        self,
+        source: ChunkSource,
+        provider: str = "",
+        model: str = "",
+        stop_when: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Initialize stream.
+
+        Args:
+            source: Generator yielding text and returning the final response
+            provider: Name of the provider producing the chunks
+            model: Model producing the chunks
+            stop_when: Predicate on the text so far; True stops the stream
+        """
+        self.provider = provider
+        self.model = model
+        self.stop_when = stop_when
+        self.ttft_seconds: Optional[float] = None
+        self.stopped_early = False
+        self.response: Optional[ProviderResponse] = None
+        self._source = source
+        self._callbacks: List[Callable[[ProviderResponse], None]] = []
+        self._chunks: List[str] = []
+        self._pending: List[str] = []
+        self._start_time = time.time()
+
+    @property
+    def content(self) -> str:
+        """Text received so far."""
+        return "".join(self._chunks)
+
+    def __iter__(self) -> Iterator[str]:
+        while self._pending:
+            yield self._pending.pop(0)
+        while self.response is None:
+            chunk = self._next_chunk()
+            if chunk is None:
+                break
+            yield chunk
+
+    def _next_chunk(self) -> Optional[str]:
+        """Pull one chunk from the source, finishing the stream when done."""
+        try:
+            chunk = next(self._source)
+        except StopIteration as stop:
+            self._finish(stop.value)
+            return None
+
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.time() - self._start_time
+        self._chunks.append(chunk)
+
+        if self.stop_when is not None and self.stop_when(self.content):
+            self.stopped_early = True
+            self.close()
+        return chunk
+
+    def start(self) -> bool:
+        """
+        Wait for the first chunk (or the end of the stream).
+
+        Used by ProviderChain to fail over before any text is shown.
+
+        Returns:
+            False if the stream failed without producing any text
+        """
+        if not self._chunks and self.response is None:
+            chunk = self._next_chunk()
+            if chunk is not None:
+                self._pending.append(chunk)
+        return bool(self._chunks) or bool(self.response and self.response.success)
+
+    def collect(self) -> ProviderResponse:
+        """
+        Consume the rest of the stream.
+
+        Returns:
+            ProviderResponse with the full (or early-stopped) content
+        """
+        for _ in self:
+            pass
+        return self.response
+
+    def add_done_callback(self, fn: Callable[[ProviderResponse], None]) -> None:
+        """Call ``fn`` with the collected response once the stream finishes."""
+        if self.response is not None:
+            fn(self.response)
+        else:
+            self._callbacks.append(fn)
+
+    def close(self) -> None:
+        """Stop reading; the underlying connection is released."""
+        if self.response is None:
+            self._source.close()
+            self._finish(None)
+
+    def _finish(self, final: Optional[ProviderResponse]) -> None:
+        response = final or ProviderResponse(
+            success=True, provider=self.provider, model=self.model
+        )
+        if response.success or self._chunks:
+            response.content = self.content
+        response.latency_seconds = time.time() - self._start_time
+        response.metadata["ttft_seconds"] = self.ttft_seconds
+        response.metadata["stopped_early"] = self.stopped_early
+        response.metadata["streamed"] = True
+        self.response = response
+        for fn in self._callbacks:
+            fn(response)
+        self._callbacks.clear()
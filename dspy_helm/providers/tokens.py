@@ -0,0 +1,88 @@
+"""
+Token counting for providers.
+
+Providers report exact counts when the API returns a ``usage`` block;
+otherwise counts are estimated locally, with tiktoken when it is installed
+and a characters/words heuristic when it is not.
+"""
+
+from functools import lru_cache
+from typing import Optional, TYPE_CHECKING
+import re
+
+if TYPE_CHECKING:
+    from .base import ProviderResponse
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken's cl100k_base encoding, or None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Token count (exact for cl100k-style tokenizers if tiktoken is
+        installed, otherwise a heuristic estimate)
+    """
+    if not text:
+        return 0
+
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    # ~4 characters per token for English prose; code and punctuation-heavy
+    # text splits into more, shorter tokens
+    return max(1, round(len(text) / 4), round(len(_WORD.findall(text)) * 0.75))
+
+
+def fill_token_counts(response: "ProviderResponse", prompt: str) -> "ProviderResponse":
+    """
+    Fill in missing prompt/completion token counts with local estimates.
+
+    Counts reported by the provider are kept; estimated responses are
+    marked with ``metadata["tokens_estimated"]``.
+
+    Args:
+        response: Provider response to complete
+        prompt: Prompt that produced it
+
+    Returns:
+        The same response, updated in place
+    """
+    if not response.success:
+        return response
+
+    estimated = False
+    if not response.prompt_tokens:
+        response.prompt_tokens = estimate_tokens(prompt)
+        estimated = True
+    if not response.completion_tokens:
+        response.completion_tokens = estimate_tokens(response.content)
+        estimated = True
+
+    if estimated and response.tokens_used:
+        # Provider reported only a total: keep it and attribute the rest
+        response.completion_tokens = max(
+            0, response.tokens_used - response.prompt_tokens
+        )
+    else:
+        response.tokens_used = response.prompt_tokens + response.completion_tokens
+
+    if estimated:
+        response.metadata["tokens_estimated"] = True
+    return response
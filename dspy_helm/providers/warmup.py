@@ -0,0 +1,137 @@
+"""
+Background warm-up pinger.
+
+HuggingFace's serverless Inference API unloads models that sit idle, and
+the next request then waits (or fails) while the model loads. During
+long evaluation or optimization runs a ModelWarmer pings each configured
+model on a fixed interval so it stays loaded.
+
+Example:
+    with warmer_from_config("huggingface"):
+        evaluator.evaluate(program, devset)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import threading
+import time
+
+from .base import BaseProvider
+
+logger = logging.getLogger(__name__)
+
+# Models idle for a few minutes may be unloaded; ping well within that
+DEFAULT_WARMUP_INTERVAL_SECONDS = 240.0
+
+
+class ModelWarmer:
+    """Periodically calls ``warm_up()`` on providers from a daemon thread."""
+
+    def __init__(
+        self,
+        providers: Iterable[BaseProvider],
+        interval_seconds: float = DEFAULT_WARMUP_INTERVAL_SECONDS,
+    ):
+        """
+        Initialize warmer.
+
+        Args:
+            providers: Providers (one per model) to keep warm
+            interval_seconds: Seconds between ping rounds
+        """
+        self.providers: List[BaseProvider] = list(providers)
+        self.interval_seconds = interval_seconds
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ping_all(self) -> Dict[str, bool]:
+        """
+        Ping every provider once.
+
+        Returns:
+            "<provider>:<model>" -> whether it answered ready
+        """
+        results = {}
+        for provider in self.providers:
+            key = f"{provider.name}:{provider.model}"
+            try:
+                ready = bool(provider.warm_up())
+            except Exception as e:
+                logger.warning(f"Warm-up of {key} failed: {e}")
+                ready = False
+            results[key] = ready
+            with self._lock:
+                entry = self._status.setdefault(key, {"pings": 0, "ready_pings": 0})
+                entry["pings"] += 1
+                entry["ready_pings"] += int(ready)
+                entry["ready"] = ready
+                entry["last_ping"] = time.time()
+        return results
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            results = self.ping_all()
+            cold = [key for key, ready in results.items() if not ready]
+            if cold:
+                logger.info(f"Warming up: {', '.join(cold)}")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> "ModelWarmer":
+        """Start pinging in the background (the first round runs immediately)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="model-warmer", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop pinging; an in-flight ping round is allowed to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds)
+            self._thread = None
+
+    def __enter__(self) -> "ModelWarmer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Ping counts, last readiness and last ping time per model."""
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._status.items()}
+
+
+def warmer_from_config(
+    name: str = "huggingface", interval_seconds: Optional[float] = None
+) -> ModelWarmer:
+    """
+    Build a warmer for every model listed for a provider in providers.yaml.
+
+    Args:
+        name: Provider key in providers.yaml
+        interval_seconds: Seconds between pings (default: the provider's
+            ``warmup.interval_seconds``, else DEFAULT_WARMUP_INTERVAL_SECONDS)
+
+    Returns:
+        ModelWarmer over the shared provider instances (not started)
+    """
+    from . import get_provider_by_name
+    from ..config import get_provider_config
+
+    config = get_provider_config(name)
+    models = config.get("models") or {}
+    names = models.get("available") or [models.get("default")]
+    if interval_seconds is None:
+        warmup = config.get("warmup") or {}
+        interval_seconds = warmup.get(
+            "interval_seconds", DEFAULT_WARMUP_INTERVAL_SECONDS
+        )
+
+    providers = [get_provider_by_name(name, model) for model in names]
+    return ModelWarmer(providers, interval_seconds=interval_seconds)
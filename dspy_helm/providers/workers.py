@@ -0,0 +1,172 @@
+"""
+Warm worker processes for CLI-backed providers.
+
+Starting a CLI such as Gemini's costs a process spawn plus its runtime
+bootstrap (often Node). The pool keeps a few processes already started and
+blocked on stdin, so a call only writes the prompt and reads the answer.
+Each process serves one prompt and is replaced in the background; idle
+processes are recycled and dead ones discarded.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import atexit
+import logging
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerPoolConfig:
+    """Configuration for pre-spawned CLI worker processes."""
+
+    size: int = 2
+    max_idle_seconds: float = 300.0
+
+
+class WarmProcessPool:
+    """Pool of pre-spawned processes that read one prompt from stdin."""
+
+    def __init__(self, argv: List[str], config: Optional[WorkerPoolConfig] = None):
+        """
+        Initialize pool; processes are spawned on first use.
+
+        Args:
+            argv: Command that reads the prompt from stdin
+            config: Pool configuration
+        """
+        self.argv = list(argv)
+        self.config = config or WorkerPoolConfig()
+        self.spawned = 0
+        self.warm_starts = 0
+        self.cold_starts = 0
+        self.recycled = 0
+        self._idle: List[Tuple[subprocess.Popen, float]] = []
+        self._lock = threading.Lock()
+        self._starting = 0
+        self._closed = False
+        atexit.register(self.close)
+
+    def _spawn(self) -> subprocess.Popen:
+        process = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        with self._lock:
+            self.spawned += 1
+        return process
+
+    def _healthy(self, process: subprocess.Popen, spawned_at: float) -> bool:
+        """A warm process is usable if it is still running and not stale."""
+        if process.poll() is not None:
+            return False
+        return time.monotonic() - spawned_at < self.config.max_idle_seconds
+
+    def _take(self) -> Optional[subprocess.Popen]:
+        """Pop a healthy warm process, discarding dead or stale ones."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                process, spawned_at = self._idle.pop(0)
+            if self._healthy(process, spawned_at):
+                return process
+            with self._lock:
+                self.recycled += 1
+            _terminate(process)
+
+    def fill(self) -> None:
+        """Spawn processes until the pool holds ``size`` warm workers."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._starting >= (
+                    self.config.size
+                ):
+                    return
+                self._starting += 1
+            try:
+                process = self._spawn()
+            except OSError as e:
+                logger.warning(f"Could not pre-spawn {self.argv[0]}: {e}")
+                return
+            finally:
+                with self._lock:
+                    self._starting -= 1
+
+            with self._lock:
+                if not self._closed:
+                    self._idle.append((process, time.monotonic()))
+                    continue
+            _terminate(process)
+            return
+
+    def _refill_async(self) -> None:
+        threading.Thread(
+            target=self.fill, name=f"warm-{self.argv[0]}", daemon=True
+        ).start()
+
+    def run(self, stdin_text: str, timeout: float) -> Tuple[int, str, str]:
+        """
+        Send one prompt to a warm process and wait for its output.
+
+        Args:
+            stdin_text: Prompt written to the process's stdin
+            timeout: Seconds before the process is killed
+
+        Returns:
+            (returncode, stdout, stderr)
+
+        Raises:
+            subprocess.TimeoutExpired: If the process does not finish in time
+        """
+        process = self._take()
+        if process is None:
+            process = self._spawn()
+            with self._lock:
+                self.cold_starts += 1
+        else:
+            with self._lock:
+                self.warm_starts += 1
+        self._refill_async()
+
+        try:
+            stdout, stderr = process.communicate(stdin_text, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _terminate(process)
+            raise
+        return process.returncode, stdout, stderr
+
+    def stats(self) -> Dict[str, int]:
+        """Spawn and reuse counters."""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "spawned": self.spawned,
+                "warm_starts": self.warm_starts,
+                "cold_starts": self.cold_starts,
+                "recycled": self.recycled,
+            }
+
+    def close(self) -> None:
+        """Terminate every idle worker."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for process, _ in idle:
+            _terminate(process)
+
+
+def _terminate(process: subprocess.Popen) -> None:
+    """Kill a worker and reap it."""
+    if process.poll() is None:
+        process.kill()
+    try:
+        process.communicate(timeout=5)
+    except (subprocess.TimeoutExpired, ValueError, OSError):
+        pass
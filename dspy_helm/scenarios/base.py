@@ -10,6 +10,7 @@ import random
 
 if TYPE_CHECKING:
     import dspy
+    from ..providers.params import GenerationParams
 
 
 class BaseScenario(ABC):
@@ -20,6 +21,12 @@ class BaseScenario(ABC):
     DEFAULT_SPLIT_RATIO: float = 0.8
     MIN_TRAIN_SIZE: int = 5
     MIN_VAL_SIZE: int = 3
+    # Generation settings the scenario's outputs need (None = LM defaults);
+    # short outputs for metrics that read a few lines cut latency
+    GENERATION_PARAMS: Optional["GenerationParams"] = None
+    # Examples per request in packed evaluation (--pack); suits scenarios
+    # with short inputs and outputs
+    PACK_SIZE: int = 8
 
     def __init__(self, test_size: float = 0.2, seed: int = 42):
         self.test_size = test_size
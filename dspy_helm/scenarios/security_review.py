@@ -7,6 +7,7 @@ Category: Code Review & Analysis
 
 from typing import List, Dict, Any, TYPE_CHECKING
 from .base import BaseScenario, ScenarioRegistry
+from ..providers.params import GenerationParams
 
 if TYPE_CHECKING:
     import dspy
@@ -18,6 +19,11 @@ class SecurityReviewScenario(BaseScenario):
 
     INPUT_FIELDS = ["code"]
     OUTPUT_FIELDS = ["review"]
+    # The metric looks for the vulnerability name, which a short review
+    # states up front
+    GENERATION_PARAMS = GenerationParams(max_tokens=400, temperature=0.0)
+    # One-line snippets: many fit in one request
+    PACK_SIZE = 10
 
     def _load_raw_data(self) -> List[Dict[str, Any]]:
         """Load security review test cases."""
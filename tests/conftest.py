@@ -131,6 +131,150 @@ for mod_name, mock in _mock_modules.items():
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+import asyncio  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+
+from dspy_helm.providers.base import (  # noqa: E402
+    BaseProvider,
+    ProviderResponse,
+    RateLimitConfig,
+)
+
+
+class FakeProvider(BaseProvider):
+    """
+    Scripted in-process provider for provider-layer tests.
+
+    Each call takes the next entry of ``outcomes``, then ``outcome`` once
+    they run out: "ok" answers with ``content``, "429" is a rate-limited
+    failure and any other string is a failure with that error.
+
+    ``content`` is a template (``{prompt}`` and ``{n}``, the 1-based call
+    number are substituted), a list of templates used in turn, or a
+    callable taking the prompt; None in a list or from a callable fails
+    with "down". ``retries`` enables rate limiting with that many fast
+    retries; ``defaults`` stands in for the provider's default_params.
+    Every call is recorded in ``calls``.
+    """
+
+    def __init__(
+        self,
+        name: str = "Fake",
+        model: str = "test",
+        outcomes=(),
+        outcome: str = "ok",
+        content="ok",
+        delay: float = 0.0,
+        retries: int = 0,
+        rate_limit=None,
+        configured: bool = True,
+        context_window=None,
+        response_fields=None,
+        defaults=None,
+        **kwargs,
+    ):
+        super().__init__(
+            name=name,
+            command="test",
+            subcommand="test",
+            model=model,
+            rate_limit=rate_limit
+            or RateLimitConfig(
+                enabled=retries > 0,
+                max_retries=retries,
+                backoff_factor=0.01,
+                max_backoff=0.01,
+            ),
+            **kwargs,
+        )
+        self.outcomes = list(outcomes)
+        self.outcome = outcome
+        self.content = content
+        self.delay = delay
+        self.configured = configured
+        self.response_fields = response_fields or {}
+        self.defaults = defaults
+        if context_window is not None:
+            self.CONTEXT_WINDOWS = {model: context_window}
+            self.OUTPUT_RESERVE_TOKENS = 100
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def call_count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def prompts(self):
+        return [prompt for prompt, _ in self.calls]
+
+    @property
+    def kwargs(self):
+        return [kwargs for _, kwargs in self.calls]
+
+    @property
+    def params(self):
+        return [self.generation_params(kwargs) for _, kwargs in self.calls]
+
+    @property
+    def default_params(self):
+        return self.defaults or super().default_params
+
+    def is_configured(self) -> bool:
+        return self.configured
+
+    def _start(self, prompt, kwargs):
+        with self._lock:
+            self.calls.append((prompt, kwargs))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            outcome = self.outcomes.pop(0) if self.outcomes else self.outcome
+            return outcome, len(self.calls)
+
+    def _finish(self, prompt, outcome, n):
+        with self._lock:
+            self.in_flight -= 1
+        if outcome == "ok":
+            content = self.content
+            if isinstance(content, (list, tuple)):
+                content = content[(n - 1) % len(content)]
+            if callable(content):
+                content = content(prompt)
+            elif content is not None:
+                content = content.replace("{prompt}", prompt).replace("{n}", str(n))
+            if content is not None:
+                return ProviderResponse(
+                    success=True,
+                    content=content,
+                    provider=self.name,
+                    model=self.model,
+                    **self.response_fields,
+                )
+            outcome = "down"
+        rate_limited = outcome == "429"
+        return ProviderResponse(
+            success=False,
+            provider=self.name,
+            model=self.model,
+            error="Rate limit exceeded" if rate_limited else outcome,
+            rate_limited=rate_limited,
+        )
+
+    def _execute_cli(self, prompt, **kwargs):
+        outcome, n = self._start(prompt, kwargs)
+        if self.delay:
+            time.sleep(self.delay)
+        return self._finish(prompt, outcome, n)
+
+    async def _aexecute_cli(self, prompt, **kwargs):
+        outcome, n = self._start(prompt, kwargs)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._finish(prompt, outcome, n)
+
 
 def get_gemini_api_key() -> str:
     """Get Gemini API key from config."""
@@ -226,6 +370,12 @@ def sample_api_design_data():
     }
 
 
+@pytest.fixture
+def fake_provider():
+    """Factory for scripted providers (see FakeProvider)."""
+    return FakeProvider
+
+
 @pytest.fixture
 def mock_provider_response():
     """Create a mock provider response."""
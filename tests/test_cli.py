@@ -73,6 +73,139 @@ class TestSetupDSPyLM:
         # Result might be None if dspy not fully configured
         assert result is None or result is not None
 
+    @patch("dspy_helm.providers.get_provider_by_name")
+    def test_setup_dspy_lm_enforces_budget(self, mock_get_provider):
+        """Test the LM's chain is built with the run budget."""
+        from dspy_helm.cli import build_budget, setup_dspy_lm
+
+        assert build_budget() is None
+        budget = build_budget(max_requests=3, max_cost=1.0)
+        assert budget.max_requests == 3
+
+        with patch("dspy_helm.providers.dspy_lm.ProviderLM") as mock_lm:
+            setup_dspy_lm("groq", budget=budget)
+        chain = mock_lm.call_args[0][0]
+        assert chain.budget is budget
+
+    def test_budget_flags_reach_run_evaluation(self):
+        """Test budget flags are passed to run_evaluation and reported."""
+        from dspy_helm.cli import main, print_budget
+        from dspy_helm.providers.budget import RunBudget
+
+        argv = ["dspy_helm.cli", "--scenario", "security_review", "--evaluate-only"]
+        argv += ["--max-tokens-budget", "5000", "--max-cost", "0.5"]
+        with patch("dspy_helm.cli.run_evaluation") as mock_run:
+            with patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit):
+                    main()
+        call_kwargs = mock_run.call_args[1]
+        assert call_kwargs["max_tokens_budget"] == 5000
+        assert call_kwargs["max_cost"] == 0.5
+        assert call_kwargs["max_requests"] is None
+
+        budget = RunBudget(max_requests=0)
+        budget.reject()
+        with patch("builtins.print") as mock_print:
+            print_budget(budget)
+        printed = " ".join(str(c.args[0]) for c in mock_print.call_args_list)
+        assert "1 calls refused" in printed
+        assert "request budget of 0 used" in printed
+
+    def test_explicit_model_is_kept(self):
+        """Test --model reaches the provider even if it is another's default."""
+        from dspy_helm.cli import main
+
+        argv = ["dspy_helm.cli", "--scenario", "security_review", "--evaluate-only"]
+        with patch("dspy_helm.cli.run_evaluation") as mock_run:
+            with patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit):
+                    main()
+            assert mock_run.call_args[1]["model"] is None
+
+            argv += ["--provider", "openrouter", "--model", "llama-3.3-70b-versatile"]
+            with patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit):
+                    main()
+            assert mock_run.call_args[1]["model"] == "llama-3.3-70b-versatile"
+
+    def test_model_with_chain_is_rejected(self):
+        """Test --model is an error with --provider chain, not silently dropped."""
+        from dspy_helm.cli import main
+
+        argv = ["dspy_helm.cli", "--scenario", "security_review"]
+        argv += ["--provider", "chain", "--model", "some-model"]
+        with patch("dspy_helm.cli.run_evaluation") as mock_run:
+            with patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit) as exc_info:
+                    main()
+        assert exc_info.value.code == 2
+        mock_run.assert_not_called()
+
+    def test_chain_lm_is_named_after_the_chain(self):
+        """Test a chain LM reports the chain, not its first provider's model."""
+        from dspy_helm.cli import setup_dspy_lm
+
+        registry = MagicMock()
+        registry.chain_order.return_value = ["groq", "openrouter"]
+        with patch("dspy_helm.providers.get_registry", return_value=registry):
+            with patch("dspy_helm.providers.dspy_lm.ProviderLM") as mock_lm:
+                with patch("dspy_helm.providers.get_scheduler"):
+                    setup_dspy_lm("chain")
+        assert mock_lm.call_args[1]["model"] == "chain/groq>openrouter"
+
+
+class TestAsk:
+    """Test single-prompt queries."""
+
+    def test_ask_is_scheduled_as_interactive(self, capsys):
+        """Test ask() goes through the shared scheduler at interactive priority."""
+        from dspy_helm.cli import ask
+        from dspy_helm.providers.base import ProviderResponse
+
+        provider = MagicMock()
+        scheduler = MagicMock()
+        scheduler.client.return_value.call.return_value = ProviderResponse(
+            success=True, content="answer", provider="groq", model="m"
+        )
+        with patch("dspy_helm.providers.get_provider_by_name", return_value=provider):
+            with patch("dspy_helm.providers.get_scheduler", return_value=scheduler):
+                response = ask("question", "groq")
+
+        priority, chain = scheduler.client.call_args[0]
+        assert priority == "interactive"
+        assert chain.providers == [provider]
+        assert response.content == "answer"
+        assert "answer" in capsys.readouterr().out
+
+
+class TestRunEvaluationCassette:
+    """Test cassettes are attached to the shared providers for one run only."""
+
+    def test_cassette_detached_after_run(self, tmp_path):
+        """Test providers replay during the run and not afterwards."""
+        from dspy_helm.cli import run_evaluation
+
+        provider = MagicMock(cassette=None)
+        lm = MagicMock()
+        lm.chain.providers = [provider]
+        seen = []
+
+        def evaluate(program, devset):
+            seen.append(provider.cassette)
+            return {"score": 1.0}
+
+        with patch("dspy_helm.cli.setup_dspy_lm", return_value=lm):
+            with patch("dspy_helm.eval.Evaluator") as mock_evaluator:
+                mock_evaluator.return_value.evaluate.side_effect = evaluate
+                run_evaluation(
+                    "security_review",
+                    evaluate_only=True,
+                    cassette_path=str(tmp_path / "run.jsonl"),
+                )
+
+        assert seen[0] is not None and seen[0].mode == "replay"
+        assert provider.cassette is None
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -130,6 +130,43 @@ class TestEvaluatorEvaluate:
         assert result["count"] == 0
 
 
+class TestEvaluatorPacked:
+    """Test packed evaluation of scenario prompts."""
+
+    def test_evaluate_packed(self):
+        """Test examples are scored from a single packed request."""
+        import json
+        from types import SimpleNamespace
+
+        from dspy_helm.eval import Evaluator
+        from dspy_helm.providers.base import ProviderResponse
+
+        scenario = MagicMock()
+        scenario.OUTPUT_FIELDS = ["review"]
+        scenario.make_prompt = lambda row: f"Review: {row['code']}"
+        scenario.metric = lambda example, pred: float(
+            example["expected"] in pred.review
+        )
+        answers = [{"id": 1, "answer": "SQL injection"}, {"id": 2, "answer": "none"}]
+        target = MagicMock()
+        target.call.return_value = ProviderResponse(
+            success=True, content=json.dumps(answers)
+        )
+        devset = [
+            {"code": "q1", "expected": "SQL injection"},
+            {"code": "q2", "expected": "XSS"},
+        ]
+
+        evaluator = Evaluator(metric=scenario.metric, num_threads=2)
+        with patch("dspy.Prediction", SimpleNamespace):
+            results = evaluator.evaluate_packed(scenario, devset, target, pack_size=4)
+
+        assert results["score"] == 0.5
+        assert results["outputs"][1]["prediction"] == {"review": "none"}
+        assert results["packing"]["requests"] == 1
+        assert target.call.call_count == 1
+
+
 class TestEvaluatorExport:
     """Test evaluator export functionality."""
 
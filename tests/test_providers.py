@@ -167,5 +167,2611 @@ class TestOpenCodeZenProvider:
         assert provider.model == "minimax-m2.1-free"
 
 
+class TestAsyncProviders:
+    """Test the asyncio provider API."""
+
+    def test_acall_retries_rate_limited(self, fake_provider):
+        """Test acall retries rate limited responses like call."""
+        import asyncio
+
+        provider = fake_provider("P1", outcomes=["429"] * 2, retries=2)
+        response = asyncio.run(provider.acall("hello"))
+
+        assert response.success is True
+        assert provider.call_count == 3
+
+    def test_chain_acall_failover(self, fake_provider):
+        """Test ProviderChain.acall falls through to the next provider."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+
+        provider1 = fake_provider("P1", outcome="down")
+        provider2 = fake_provider("P2")
+        chain = ProviderChain([provider1, provider2])
+
+        response = asyncio.run(chain.acall("hello"))
+
+        assert response.success is True
+        assert response.provider == "P2"
+        assert provider1.call_count == 1
+
+    def test_chain_acall_concurrent(self, fake_provider):
+        """Test many prompts can be in flight on one event loop."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+
+        chain = ProviderChain([fake_provider("P1", content="{prompt}")])
+
+        async def run():
+            return await asyncio.gather(*(chain.acall(f"p{i}") for i in range(50)))
+
+        responses = asyncio.run(run())
+        assert [r.content for r in responses] == [f"p{i}" for i in range(50)]
+
+    def test_http_provider_acall(self):
+        """Test OpenAI-compatible providers use the async client."""
+        import asyncio
+        from unittest.mock import MagicMock, AsyncMock
+        from dspy_helm.providers.opencode_zen import OpenCodeZenProvider
+
+        http_response = MagicMock()
+        http_response.status_code = 200
+        http_response.json.return_value = {
+            "choices": [{"message": {"content": "async hello"}}],
+            "usage": {"total_tokens": 7},
+        }
+        client = MagicMock()
+        client.post = AsyncMock(return_value=http_response)
+
+        provider = OpenCodeZenProvider()
+        provider._get_async_client = lambda: client
+        response = asyncio.run(provider.acall("hi"))
+
+        assert response.success is True
+        assert response.content == "async hello"
+        assert response.tokens_used == 7
+        assert client.post.call_args.kwargs["json"]["messages"][0]["content"] == "hi"
+
+    def test_http_provider_429_is_rate_limited(self):
+        """Test HTTP 429 responses trigger the retry path."""
+        from unittest.mock import MagicMock
+        from dspy_helm.providers.groq import GroqProvider
+
+        http_response = MagicMock()
+        http_response.status_code = 429
+        provider = GroqProvider()
+        provider.api_key = "test-key"
+        provider.session = MagicMock()
+        provider.session.post.return_value = http_response
+
+        response = provider._execute_cli("hi")
+
+        assert response.success is False
+        assert response.rate_limited is True
+
+    def test_http_provider_hooks_are_abstract(self):
+        """Test a subclass missing a payload/parse hook fails at instantiation."""
+        from dspy_helm.providers.http_provider import HTTPProvider
+
+        class NoParser(HTTPProvider):
+            def _build_payload(self, prompt, **kwargs):
+                return {"inputs": prompt}
+
+        with pytest.raises(TypeError, match="_parse_success"):
+            NoParser(
+                name="Partial",
+                subcommand="m",
+                model="m",
+                base_url="https://example.invalid",
+            )
+
+    def test_cli_provider_acall(self):
+        """Test CLI providers run as asyncio subprocesses."""
+        import asyncio
+        import sys
+        from dspy_helm.providers.cli_provider import CLIProvider
+
+        provider = CLIProvider(
+            name="Python", command=sys.executable, subcommand="-c", model="test"
+        )
+        response = asyncio.run(provider.acall("print('hello from cli')"))
+
+        assert response.success is True
+        assert response.content == "hello from cli"
+
+
+class TestHedgedRequests:
+    """Test hedged requests in ProviderChain."""
+
+    def test_latency_tracker_percentile(self):
+        """Test LatencyTracker percentile and hedge delay."""
+        from dspy_helm.providers.hedging import HedgeConfig, LatencyTracker
+
+        tracker = LatencyTracker()
+        for latency in [0.1, 0.2, 0.3, 0.4, 1.0]:
+            tracker.record("P1", latency)
+
+        assert tracker.percentile("P1", 0.5) == 0.3
+        assert tracker.percentile("P1", 1.0) == 1.0
+        assert tracker.percentile("missing", 0.5) is None
+        config = HedgeConfig(percentile=0.5, min_samples=5)
+        assert tracker.hedge_delay("P1", config) == 0.3
+        assert tracker.hedge_delay("missing", config) == config.initial_delay
+
+    def test_hedge_wins_when_primary_slow(self, fake_provider):
+        """Test a slow primary is hedged and the hedge wins."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.hedging import HedgeConfig
+
+        chain = ProviderChain(
+            [
+                fake_provider("Slow", delay=1.0, content="Slow"),
+                fake_provider("Fast", content="Fast"),
+            ],
+            hedge=HedgeConfig(initial_delay=0.05),
+        )
+        response = chain.call("prompt")
+
+        assert response.content == "Fast"
+        assert chain.hedge_stats.hedges_started == 1
+        assert chain.hedge_stats.hedges_won == 1
+
+    def test_no_hedge_when_primary_fast(self, fake_provider):
+        """Test no hedge is started when the primary answers in time."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.hedging import HedgeConfig
+
+        backup = fake_provider("Backup", content="Backup")
+        chain = ProviderChain(
+            [fake_provider("Primary", content="Primary"), backup],
+            hedge=HedgeConfig(initial_delay=1.0),
+        )
+        response = chain.call("prompt")
+
+        assert response.content == "Primary"
+        assert chain.hedge_stats.as_dict()["hedges_started"] == 0
+        assert backup.call_count == 0
+
+    def test_async_hedge_cancels_loser(self, fake_provider):
+        """Test the async hedged path returns the first winner."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.hedging import HedgeConfig
+
+        chain = ProviderChain(
+            [
+                fake_provider("Slow", delay=5.0, content="Slow"),
+                fake_provider("Fast", content="Fast"),
+            ],
+            hedge=HedgeConfig(initial_delay=0.05),
+        )
+        response = asyncio.run(asyncio.wait_for(chain.acall("prompt"), timeout=2))
+
+        assert response.content == "Fast"
+        assert chain.hedge_stats.hedges_won == 1
+
+
+class TestResponseCache:
+    """Test the persistent response cache."""
+
+    def test_cache_hit_and_counters(self, fake_provider, tmp_path):
+        """Test repeated prompts are served from the cache."""
+        from dspy_helm.providers.cache import ResponseCache
+
+        provider = fake_provider(
+            "Counting",
+            content="{prompt} #{n}",
+            cache=ResponseCache(tmp_path / "cache.sqlite3"),
+        )
+
+        first = provider.call("hello")
+        second = provider.call("hello")
+
+        assert provider.call_count == 1
+        assert second.content == first.content
+        assert first.metadata["cache"] == "miss"
+        assert second.metadata["cache"] == "hit"
+        assert second.metadata["cache_hits"] == 1
+        assert second.metadata["cache_misses"] == 1
+
+    def test_cache_key_includes_params(self, fake_provider):
+        """Test generation parameters are part of the cache key."""
+        from dspy_helm.providers.cache import ResponseCache
+
+        provider = fake_provider(
+            "Counting", content="{prompt} #{n}", cache=ResponseCache(":memory:")
+        )
+        provider.call("hello", temperature=0.0)
+        provider.call("hello", temperature=1.0)
+
+        assert provider.call_count == 2
+
+    def test_cache_key_uses_resolved_params(self, fake_provider):
+        """Test provider defaults, omitted values and timeouts share a key."""
+        from dspy_helm.providers import GenerationParams
+        from dspy_helm.providers.cache import ResponseCache
+
+        provider = fake_provider(
+            "Counting",
+            content="{prompt} #{n}",
+            cache=ResponseCache(":memory:"),
+            defaults=GenerationParams(max_tokens=1000, temperature=0.7),
+        )
+        provider.call("hello")
+        provider.call("hello", max_tokens=1000)
+        provider.call("hello", temperature=None, timeout=5)
+        provider.call("hello", params=GenerationParams(temperature=0.7))
+        assert provider.call_count == 1
+
+        provider.call("hello", max_tokens=20)
+        assert provider.call_count == 2
+
+    def test_cache_bypass_and_refresh(self, fake_provider):
+        """Test bypass skips the cache and refresh overwrites it."""
+        from dspy_helm.providers.cache import ResponseCache
+
+        provider = fake_provider(
+            "Counting", content="{prompt} #{n}", cache=ResponseCache(":memory:")
+        )
+        provider.call("hello")
+
+        bypassed = provider.call("hello", cache_bypass=True)
+        refreshed = provider.call("hello", cache_refresh=True)
+        cached = provider.call("hello")
+
+        assert bypassed.metadata["cache"] == "bypass"
+        assert refreshed.metadata["cache"] == "refresh"
+        assert cached.content == refreshed.content == "hello #3"
+
+    def test_cache_persists_across_instances(self, fake_provider, tmp_path):
+        """Test entries survive reopening the SQLite file."""
+        from dspy_helm.providers.cache import ResponseCache
+
+        path = tmp_path / "cache.sqlite3"
+        fake_provider(
+            "Counting", content="{prompt} #{n}", cache=ResponseCache(path)
+        ).call("hello")
+        provider = fake_provider(
+            "Counting", content="{prompt} #{n}", cache=ResponseCache(path)
+        )
+
+        assert provider.call("hello").metadata["cache"] == "hit"
+        assert provider.call_count == 0
+
+    def test_cache_ttl_expiry(self):
+        """Test expired entries are treated as misses."""
+        from dspy_helm.providers.base import ProviderResponse
+        from dspy_helm.providers.cache import ResponseCache
+
+        cache = ResponseCache(":memory:", ttl_seconds=-1)
+        cache.set("key", ProviderResponse(success=True, content="old"))
+
+        assert cache.get("key") is None
+        assert cache.misses == 1
+
+    def test_cache_lru_eviction(self):
+        """Test least recently used entries are evicted over max_bytes."""
+        from dspy_helm.providers.base import ProviderResponse
+        from dspy_helm.providers.cache import ResponseCache
+
+        cache = ResponseCache(":memory:", max_bytes=600)
+        for key in ["a", "b"]:
+            cache.set(key, ProviderResponse(success=True, content=key * 50))
+        cache.get("a")
+        cache.set("c", ProviderResponse(success=True, content="c" * 50))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+
+class TestRateLimiter:
+    """Test proactive, header-driven rate limiting."""
+
+    def test_parse_duration(self):
+        """Test rate-limit reset header formats."""
+        import time
+        from dspy_helm.providers.ratelimit import parse_duration
+
+        assert parse_duration("12") == 12.0
+        assert parse_duration("2m59.5s") == 179.5
+        assert parse_duration("450ms") == 0.45
+        assert parse_duration("1h") == 3600.0
+        assert 9 < parse_duration(str(int((time.time() + 10) * 1000))) <= 10
+        assert parse_duration("garbage") is None
+        assert parse_duration(None) is None
+
+    def test_token_bucket_paces_requests(self):
+        """Test an empty bucket tells callers how long to wait."""
+        from dspy_helm.providers.ratelimit import TokenBucket
+
+        bucket = TokenBucket(requests_per_minute=600, burst=2)
+
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert 0.05 < bucket.reserve() <= 0.1
+        assert 0.15 < bucket.reserve() <= 0.2
+        assert bucket.stats()["waits"] == 2
+
+    def test_unlimited_bucket_never_waits(self):
+        """Test a bucket without a configured rate only honours pauses."""
+        from dspy_helm.providers.ratelimit import TokenBucket
+
+        bucket = TokenBucket()
+        assert all(bucket.reserve() == 0.0 for _ in range(100))
+        bucket.pause(5)
+        assert 4 < bucket.reserve() <= 5
+
+    def test_headers_pause_when_quota_exhausted(self):
+        """Test Retry-After and exhausted x-ratelimit headers pause the limiter."""
+        from dspy_helm.providers.ratelimit import RateLimiter
+
+        limiter = RateLimiter()
+        assert limiter.observe_headers({"retry-after": "3"}) == 3.0
+        assert 2 < limiter.bucket.reserve() <= 3
+
+        limiter = RateLimiter()
+        limiter.observe_headers(
+            {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "7.5s"}
+        )
+        assert 7 < limiter.bucket.reserve() <= 7.5
+
+        limiter = RateLimiter(requests_per_minute=60, burst=10)
+        limiter.observe_headers({"x-ratelimit-remaining-requests": "1"})
+        assert limiter.bucket.reserve() == 0.0
+        assert limiter.bucket.reserve() > 0.0
+
+    def test_retry_uses_retry_after(self):
+        """Test the retry loop waits for Retry-After instead of backing off."""
+        from unittest.mock import MagicMock, patch
+        from dspy_helm.providers.base import RateLimitConfig
+        from dspy_helm.providers.groq import GroqProvider
+
+        limited = MagicMock(status_code=429, headers={"retry-after": "0.25"})
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"choices": [{"message": {"content": "ok"}}]}
+
+        provider = GroqProvider(rate_limit=RateLimitConfig(backoff_factor=30.0))
+        provider.api_key = "test-key"
+        provider.session = MagicMock()
+        provider.session.post.side_effect = [limited, ok]
+
+        with patch("dspy_helm.providers.base.time.sleep") as sleep:
+            response = provider.call("hi")
+
+        assert response.success is True
+        assert sleep.call_args_list[0].args[0] == 0.25
+
+    def test_rate_limit_config_from_dict(self):
+        """Test RateLimitConfig ignores unknown YAML keys."""
+        from dspy_helm.providers.base import RateLimitConfig
+
+        config = RateLimitConfig.from_dict(
+            {"requests_per_minute": 30, "burst": 5, "unknown": True}
+        )
+        assert config.requests_per_minute == 30
+        assert config.burst == 5
+
+
+class TestCircuitBreaker:
+    """Test circuit breakers and health scoring in ProviderChain."""
+
+    def test_breaker_opens_on_error_rate(self, fake_provider):
+        """Test a failing provider is skipped once its breaker opens."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+
+        bad = fake_provider("Bad", outcome="down")
+        good = fake_provider("Good")
+        chain = ProviderChain(
+            [bad, good], circuit_breaker=CircuitBreakerConfig(min_calls=3)
+        )
+
+        for _ in range(10):
+            assert chain.call("prompt").provider == "Good"
+
+        assert bad.call_count == 3
+        assert chain.health()["Bad"]["state"] == "open"
+        assert chain.health()["Bad"]["health"] == 0.0
+        assert chain.health()["Good"]["health"] == 1.0
+
+    def test_unconfigured_provider_skipped(self, fake_provider):
+        """Test providers without credentials are never called."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+
+        missing_key = fake_provider("NoKey", configured=False)
+        chain = ProviderChain(
+            [missing_key, fake_provider("Good")],
+            circuit_breaker=CircuitBreakerConfig(),
+        )
+        chain.call("prompt")
+        chain.call("prompt")
+
+        assert missing_key.call_count == 0
+        assert "not configured" in chain.health()["NoKey"]["last_error"]
+
+    def test_rate_limited_failure_opens_immediately(self, fake_provider):
+        """Test an exhausted rate limit opens the breaker on the first failure."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+
+        limited = fake_provider("Limited", outcome="429")
+        chain = ProviderChain(
+            [limited, fake_provider("Good")],
+            circuit_breaker=CircuitBreakerConfig(),
+        )
+        chain.call("prompt")
+        chain.call("prompt")
+
+        assert limited.call_count == 1
+
+    def test_background_probe_closes_breaker(self, fake_provider):
+        """Test a recovered provider is probed in the background and reused."""
+        import threading
+        import time
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+
+        flaky = fake_provider("Flaky", outcome="down")
+        chain = ProviderChain(
+            [flaky, fake_provider("Good")],
+            circuit_breaker=CircuitBreakerConfig(min_calls=1, cooldown_seconds=0.05),
+        )
+        chain.call("prompt")
+        assert chain.health()["Flaky"]["state"] == "open"
+
+        flaky.outcome = "ok"
+        time.sleep(0.1)
+        chain.call("prompt")  # schedules the probe; served by whoever is available
+        for thread in threading.enumerate():
+            if thread.name == "probe-Flaky":
+                thread.join(timeout=2)
+
+        assert chain.health()["Flaky"]["state"] == "closed"
+        assert chain.call("prompt").provider == "Flaky"
+
+    def test_inline_half_open_failure_backs_off(self):
+        """Test a failed half-open probe reopens with a longer cooldown."""
+        import time
+        from dspy_helm.providers.circuit import CircuitBreaker, CircuitBreakerConfig
+
+        breaker = CircuitBreaker(
+            CircuitBreakerConfig(min_calls=1, cooldown_seconds=0.01)
+        )
+        breaker.record_failure("down")
+        assert breaker.allow_request() is False
+
+        time.sleep(0.02)
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # only one probe at a time
+        breaker.record_failure("still down")
+
+        snapshot = breaker.snapshot()
+        assert snapshot["state"] == "open"
+        assert snapshot["cooldown_seconds"] == 0.02
+        assert snapshot["opened_count"] == 2
+
+
+class TestAdaptiveRouting:
+    """Test latency-adaptive provider ordering."""
+
+    def test_ewma_mode_prefers_fastest_provider(self, fake_provider):
+        """Test traffic moves to the fastest provider once it has been sampled."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.routing import RoutingConfig
+
+        slow = fake_provider("Slow", delay=0.03)
+        fast = fake_provider("Fast", delay=0.0)
+        chain = ProviderChain([slow, fast], routing=RoutingConfig(mode="ewma"))
+
+        chain.call("prompt")  # Slow sampled first (configured order)
+        chain.call("prompt")  # Fast is unsampled, so it is tried next
+        for _ in range(5):
+            assert chain.call("prompt").provider == "Fast"
+        assert slow.call_count == 1
+
+    def test_rate_limited_provider_demoted(self, fake_provider):
+        """Test rate-limit frequency pushes a provider down the order."""
+        from dspy_helm.providers.routing import AdaptiveRouter, RoutingConfig
+
+        router = AdaptiveRouter(RoutingConfig(mode="ewma"))
+        limited = fake_provider("Limited")
+        steady = fake_provider("Steady")
+        router.record("Limited", 0.1, success=True, rate_limited=False)
+        router.record("Limited", 0.1, success=False, rate_limited=True)
+        router.record("Steady", 0.5, success=True, rate_limited=False)
+
+        assert [p.name for p in router.order([limited, steady])] == [
+            "Steady",
+            "Limited",
+        ]
+
+    def test_power_of_two_choices_favours_cheaper(self, fake_provider):
+        """Test p2c puts the cheapest provider first whenever it is sampled."""
+        from dspy_helm.providers.routing import AdaptiveRouter, RoutingConfig
+
+        router = AdaptiveRouter(RoutingConfig(mode="p2c", seed=7))
+        providers = [fake_provider(n) for n in ("A", "B", "C")]
+        for name, latency in (("A", 1.0), ("B", 0.1), ("C", 2.0)):
+            router.record(name, latency, success=True, rate_limited=False)
+
+        firsts = [router.order(providers)[0].name for _ in range(200)]
+        assert "C" not in firsts
+        assert firsts.count("B") > firsts.count("A")
+
+    def test_routing_state_export(self, fake_provider):
+        """Test routing state is JSON-serializable and records decisions."""
+        import json
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.routing import RoutingConfig
+
+        chain = ProviderChain(
+            [fake_provider("A"), fake_provider("B")],
+            routing=RoutingConfig(),
+        )
+        chain.call("prompt")
+        state = json.loads(json.dumps(chain.routing_state()))
+
+        assert state["mode"] == "p2c"
+        assert state["providers"][state["decisions"][-1]["order"][0]]["calls"] == 1
+        assert ProviderChain([]).routing_state() == {"mode": "fixed", "order": []}
+
+    def test_unknown_mode(self):
+        """Test unknown routing modes are rejected."""
+        import pytest
+        from dspy_helm.providers.routing import AdaptiveRouter, RoutingConfig
+
+        with pytest.raises(ValueError):
+            AdaptiveRouter(RoutingConfig(mode="random"))
+
+    def test_locally_served_responses_do_not_feed_routing(
+        self, fake_provider, tmp_path
+    ):
+        """Test cache hits and replays leave latency, routing and breakers alone."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.cache import ResponseCache
+        from dspy_helm.providers.cassette import Cassette
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+        from dspy_helm.providers.routing import RoutingConfig
+
+        provider = fake_provider("Slow", delay=0.02)
+        provider.cache = ResponseCache(":memory:")
+        chain = ProviderChain(
+            [provider],
+            routing=RoutingConfig(mode="ewma"),
+            circuit_breaker=CircuitBreakerConfig(),
+        )
+
+        for _ in range(3):
+            assert chain.call("prompt").success
+        provider.cache = None
+        provider.cassette = Cassette(tmp_path / "empty.jsonl", "replay")
+        assert not chain.call("unrecorded").success
+
+        assert provider.call_count == 1
+        assert chain.latency.count("Slow") == 1
+        assert chain.router.stats["Slow"].calls == 1
+        assert chain.router.stats["Slow"].latency >= 0.02
+        assert len(chain.breakers["Slow"]._outcomes) == 1
+
+
+class TestStreaming:
+    """Test SSE streaming for OpenAI-compatible providers."""
+
+    @staticmethod
+    def _sse_provider(lines, status_code=200):
+        from unittest.mock import MagicMock
+        from dspy_helm.providers.groq import GroqProvider
+
+        http_response = MagicMock(status_code=status_code, headers={})
+        http_response.iter_lines.return_value = iter(lines)
+        provider = GroqProvider()
+        provider.api_key = "test-key"
+        provider.session = MagicMock()
+        provider.session.post.return_value = http_response
+        return provider, http_response
+
+    @staticmethod
+    def _event(text, finish_reason=None):
+        import json
+
+        choice = {"delta": {"content": text}, "finish_reason": finish_reason}
+        return f"data: {json.dumps({'choices': [choice]})}"
+
+    def test_iter_sse_data(self):
+        """Test SSE parsing skips comments and stops at [DONE]."""
+        from dspy_helm.providers.streaming import iter_sse_data
+
+        lines = [b": keep-alive", b"data: one", b"", "data: a", "data: b", ""]
+        lines += ["data: [DONE]", "", "data: ignored", ""]
+        assert list(iter_sse_data(lines)) == ["one", "a\nb"]
+
+    def test_stream_yields_chunks_and_collects(self):
+        """Test deltas are yielded in order and collected with TTFT."""
+        provider, http_response = self._sse_provider(
+            [
+                self._event("Hel"),
+                "",
+                self._event("lo", finish_reason="stop"),
+                "",
+                'data: {"choices": [], "usage": {"total_tokens": 9}}',
+                "",
+                "data: [DONE]",
+                "",
+            ]
+        )
+
+        stream = provider.stream("hi")
+        assert list(stream) == ["Hel", "lo"]
+        response = stream.collect()
+
+        assert response.success is True
+        assert response.content == "Hello"
+        assert response.tokens_used == 9
+        assert response.metadata["ttft_seconds"] is not None
+        assert response.metadata["finish_reason"] == "stop"
+        assert provider.session.post.call_args.kwargs["json"]["stream"] is True
+        http_response.close.assert_called()
+
+    def test_stream_stops_early(self):
+        """Test stop_when closes the stream once the expected text shows up."""
+        provider, http_response = self._sse_provider(
+            [self._event("VULNERABLE"), "", self._event(" because..."), ""]
+        )
+
+        response = provider.stream(
+            "hi", stop_when=lambda text: "VULNERABLE" in text
+        ).collect()
+
+        assert response.content == "VULNERABLE"
+        assert response.metadata["stopped_early"] is True
+        http_response.close.assert_called()
+
+    def test_stream_applies_extra_stop_sequences(self):
+        """Test stops past MAX_STOP_SEQUENCES cut the stream like a call."""
+        stop = ["<a>", "<b>", "<c>", "<d>", "END"]
+        lines = [self._event("Hello E"), "", self._event("N"), ""]
+        lines += [self._event("D of text"), "", self._event("never"), ""]
+        provider, http_response = self._sse_provider(lines)
+
+        stream = provider.stream("hi", stop=stop)
+        chunks = list(stream)
+        response = stream.response
+
+        # The last two characters could start "END", so they are held back
+        assert chunks == ["Hello", " "]
+        assert response.content == "Hello "
+        assert response.metadata["finish_reason"] == "stop"
+        assert provider.session.post.call_args.kwargs["json"]["stop"] == stop[:4]
+        http_response.close.assert_called()
+
+        provider, _ = self._sse_provider(lines)
+        provider.session.post.return_value.status_code = 200
+        provider.session.post.return_value.json.return_value = {
+            "choices": [{"message": {"content": "Hello END of text"}}]
+        }
+        assert provider.call("hi", stop=stop).content == "Hello "
+
+    def test_stream_flushes_held_back_text(self):
+        """Test text held back for a possible stop is sent when the stream ends."""
+        stop = ["<a>", "<b>", "<c>", "<d>", "END"]
+        provider, _ = self._sse_provider([self._event("Hi E"), "", self._event("N")])
+
+        stream = provider.stream("hi", stop=stop)
+        assert "".join(stream) == "Hi EN"
+        assert stream.response.content == "Hi EN"
+
+    def test_stream_counts_in_concurrency_metrics(self):
+        """Test streamed requests are in flight until their body is read."""
+        provider, _ = self._sse_provider([self._event("Hel"), "", self._event("lo")])
+
+        stream = provider.stream("hi")
+        assert next(iter(stream)) == "Hel"
+        assert provider.metrics.stats()["in_flight"] == 1
+        stream.collect()
+
+        stats = provider.metrics.stats()
+        assert (stats["requests"], stats["in_flight"]) == (1, 0)
+
+        failing, _ = self._sse_provider([], status_code=401)
+        failing.stream("hi").collect()
+        assert failing.metrics.stats()["requests"] == 1
+
+    def test_stream_error_status(self):
+        """Test a non-200 status becomes a failed response without chunks."""
+        provider, _ = self._sse_provider([], status_code=401)
+
+        stream = provider.stream("hi")
+        assert list(stream) == []
+        assert stream.response.success is False
+        assert "GROQ_API_KEY" in stream.response.error
+
+    def test_base_provider_stream_fallback(self, fake_provider):
+        """Test providers without SSE stream their full response as one chunk."""
+        provider = fake_provider("Whole", content="whole")
+        stream = provider.stream("hi")
+        assert list(stream) == ["whole"]
+        assert stream.response.content == "whole"
+
+    def test_chain_stream_fails_over_before_first_token(self):
+        """Test the chain moves on when a provider fails before any text."""
+        from dspy_helm.providers.base import ProviderChain, RateLimitConfig
+
+        failing, _ = self._sse_provider([], status_code=500)
+        working, _ = self._sse_provider([self._event("ok"), ""])
+        failing.rate_limit = RateLimitConfig(enabled=False)
+        working.name = "Groq (backup)"
+
+        stream = ProviderChain([failing, working]).stream("hi")
+
+        assert "".join(stream) == "ok"
+        assert stream.response.provider == "Groq (backup)"
+
+
+class TestCallMany:
+    """Test the batch call API."""
+
+    def test_ordered_results(self, fake_provider):
+        """Test ordered mode yields results in input order."""
+        from dspy_helm.providers.base import ProviderChain
+
+        chain = ProviderChain([fake_provider("A", delay=0.01, content=str.upper)])
+        prompts = [f"p{i}" for i in range(10)]
+
+        results = list(chain.call_many(prompts, max_concurrency=4, ordered=True))
+
+        assert [i for i, _ in results] == list(range(10))
+        assert [r.content for _, r in results] == [p.upper() for p in prompts]
+
+    def test_unordered_results_from_lazy_iterable(self, fake_provider):
+        """Test completion-order results cover every prompt of a generator."""
+        from dspy_helm.providers.base import ProviderChain
+
+        provider = fake_provider("A", delay=0.01, content=str.upper)
+        chain = ProviderChain([provider])
+
+        results = dict(chain.call_many((f"p{i}" for i in range(12)), max_concurrency=3))
+
+        assert sorted(results) == list(range(12))
+        assert results[5].content == "P5"
+        assert provider.peak <= 3
+
+    def test_per_provider_limits_fan_out(self, fake_provider):
+        """Test a saturated provider spills prompts onto the next one."""
+        from dspy_helm.providers.base import ProviderChain
+
+        primary = fake_provider("Primary", delay=0.05, content=str.upper)
+        secondary = fake_provider("Secondary", delay=0.05, content=str.upper)
+        chain = ProviderChain([primary, secondary])
+
+        results = list(
+            chain.call_many(
+                [f"p{i}" for i in range(8)],
+                max_concurrency=4,
+                per_provider_limits={"Primary": 2, "Secondary": 2},
+            )
+        )
+
+        assert len(results) == 8
+        assert primary.peak <= 2
+        assert secondary.peak <= 2
+        assert secondary.prompts
+
+
+class TestCLIWorkers:
+    """Test large-prompt delivery and warm worker pools for CLI providers."""
+
+    @staticmethod
+    def _make_provider(**kwargs):
+        import sys
+        from dspy_helm.providers.cli_provider import CLIProvider
+
+        class EchoCLI(CLIProvider):
+            MAX_ARGV_PROMPT_BYTES = 16
+
+            def _build_command(self, prompt, **kw):
+                script = "import sys; print('argv', sys.argv[1])"
+                return [sys.executable, "-c", script, prompt]
+
+            def _build_stdin_command(self, **kw):
+                script = "import sys; print('stdin', len(sys.stdin.read()))"
+                return [sys.executable, "-c", script]
+
+        return EchoCLI(name="Echo", command=sys.executable, model="test", **kwargs)
+
+    def test_small_prompt_uses_argv(self):
+        """Test short prompts stay on the command line."""
+        response = self._make_provider().call("short")
+        assert response.content == "argv short"
+
+    def test_large_prompt_uses_stdin(self):
+        """Test prompts over the argv limit are piped to stdin."""
+        import asyncio
+
+        provider = self._make_provider()
+        assert provider.call("x" * 500).content == "stdin 500"
+        assert asyncio.run(provider.acall("y" * 300)).content == "stdin 300"
+
+    def test_large_prompt_uses_file(self):
+        """Test file mode passes an @path reference and removes the file."""
+        import os
+
+        provider = self._make_provider()
+        provider.LARGE_PROMPT_MODE = "file"
+
+        response = provider.call("z" * 200)
+        path = response.content.split("@", 1)[1]
+
+        assert response.content.startswith("argv @")
+        assert not os.path.exists(path)
+
+    def test_warm_pool_reuses_prespawned_workers(self):
+        """Test pooled calls are served by processes spawned ahead of time."""
+        from dspy_helm.providers.workers import WorkerPoolConfig
+
+        provider = self._make_provider(workers=WorkerPoolConfig(size=2))
+        provider.warm_up()
+        try:
+            assert provider.call("hello").content == "stdin 5"
+            assert provider.call("hello!").content == "stdin 6"
+            stats = provider._pool.stats()
+            assert stats["warm_starts"] == 2
+            assert stats["cold_starts"] == 0
+        finally:
+            provider.close()
+
+    def test_dead_worker_is_recycled(self):
+        """Test workers that exited while idle are discarded."""
+        import sys
+        from dspy_helm.providers.workers import WarmProcessPool, WorkerPoolConfig
+
+        pool = WarmProcessPool(
+            [sys.executable, "-c", "print('ok')"], WorkerPoolConfig(size=1)
+        )
+        pool.fill()
+        dead = pool._idle[0][0]
+        dead.kill()
+        dead.wait()
+        try:
+            returncode, stdout, _ = pool.run("", timeout=10)
+            assert returncode == 0
+            assert stdout.strip() == "ok"
+            assert pool.stats()["recycled"] == 1
+            assert pool.stats()["cold_starts"] == 1
+        finally:
+            pool.close()
+
+
+class TestSharedSessions:
+    """Test process-wide sessions and cached provider instances."""
+
+    def test_sessions_shared_per_origin(self):
+        """Test providers on one origin share a session."""
+        from unittest.mock import MagicMock, patch
+        from dspy_helm.providers.sessions import (
+            close_sessions,
+            get_session,
+            session_key,
+        )
+
+        assert session_key("https://api.groq.com/openai/v1/x") == (
+            "https://api.groq.com"
+        )
+        with patch(
+            "dspy_helm.providers.sessions.requests.Session",
+            side_effect=lambda: MagicMock(),
+        ):
+            close_sessions()
+            try:
+                first = get_session("https://example.com/a")
+                assert get_session("https://example.com/b") is first
+                assert get_session("https://example.org/a") is not first
+            finally:
+                close_sessions()
+
+    def test_provider_instances_cached(self):
+        """Test repeated lookups return one instance per (name, model)."""
+        from dspy_helm.providers import clear_provider_cache, get_provider_by_name
+
+        groq = get_provider_by_name("groq")
+        assert get_provider_by_name("groq") is groq
+
+        small = get_provider_by_name("groq", "llama-3.1-8b-instant")
+        assert small is not groq
+        assert small.model == "llama-3.1-8b-instant"
+        assert small.session is groq.session
+
+        clear_provider_cache()
+        assert get_provider_by_name("groq") is not groq
+
+    def test_pool_size_follows_evaluator_threads(self):
+        """Test the Evaluator grows connection pools to its thread count."""
+        from dspy_helm.eval import Evaluator
+        from dspy_helm.providers.sessions import (
+            DEFAULT_POOL_MAXSIZE,
+            configure_pool_size,
+            get_pool_size,
+        )
+
+        try:
+            Evaluator(metric=lambda example, pred: 1.0, num_threads=48)
+            assert get_pool_size() == 48
+            Evaluator(metric=lambda example, pred: 1.0, num_threads=4)
+            assert get_pool_size() == 48
+        finally:
+            configure_pool_size(DEFAULT_POOL_MAXSIZE)
+
+
+class TestTokenBudget:
+    """Test token accounting and run budgets."""
+
+    def test_usage_block_is_recorded(self):
+        """Test OpenAI-compatible usage blocks fill prompt/completion counts."""
+        from unittest.mock import MagicMock
+        from dspy_helm.providers.groq import GroqProvider
+
+        http_response = MagicMock(status_code=200, headers={})
+        http_response.json.return_value = {
+            "choices": [{"message": {"content": "hi"}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 2, "total_tokens": 13},
+        }
+        provider = GroqProvider()
+        provider.api_key = "test-key"
+        provider.session = MagicMock()
+        provider.session.post.return_value = http_response
+
+        response = provider.call("hello")
+
+        assert (response.prompt_tokens, response.completion_tokens) == (11, 2)
+        assert response.tokens_used == 13
+        assert "tokens_estimated" not in response.metadata
+
+    def test_missing_usage_is_estimated(self, fake_provider):
+        """Test providers without usage get local estimates."""
+        response = fake_provider("Local", content="four word reply here").call(
+            "please review this function"
+        )
+
+        assert response.prompt_tokens > 0
+        assert response.completion_tokens > 0
+        assert response.tokens_used == (
+            response.prompt_tokens + response.completion_tokens
+        )
+        assert response.metadata["tokens_estimated"] is True
+
+    def test_estimate_tokens(self):
+        """Test the fallback estimate scales with text length."""
+        from dspy_helm.providers.tokens import estimate_tokens
+
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("hi") >= 1
+        assert estimate_tokens("word " * 400) > estimate_tokens("word " * 40)
+
+    def test_request_budget_stops_chain(self, fake_provider):
+        """Test the chain refuses calls once the request budget is used."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+
+        provider = fake_provider("Local", content="four word reply here")
+        budget = RunBudget(max_requests=2)
+        chain = ProviderChain([provider], budget=budget)
+
+        assert chain.call("a").success
+        assert chain.call("b").success
+        refused = chain.call("c")
+
+        assert refused.success is False
+        assert refused.metadata["budget_exhausted"] is True
+        assert "request budget" in refused.error
+        assert provider.call_count == 2
+        assert budget.report()["rejected"] == 1
+
+    def test_token_and_time_budgets(self, fake_provider):
+        """Test token and wall-time limits."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+
+        budget = RunBudget(max_tokens=1)
+        chain = ProviderChain(
+            [fake_provider("Local", content="four word reply here")], budget=budget
+        )
+        assert chain.call("a").success
+        assert asyncio.run(chain.acall("b")).metadata["budget_exhausted"]
+        assert budget.report()["tokens"] > 1
+
+        expired = ProviderChain(
+            [fake_provider("Local", content="four word reply here")],
+            budget=RunBudget(max_seconds=0),
+        )
+        assert "time budget" in expired.call("a").error
+
+    def test_cost_budget(self, fake_provider):
+        """Test tokens are priced per provider and the cost limit applies."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+
+        budget = RunBudget(max_cost=0.001, cost_per_1k_tokens={"Paid": 1.0})
+        free = ProviderChain(
+            [fake_provider("Free", content="four word reply here")], budget=budget
+        )
+        paid = ProviderChain(
+            [fake_provider("Paid", content="four word reply here")], budget=budget
+        )
+
+        assert free.call("a").success
+        assert budget.report()["cost"] == 0.0
+        assert paid.call("a").success
+        assert budget.report()["cost"] > 0.001
+        assert "cost budget" in paid.call("b").error
+
+    def test_cache_hits_are_free(self, fake_provider):
+        """Test cached responses do not consume the budget."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+        from dspy_helm.providers.cache import ResponseCache
+
+        provider = fake_provider("Local", content="four word reply here")
+        provider.cache = ResponseCache(":memory:")
+        budget = RunBudget(max_requests=1)
+        chain = ProviderChain([provider], budget=budget)
+
+        assert chain.call("same").success
+        budget.max_requests = 2
+        assert chain.call("same").metadata["cache"] == "hit"
+        assert budget.report()["requests"] == 1
+        assert budget.report()["cache_hits"] == 1
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight requests."""
+
+    def test_concurrent_identical_calls_share_one_request(self, fake_provider):
+        """Test threads asking the same prompt share one upstream call."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = fake_provider("Slow", delay=0.1, content="re: {prompt}")
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            responses = list(executor.map(lambda _: provider.call("same"), range(5)))
+
+        assert provider.call_count == 1
+        assert {r.content for r in responses} == {"re: same"}
+        assert sum(bool(r.metadata.get("coalesced")) for r in responses) == 4
+        assert provider.singleflight.stats() == {"leaders": 1, "coalesced": 4}
+
+    def test_distinct_or_fresh_calls_not_coalesced(self, fake_provider):
+        """Test different prompts and cache_bypass calls go upstream."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = fake_provider("Slow", delay=0.05, content="re: {prompt}")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(provider.call, ["a", "b"]))
+            list(
+                executor.map(lambda _: provider.call("c", cache_bypass=True), range(2))
+            )
+
+        assert provider.call_count == 4
+
+    def test_coalescing_can_be_disabled(self, fake_provider):
+        """Test coalesce=False sends every call upstream."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = fake_provider(
+            "Slow", delay=0.05, coalesce=False, content="re: {prompt}"
+        )
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: provider.call("same"), range(3)))
+
+        assert provider.call_count == 3
+
+    def test_async_calls_coalesce_and_survive_cancellation(self, fake_provider):
+        """Test async callers share a request that outlives a cancelled waiter."""
+        import asyncio
+
+        provider = fake_provider("Slow", delay=0.1, content="re: {prompt}")
+
+        async def main():
+            first = asyncio.ensure_future(provider.acall("same"))
+            second = asyncio.ensure_future(provider.acall("same"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        response = asyncio.run(main())
+
+        assert response.content == "re: same"
+        assert response.metadata["coalesced"] is True
+        assert provider.call_count == 1
+
+
+class TestStandInServer:
+    """Test the local stand-in server and load-test harness."""
+
+    @staticmethod
+    def _post(url, body):
+        import json
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    def test_chat_completion_response(self):
+        """Test non-streaming responses follow the chat/completions shape."""
+        import json
+        from dspy_helm.providers.standin import StandInConfig, StandInServer
+
+        config = StandInConfig(latency_distribution="fixed", latency_mean=0.0)
+        with StandInServer(config) as server:
+            status, _, body = self._post(
+                server.chat_completions_url,
+                {"model": "m", "messages": [{"role": "user", "content": "hi there"}]},
+            )
+
+        data = json.loads(body)
+        assert status == 200
+        assert data["choices"][0]["message"]["content"].startswith("hi there")
+        assert data["usage"]["prompt_tokens"] == 2
+        assert server.stats["ok"] == 1
+
+    def test_injected_rate_limit_has_retry_after(self):
+        """Test 429 injection sends a Retry-After header."""
+        from dspy_helm.providers.standin import StandInConfig, StandInServer
+
+        config = StandInConfig(rate_limit_rate=1.0, retry_after=2.5)
+        with StandInServer(config) as server:
+            status, headers, _ = self._post(server.chat_completions_url, {})
+
+        assert status == 429
+        assert headers["Retry-After"] == "2.5"
+        assert server.stats["rate_limited"] == 1
+
+    def test_streams_sse_chunks(self):
+        """Test stream=True yields SSE deltas the providers can parse."""
+        import json
+        from dspy_helm.providers.standin import StandInConfig, StandInServer
+        from dspy_helm.providers.streaming import iter_sse_data
+
+        config = StandInConfig(
+            latency_distribution="fixed", latency_mean=0.0, chunk_delay=0.0
+        )
+        with StandInServer(config) as server:
+            _, headers, body = self._post(
+                server.chat_completions_url,
+                {"stream": True, "messages": [{"role": "user", "content": "a b"}]},
+            )
+
+        events = [json.loads(d) for d in iter_sse_data(body.decode().splitlines())]
+        text = "".join(e["choices"][0]["delta"].get("content", "") for e in events)
+        assert headers["Content-Type"] == "text/event-stream"
+        assert text.split() == ["a", "b"] * 6
+        assert events[-1]["usage"]["completion_tokens"] == 12
+
+    def test_unknown_latency_distribution_raises(self):
+        """Test invalid distribution names are rejected."""
+        from dspy_helm.providers.standin import StandInConfig
+
+        with pytest.raises(ValueError, match="Unknown latency distribution"):
+            StandInConfig(latency_distribution="pareto")
+
+    def test_load_test_report(self, fake_provider):
+        """Test run_load_test aggregates latency percentiles and error rates."""
+        from dspy_helm.providers.loadtest import percentile, run_load_test
+
+        flaky = fake_provider("Flaky", outcomes=["429"] * 2)
+        report = run_load_test(flaky, [f"p{i}" for i in range(20)], concurrency=4)
+        summary = report.summary()
+
+        assert summary["requests"] == 20
+        assert summary["successes"] == 18
+        assert summary["rate_limited_rate"] == 0.1
+        assert summary["throughput_rps"] > 0
+        assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95) == 10
+        assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 50) == 5
+
+    def test_build_provider_points_at_server(self):
+        """Test real providers are built against the stand-in URLs."""
+        from dspy_helm.providers.loadtest import build_provider
+        from dspy_helm.providers.standin import StandInServer
+
+        server = StandInServer()
+        try:
+            groq = build_provider("groq", server)
+            openrouter = build_provider("openrouter", server)
+            assert groq.endpoint == server.chat_completions_url
+            assert openrouter.endpoint == server.chat_completions_url
+            assert groq.is_configured() and openrouter.is_configured()
+            with pytest.raises(ValueError, match="Unknown provider"):
+                build_provider("nope", server)
+        finally:
+            server.stop()
+
+
+class TestBenchmark:
+    """Test the provider benchmark and the retry/failover metadata it reports."""
+
+    def test_retries_recorded_in_metadata(self, fake_provider):
+        """Test rate-limit retries and backoff time are reported."""
+        provider = fake_provider(
+            "P",
+            outcomes=["429", "429", "ok"],
+            content="four words of output",
+            retries=2,
+        )
+        response = provider.call("hi")
+
+        assert response.success
+        assert response.metadata["retries"] == 2
+        assert response.metadata["retry_wait_seconds"] == pytest.approx(0.02)
+        assert "retries" not in provider.call("again").metadata
+
+    def test_failovers_recorded_in_metadata(self, fake_provider):
+        """Test chain responses report how many providers failed first."""
+        from dspy_helm.providers.base import ProviderChain
+
+        chain = ProviderChain(
+            [
+                fake_provider(
+                    "A", outcomes=["down"], content="four words of output", retries=2
+                ),
+                fake_provider(
+                    "B", outcomes=["down"], content="four words of output", retries=2
+                ),
+                fake_provider(
+                    "C", outcomes=[], content="four words of output", retries=2
+                ),
+            ]
+        )
+        response = chain.call("hi")
+
+        assert response.provider == "C"
+        assert response.metadata["failovers"] == 2
+
+    def test_latency_histogram(self):
+        """Test latencies are bucketed by upper bound."""
+        from dspy_helm.providers.bench import latency_histogram
+
+        histogram = latency_histogram([0.1, 0.2, 0.7, 50.0], bounds=(0.25, 1.0))
+
+        assert histogram == [
+            {"le": 0.25, "count": 2},
+            {"le": 1.0, "count": 1},
+            {"le": "+Inf", "count": 1},
+        ]
+
+    def test_run_benchmark_writes_reports(self, fake_provider, tmp_path):
+        """Test a sweep produces per-level runs, reports and a suggested order."""
+        import json
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.bench import run_benchmark, write_reports
+
+        flaky = fake_provider(
+            "flaky", outcomes=["down"] * 20, content="four words of output", retries=2
+        )
+        steady = fake_provider(
+            "steady", outcomes=[], content="four words of output", retries=2
+        )
+        targets = {
+            "flaky": flaky,
+            "steady": steady,
+            "chain:flaky>steady": ProviderChain([flaky, steady]),
+        }
+
+        report = run_benchmark(targets, [1, 2], corpus=["a", "b", "c"])
+
+        assert len(report["runs"]) == 6
+        assert {r["concurrency"] for r in report["runs"]} == {1, 2}
+        assert report["suggested_order"] == ["steady", "flaky"]
+        chain_runs = [r for r in report["runs"] if r["provider"].startswith("chain")]
+        assert all(r["failovers"] == 3 for r in chain_runs)
+        assert all(r["tokens_per_second"] > 0 for r in chain_runs)
+
+        json_path, md_path = write_reports(report, str(tmp_path))
+        assert json.loads(json_path.read_text())["runs"][0]["histogram"]
+        assert "Suggested chain order" in md_path.read_text()
+
+    def test_run_benchmark_replays_cassette(self, fake_provider, tmp_path):
+        """Test a recorded run is benchmarked offline at recorded latencies."""
+        from dspy_helm.providers.base import ProviderChain, ProviderResponse
+        from dspy_helm.providers.bench import run_benchmark
+        from dspy_helm.providers.cassette import Cassette
+
+        path = tmp_path / "bench.jsonl"
+        recorder = Cassette(path, "record")
+        for prompt in ("a", "b"):
+            recorder.record(
+                "steady",
+                "test",
+                prompt,
+                ProviderResponse(
+                    success=True,
+                    content="four words of output",
+                    provider="steady",
+                    model="test",
+                    latency_seconds=0.5,
+                ),
+            )
+
+        # Every live request would fail: only replays can succeed
+        steady = fake_provider(
+            "steady", outcomes=["down"] * 20, content="four words of output", retries=2
+        )
+        cassette = Cassette(path, "replay")
+        targets = {"steady": steady, "chain:steady": ProviderChain([steady])}
+
+        report = run_benchmark(targets, [2], corpus=["a", "b"], cassette=cassette)
+
+        assert all(r["successes"] == 2 for r in report["runs"])
+        assert report["runs"][0]["p50"] == pytest.approx(0.5)
+        assert report["cassette"]["hits"] == 4
+        assert report["cassette"]["misses"] == 0
+        assert steady.cassette is None
+        assert len(steady.outcomes) == 20
+
+    def test_main_standin_uses_servable_providers(self, tmp_path, caplog):
+        """Test --standin defaults to, and keeps only, stand-in providers."""
+        from unittest.mock import patch
+        from dspy_helm.providers import bench
+
+        report = bench.run_benchmark({}, [1], corpus=["a"])
+        argv = ["--standin", "--standin-latency", "0"]
+        argv += ["--output-dir", str(tmp_path)]
+        with patch.object(bench, "run_benchmark", return_value=report) as run:
+            bench.main(argv)
+            assert list(run.call_args[0][0]) == ["groq", "openrouter"]
+
+            bench.main(argv + ["--providers", "groq,huggingface,google"])
+            assert list(run.call_args[0][0]) == ["groq"]
+        assert "Skipping huggingface" in caplog.text
+
+
+class TestContextWindows:
+    """Test context-window pre-flight and prompt fitting."""
+
+    def test_provider_rejects_oversized_prompt_without_sending(self, fake_provider):
+        """Test a prompt beyond the model's window fails fast."""
+        provider = fake_provider("Small", context_window=300)
+        response = provider.call("word " * 1000)
+
+        assert not response.success
+        assert response.metadata["context_exceeded"]
+        assert "Prompt too large for test" in response.error
+        assert provider.prompts == []
+        assert provider.call("short prompt").success
+
+    def test_chain_routes_only_to_providers_that_fit(self, fake_provider):
+        """Test oversized prompts skip small-window providers entirely."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+
+        small = fake_provider("Small", context_window=300)
+        large = fake_provider("Large", context_window=100000)
+        unknown = fake_provider("Unknown", context_window=None)
+        budget = RunBudget()
+        chain = ProviderChain([small, large, unknown], budget=budget)
+
+        response = chain.call("word " * 1000)
+
+        assert response.provider == "Large"
+        assert small.prompts == []
+        assert "failovers" not in response.metadata
+        assert budget.requests == 1
+
+    def test_chain_rejects_when_nothing_fits(self, fake_provider):
+        """Test a prompt too large for every provider is not sent."""
+        from dspy_helm.providers.base import ProviderChain
+
+        small = fake_provider("Small", context_window=300)
+        chain = ProviderChain([small, fake_provider("Medium", context_window=600)])
+
+        response = chain.call("word " * 1000)
+
+        assert not response.success
+        assert response.metadata["context_exceeded"]
+        assert "largest limit of 500" in response.error
+        assert small.prompts == []
+
+    def test_chain_fits_prompt_with_strategy(self, fake_provider):
+        """Test a ContextConfig shrinks the prompt to the largest window."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.context import ContextConfig
+        from dspy_helm.providers.tokens import estimate_tokens
+
+        small = fake_provider("Small", context_window=300)
+        medium = fake_provider("Medium", context_window=600)
+        chain = ProviderChain([small, medium], context=ContextConfig())
+
+        prompt = "Instructions first. " + "filler " * 2000 + "Question last?"
+        response = chain.call(prompt)
+
+        assert response.success and response.provider == "Medium"
+        assert response.metadata["prompt_fitted"] == "truncate_middle"
+        sent = medium.prompts[0]
+        assert sent.startswith("Instructions first.")
+        assert sent.endswith("Question last?")
+        assert "tokens omitted" in sent
+        assert estimate_tokens(sent) <= 500
+
+    def test_fitting_strategies(self):
+        """Test truncation and compaction helpers."""
+        from dspy_helm.providers.context import (
+            ContextConfig,
+            compact,
+            truncate_end,
+        )
+        from dspy_helm.providers.tokens import estimate_tokens
+
+        text = "def f():\n    return    1\n\n\n\n" + "x = 1\n" * 400
+        assert compact("short", 100) == "short"
+        compacted = compact(text, 100)
+        assert "\n\n\n" not in compacted and "    return 1" in compacted
+        assert estimate_tokens(compacted) <= 100
+        assert text.startswith(truncate_end(text, 50))
+
+        with pytest.raises(ValueError, match="Unknown fitting strategy"):
+            ContextConfig(strategy="summarize")
+
+    def test_model_context_metadata(self):
+        """Test providers expose per-model windows next to FREE_MODELS."""
+        from dspy_helm.providers.huggingface import HuggingFaceProvider
+
+        provider = HuggingFaceProvider(model="meta-llama/Llama-3.2-1B-Instruct")
+        assert set(provider.CONTEXT_WINDOWS) == set(provider.FREE_MODELS)
+        assert provider.context_window == 4096
+        assert provider.prompt_token_limit == 3096
+        assert HuggingFaceProvider(model="custom/model").prompt_token_limit is None
+
+
+class TestHuggingFaceColdStart:
+    """Test cold-start handling and the warm-up pinger."""
+
+    @staticmethod
+    def _make_provider(statuses, **kwargs):
+        from unittest.mock import MagicMock
+        from dspy_helm.providers.base import RateLimitConfig
+        from dspy_helm.providers.huggingface import HuggingFaceProvider
+
+        def http_response(status):
+            body = (
+                {"error": "Model is currently loading", "estimated_time": 20.0}
+                if status == 503
+                else [{"generated_text": "warm"}]
+            )
+            return MagicMock(
+                status_code=status, headers={}, json=lambda: body, text=str(body)
+            )
+
+        provider = HuggingFaceProvider(
+            rate_limit=RateLimitConfig(max_retries=3, max_backoff=60), **kwargs
+        )
+        queue = list(statuses)
+        provider.session = MagicMock()
+        provider.session.post.side_effect = lambda *a, **kw: http_response(
+            queue.pop(0) if len(queue) > 1 else queue[0]
+        )
+        return provider
+
+    def test_waits_for_estimated_time_then_retries(self):
+        """Test a loading model is retried through the rate-limit retry path."""
+        from unittest.mock import patch
+
+        provider = self._make_provider([503, 503, 200], max_loading_wait=15)
+        with patch("dspy_helm.providers.base.time.sleep") as sleep:
+            response = provider.call("hi")
+
+        assert response.success and response.content == "warm"
+        # estimated_time (20s) capped at max_loading_wait per retry
+        assert [c.args[0] for c in sleep.call_args_list] == [15.0, 15.0]
+        assert response.metadata["retries"] == 2
+        assert response.metadata["retry_wait_seconds"] == 30.0
+        assert provider.metrics.stats()["requests"] == 3
+
+    def test_loading_wait_respects_retry_budget(self):
+        """Test a model that stays cold gives up after max_retries."""
+        from unittest.mock import patch
+
+        provider = self._make_provider([503])
+        with patch("dspy_helm.providers.base.time.sleep") as sleep:
+            response = provider.call("hi")
+
+        assert not response.success and response.rate_limited
+        assert sleep.call_count == provider.rate_limit.max_retries
+        assert response.metadata["retries"] == 3
+
+    def test_cold_start_does_not_trip_breaker_as_rate_limit(self):
+        """Test a model still loading after its retries is a plain failure."""
+        from unittest.mock import patch
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.circuit import CircuitBreakerConfig
+
+        provider = self._make_provider([503])
+        chain = ProviderChain(
+            [provider], circuit_breaker=CircuitBreakerConfig(open_on_rate_limit=True)
+        )
+        with patch("dspy_helm.providers.base.time.sleep"):
+            response = chain.call("hi")
+
+        assert not response.success
+        assert chain.health()[provider.name]["state"] == "closed"
+
+    def test_loading_failure_reports_estimated_time(self):
+        """Test a cold model fails fast with estimated_time when waiting is off."""
+        from unittest.mock import patch
+
+        provider = self._make_provider([503], max_loading_wait=0)
+        with patch("dspy_helm.providers.base.time.sleep") as sleep:
+            response = provider.call("hi")
+
+        assert not response.success and not response.rate_limited
+        sleep.assert_not_called()
+        assert response.metadata["model_loading"]
+        assert response.metadata["estimated_time"] == 20.0
+        assert "ready in ~20s" in response.error
+
+    def test_unauthorized_is_not_reported_as_loading(self):
+        """Test 401 maps to an API key error."""
+        provider = self._make_provider([401])
+        response = provider.call("hi")
+
+        assert "API key" in response.error
+        assert "model_loading" not in response.metadata
+
+    def test_warm_up_ping(self):
+        """Test warm_up reports readiness without waiting for loading."""
+        provider = self._make_provider([503, 200])
+
+        assert provider.warm_up() is False
+        assert provider.warm_up() is True
+        payload = provider.session.post.call_args.kwargs["json"]
+        assert payload["parameters"]["max_new_tokens"] == 1
+
+    def test_model_warmer_pings_in_background(self):
+        """Test ModelWarmer pings each provider and tracks status."""
+        import threading
+        from dspy_helm.providers.warmup import ModelWarmer
+
+        provider = self._make_provider([503, 200, 200, 200])
+        pinged = threading.Event()
+        original = provider.warm_up
+
+        def warm_up():
+            ready = original()
+            if ready:
+                pinged.set()
+            return ready
+
+        provider.warm_up = warm_up
+        with ModelWarmer([provider], interval_seconds=0.01) as warmer:
+            assert pinged.wait(timeout=5)
+
+        status = warmer.status()[f"{provider.name}:{provider.model}"]
+        assert status["pings"] >= 2
+        assert status["ready"] is True
+
+
+class TestSemanticCache:
+    """Test the near-duplicate prompt cache."""
+
+    TEMPLATE = (
+        "You are a senior code reviewer. Review the following code for bugs, "
+        "security issues and style problems. Respond with a bullet list of "
+        "findings, each with severity.\n\nLanguage: {lang}\nProject: calc\n\n"
+        "Code:\n{code}\n"
+    )
+    CODE = "def add(a, b):\n    return a + b\n"
+
+    @staticmethod
+    def _response(content="cached answer"):
+        from dspy_helm.providers.base import ProviderResponse
+
+        return ProviderResponse(success=True, content=content, provider="P", model="m")
+
+    def _prompt(self, lang="python", code=None):
+        return self.TEMPLATE.format(lang=lang, code=code or self.CODE)
+
+    def test_whitespace_and_case_are_exact_hits(self):
+        """Test reformatted prompts reuse the stored response."""
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        cache = SemanticCache()
+        prompt = self._prompt()
+        cache.set("P", "m", prompt, self._response())
+
+        spaced = cache.get("P", "m", prompt.replace(" ", "  ") + "\n\n")
+        shouting = cache.get("P", "m", prompt.upper())
+
+        assert spaced.content == "cached answer"
+        assert shouting.metadata["semantic_similarity"] == 1.0
+        assert cache.stats()["exact_hits"] == 2
+
+    def test_reordered_code_does_not_hit(self):
+        """Test reordered statements are different code, unless opted in."""
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        code = "x = load(path)\nos.remove(path)\nprint(x)\n"
+        reordered = "os.remove(path)\nx = load(path)\nprint(x)\n"
+        variables = (
+            "Language: python\nProject: calc",
+            "Project: calc\nLanguage: python",
+        )
+
+        # A low threshold makes the reordering a candidate the check rejects
+        cache = SemanticCache(threshold=0.5)
+        cache.set("P", "m", self._prompt(code=code), self._response())
+        assert cache.get("P", "m", self._prompt(code=reordered)) is None
+        assert cache.stats()["reorderings"] == 1
+
+        default = SemanticCache()
+        default.set("P", "m", self._prompt(), self._response())
+        assert default.get("P", "m", self._prompt().replace(*variables)) is None
+
+        opted_in = SemanticCache(sort_lines=True)
+        opted_in.set("P", "m", self._prompt(), self._response())
+        hit = opted_in.get("P", "m", self._prompt().replace(*variables))
+        assert hit.metadata["semantic_similarity"] == 1.0
+
+    def test_small_template_edit_hits_but_different_input_misses(self):
+        """Test the default threshold separates edits from new inputs."""
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        cache = SemanticCache()
+        cache.set("P", "m", self._prompt(), self._response())
+
+        edited = cache.get(
+            "P", "m", self._prompt().replace("bullet list", "bulleted list")
+        )
+        other_code = cache.get(
+            "P", "m", self._prompt(code="def sub(a, b):\n    return a - b\n")
+        )
+        other_lang = cache.get("P", "m", self._prompt(lang="rust"))
+
+        assert edited is not None
+        assert 0.98 <= edited.metadata["semantic_similarity"] < 1.0
+        assert other_code is None
+        assert other_lang is None
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2
+        assert stats["near_misses"] == 2
+
+    def test_numbers_and_params_must_match(self):
+        """Test prompts with other numbers or parameters never match."""
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        cache = SemanticCache(threshold=0.5)
+        prompt = "Summarise the quarterly report: revenue was 120 million."
+        cache.set("P", "m", prompt, self._response(), {"temperature": 0.0})
+
+        assert (
+            cache.get("P", "m", prompt.replace("120", "125"), {"temperature": 0.0})
+            is None
+        )
+        assert cache.stats()["number_mismatches"] == 1
+        assert cache.get("P", "m", prompt, {"temperature": 0.7}) is None
+        assert cache.get("P", "other", prompt, {"temperature": 0.0}) is None
+        assert cache.get("P", "m", prompt, {"temperature": 0.0}) is not None
+
+    def test_oldest_entries_are_evicted(self):
+        """Test the cache keeps at most max_entries responses."""
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        cache = SemanticCache(max_entries=2)
+        for word in ("alpha", "beta", "gamma"):
+            cache.set("P", "m", f"Define the word {word}.", self._response(word))
+        cache.set("P", "m", "Define the word gamma.", self._response("gamma 2"))
+
+        assert len(cache) == 2
+        assert cache.get("P", "m", "Define the word alpha.") is None
+        assert cache.get("P", "m", "Define the word gamma.").content == "gamma 2"
+
+    def test_provider_serves_semantic_hits_without_charging_budget(self, fake_provider):
+        """Test a provider answers near-duplicates from the semantic cache."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.budget import RunBudget
+        from dspy_helm.providers.semantic_cache import SemanticCache
+
+        provider = fake_provider(
+            "Counting", content="answer {n}", semantic_cache=SemanticCache()
+        )
+        budget = RunBudget(max_requests=2)
+        chain = ProviderChain([provider], budget=budget)
+
+        first = chain.call(self._prompt())
+        second = chain.call(self._prompt().replace("  ", " ") + "\n")
+
+        assert first.metadata["cache"] == "miss"
+        assert second.metadata["cache"] == "semantic_hit"
+        assert second.content == first.content
+        assert provider.call_count == 1
+        assert budget.report()["cache_hits"] == 1
+        assert budget.report()["requests"] == 1
+
+
+class TestProviderLM:
+    """Test the dspy LM adapter over ProviderChain."""
+
+    @staticmethod
+    def _lm_module(monkeypatch):
+        """Import dspy_lm against a minimal stand-in for dspy.BaseLM."""
+        import importlib
+        import sys
+        import dspy
+
+        class BaseLM:
+            def __init__(
+                self,
+                model,
+                model_type="chat",
+                temperature=0.0,
+                max_tokens=1000,
+                cache=True,
+                **kwargs,
+            ):
+                self.model = model
+                self.model_type = model_type
+                self.cache = cache
+                self.kwargs = dict(
+                    temperature=temperature, max_tokens=max_tokens, **kwargs
+                )
+                self.history = []
+
+            def __call__(self, prompt=None, messages=None, **kwargs):
+                response = self.forward(prompt=prompt, messages=messages, **kwargs)
+                return [choice.message.content for choice in response.choices]
+
+        monkeypatch.setattr(dspy, "BaseLM", BaseLM, raising=False)
+        monkeypatch.delitem(sys.modules, "dspy_helm.providers.dspy_lm", raising=False)
+        return importlib.import_module("dspy_helm.providers.dspy_lm")
+
+    @staticmethod
+    def _echo(fake_provider, fail=False):
+        return fake_provider(
+            "Echo",
+            model="echo-1",
+            outcome="down" if fail else "ok",
+            content="reply {n}",
+            response_fields={"prompt_tokens": 10, "completion_tokens": 5},
+        )
+
+    def test_messages_flattened_into_one_prompt(self, monkeypatch):
+        """Test chat messages become a single labelled prompt."""
+        module = self._lm_module(monkeypatch)
+
+        assert module.messages_to_prompt("plain") == "plain"
+        assert (
+            module.messages_to_prompt(messages=[{"role": "user", "content": "hi"}])
+            == "hi"
+        )
+        prompt = module.messages_to_prompt(
+            messages=[
+                {"role": "system", "content": "Be terse."},
+                {"role": "user", "content": [{"type": "text", "text": "Why?"}]},
+            ]
+        )
+        assert prompt == "System:\nBe terse.\n\nUser:\nWhy?"
+
+    def test_batch_is_one_call_many_dispatch(self, monkeypatch, fake_provider):
+        """Test N prompts go to the chain in a single call_many."""
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.cache import ResponseCache
+
+        module = self._lm_module(monkeypatch)
+        provider = self._echo(fake_provider)
+        chain = ProviderChain([provider])
+        dispatches = []
+        call_many = chain.call_many
+
+        def spy(prompts, **kwargs):
+            prompts = list(prompts)
+            dispatches.append(prompts)
+            return call_many(prompts, **kwargs)
+
+        monkeypatch.setattr(chain, "call_many", spy)
+        lm = module.ProviderLM(chain, response_cache=ResponseCache(":memory:"))
+        lm.forward(prompt="b", temperature=0.5)
+
+        completions = lm.batch(
+            ["a", "b", [{"role": "user", "content": "c"}]], temperature=0.5
+        )
+
+        assert dispatches == [["a", "c"]]
+        assert [c.choices[0].message.content for c in completions][1] == "reply 1"
+        assert len(provider.calls) == 3
+        assert all(kw["temperature"] == 0.5 for _, kw in provider.calls[1:])
+        assert lm.stats() == {"requests": 3, "cache_hits": 1}
+        assert lm.batch(["a", "c"], temperature=0.5)
+        assert len(provider.calls) == 3
+
+    def test_batch_raises_after_caching_successes(self, fake_provider, monkeypatch):
+        """Test a failed prompt raises like forward does."""
+        from dspy_helm.providers.base import ProviderChain
+
+        module = self._lm_module(monkeypatch)
+        lm = module.ProviderLM(ProviderChain([self._echo(fake_provider, fail=True)]))
+
+        with pytest.raises(RuntimeError, match="Provider chain failed"):
+            lm.batch(["a", "b"])
+        assert lm.batch([]) == []
+
+    def test_forward_returns_openai_style_completion(self, monkeypatch, fake_provider):
+        """Test forward routes through the chain and reports usage."""
+        from dspy_helm.providers.base import ProviderChain
+
+        module = self._lm_module(monkeypatch)
+        provider = self._echo(fake_provider)
+        lm = module.ProviderLM(ProviderChain([provider]), temperature=0.3)
+
+        completion = lm.forward(messages=[{"role": "user", "content": "hi"}])
+
+        assert completion.choices[0].message.content == "reply 1"
+        assert completion.model == "echo-1"
+        assert completion.usage == {
+            "prompt_tokens": 10,
+            "completion_tokens": 5,
+            "total_tokens": 15,
+        }
+        assert provider.calls[0][1]["temperature"] == 0.3
+        samples = lm("hi", n=3)
+        assert sorted(samples) == ["reply 2", "reply 3", "reply 4"]
+
+    def test_response_cache_and_copies_share_state(self, monkeypatch, fake_provider):
+        """Test cached completions skip the chain, also for copied LMs."""
+        import copy
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.cache import ResponseCache
+
+        module = self._lm_module(monkeypatch)
+        provider = self._echo(fake_provider)
+        lm = module.ProviderLM(
+            ProviderChain([provider]), response_cache=ResponseCache(":memory:")
+        )
+
+        first = lm.forward("What is 2 + 2?")
+        again = copy.deepcopy(lm).forward("What is 2 + 2?")
+        hotter = lm.forward("What is 2 + 2?", temperature=1.0)
+
+        assert again.choices[0].message.content == first.choices[0].message.content
+        assert again.usage["total_tokens"] == 0
+        assert hotter.choices[0].message.content == "reply 2"
+        assert len(provider.calls) == 2
+        assert lm.stats() == {"requests": 2, "cache_hits": 1}
+
+    def test_failed_chain_raises_and_async_path(self, fake_provider, monkeypatch):
+        """Test chain failures raise and aforward uses acall."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+
+        module = self._lm_module(monkeypatch)
+        broken = module.ProviderLM(
+            ProviderChain([self._echo(fake_provider, fail=True)])
+        )
+        with pytest.raises(RuntimeError, match="Provider chain failed"):
+            broken.forward("hi")
+
+        lm = module.ProviderLM(
+            ProviderChain([self._echo(fake_provider)]), max_concurrency=1
+        )
+        completion = asyncio.run(lm.aforward("hi", n=2))
+        assert sorted(c.message.content for c in completion.choices) == [
+            "reply 1",
+            "reply 2",
+        ]
+
+
+class TestPriorityScheduler:
+    """Test priority classes and per-provider concurrency caps."""
+
+    @staticmethod
+    def _hold(gate):
+        def content(prompt):
+            if prompt == "hold":
+                gate.wait(5)
+            return prompt
+
+        return content
+
+    @staticmethod
+    def _wait_for(condition):
+        import time
+
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        assert condition()
+
+    def test_interactive_overtakes_queued_batch(self, fake_provider):
+        """Test an interactive request is admitted before earlier batch ones."""
+        import threading
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.scheduler import PriorityScheduler, SchedulerConfig
+
+        gate = threading.Event()
+        provider = fake_provider("Gated", content=self._hold(gate))
+        scheduler = PriorityScheduler(
+            ProviderChain([provider]),
+            SchedulerConfig(per_provider_limits={"Gated": 1}, aging_seconds=60),
+        )
+
+        def submit(prompt, priority):
+            thread = threading.Thread(
+                target=scheduler.call,
+                args=(prompt, priority),
+                kwargs={"cache_bypass": True},
+            )
+            thread.start()
+            return thread
+
+        threads = [submit("hold", "batch")]
+        self._wait_for(
+            lambda: scheduler.stats()["providers"]["Gated"]["in_flight"] == 1
+        )
+        for i, (prompt, priority) in enumerate(
+            [("batch 1", "batch"), ("batch 2", "batch"), ("query", "interactive")]
+        ):
+            threads.append(submit(prompt, priority))
+            self._wait_for(
+                lambda: scheduler.stats()["providers"]["Gated"]["waiting"] == i + 1
+            )
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert provider.prompts == ["hold", "query", "batch 1", "batch 2"]
+        stats = scheduler.stats()
+        assert stats["priorities"]["interactive"]["queued"] == 1
+        assert stats["priorities"]["batch"]["requests"] == 3
+        assert stats["providers"]["Gated"]["in_flight"] == 0
+
+    def test_waiting_batch_requests_age(self):
+        """Test a long-waiting batch request outranks a fresh interactive one."""
+        import threading
+        import time
+        from dspy_helm.providers.scheduler import PRIORITIES, PrioritySemaphore
+
+        def run(aged):
+            semaphore = PrioritySemaphore(limit=1, aging_seconds=10)
+            now = time.time()
+            assert semaphore.try_acquire(PRIORITIES["batch"], now)
+            order = []
+
+            def waiter(name, priority, since):
+                semaphore.acquire(PRIORITIES[priority], since)
+                order.append(name)
+                semaphore.release()
+
+            threads = [
+                threading.Thread(target=waiter, args=("query", "interactive", now)),
+                threading.Thread(
+                    target=waiter, args=("batch", "batch", now - (30 if aged else 0))
+                ),
+            ]
+            for count, thread in enumerate(threads, 1):
+                thread.start()
+                self._wait_for(lambda: semaphore.waiting == count)
+            assert not semaphore.try_acquire(PRIORITIES["interactive"], time.time())
+            semaphore.release()
+            for thread in threads:
+                thread.join(5)
+            return order
+
+        assert run(aged=False) == ["query", "batch"]
+        assert run(aged=True) == ["batch", "query"]
+
+    def test_client_and_response_metadata(self, fake_provider):
+        """Test clients pin a priority and unknown priorities are rejected."""
+        import asyncio
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.scheduler import PriorityScheduler
+
+        provider = fake_provider("Gated", content="{prompt}")
+        scheduler = PriorityScheduler(ProviderChain([provider]))
+
+        response = scheduler.client("interactive").call("hello")
+        async_response = asyncio.run(scheduler.client("batch").acall("again"))
+
+        assert response.metadata["priority"] == "interactive"
+        assert response.metadata["queue_wait_seconds"] == 0
+        assert async_response.content == "again"
+        assert scheduler.stats()["providers"]["Gated"]["limit"] == 4
+        with pytest.raises(ValueError, match="Unknown priority: 'urgent'"):
+            scheduler.call("x", priority="urgent")
+
+    def test_client_over_another_chain_shares_slots(self, fake_provider):
+        """Test a client for a sub-chain queues on the scheduler's slots."""
+        import threading
+        from dspy_helm.providers.base import ProviderChain
+        from dspy_helm.providers.scheduler import PriorityScheduler, SchedulerConfig
+
+        gate = threading.Event()
+        provider = fake_provider("Gated", content=self._hold(gate))
+        scheduler = PriorityScheduler(
+            ProviderChain([provider]),
+            SchedulerConfig(per_provider_limits={"Gated": 1}),
+        )
+        single = scheduler.client("interactive", ProviderChain([provider]))
+        assert single.providers == [provider]
+
+        holder = threading.Thread(target=scheduler.call, args=("hold",))
+        holder.start()
+        self._wait_for(
+            lambda: scheduler.stats()["providers"]["Gated"]["in_flight"] == 1
+        )
+        threading.Timer(0.05, gate.set).start()
+        response = single.call("query")
+        holder.join(5)
+
+        assert provider.prompts == ["hold", "query"]
+        assert response.metadata["queue_wait_seconds"] > 0
+        assert scheduler.stats()["priorities"]["interactive"]["queued"] == 1
+
+
+class TestCassette:
+    """Test record/replay cassettes."""
+
+    def test_replay_matches_resolved_params(self, fake_provider, tmp_path):
+        """Test a request spelling out the provider defaults replays."""
+        from dspy_helm.providers import GenerationParams
+        from dspy_helm.providers.cassette import Cassette, use_cassette
+
+        path = tmp_path / "defaults.jsonl"
+        defaults = GenerationParams(max_tokens=1000)
+        provider = fake_provider("Counting", defaults=defaults)
+        with use_cassette(Cassette(path, mode="record"), [provider]):
+            provider.call("a")
+
+        replayer = fake_provider("Counting", defaults=defaults)
+        replayer.cassette = Cassette(path, mode="replay")
+
+        assert replayer.call("a", max_tokens=1000, cache_bypass=True).success
+        assert not replayer.call("a", max_tokens=5, cache_bypass=True).success
+        assert replayer.call_count == 0
+
+    def test_streams_record_and_replay(self, fake_provider, tmp_path):
+        """Test streams are recorded whole and replayed without sending."""
+        from dspy_helm.providers.cassette import Cassette, use_cassette
+
+        path = tmp_path / "stream.jsonl"
+        provider = fake_provider("Counting", content="{prompt} -> {n}")
+        with use_cassette(Cassette(path, mode="record"), [provider]):
+            assert "".join(provider.stream("a", cache_bypass=True)) == "a -> 1"
+            provider.stream(
+                "b", stop_when=lambda text: True, cache_bypass=True
+            ).collect()
+        assert len(path.read_text().splitlines()) == 1
+
+        replayer = fake_provider("Counting")
+        replayer.cassette = Cassette(path, mode="replay")
+        stream = replayer.stream("a", cache_bypass=True)
+
+        assert list(stream) == ["a -> 1"]
+        assert stream.response.metadata["cassette"] == "replay"
+        assert not replayer.stream("b", cache_bypass=True).collect().success
+        assert replayer.call_count == 0
+
+    def test_record_then_replay_offline(self, fake_provider, tmp_path):
+        """Test replay answers recorded calls without sending, in order."""
+        import asyncio
+        import json
+        from dspy_helm.providers.cassette import Cassette, use_cassette
+
+        path = tmp_path / "session.jsonl"
+        provider = fake_provider(
+            "Counting",
+            content="{prompt} -> {n}",
+            response_fields={"completion_tokens": 3, "latency_seconds": 0.5},
+        )
+        with use_cassette(Cassette(path, mode="record"), [provider]):
+            provider.call("a", cache_bypass=True)
+            provider.call("a", cache_bypass=True)
+            provider.call("b", temperature=0.2)
+        assert provider.cassette is None
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        assert set(json.loads(lines[0])) == {"k", "r"}
+
+        replayer = fake_provider(
+            "Counting",
+            content="{prompt} -> {n}",
+            response_fields={"completion_tokens": 3, "latency_seconds": 0.5},
+        )
+        cassette = Cassette(path, mode="replay")
+        replayer.cassette = cassette
+        first = replayer.call("a", cache_bypass=True)
+        second = asyncio.run(replayer.acall("a", cache_bypass=True))
+        third = replayer.call("a", cache_bypass=True)
+        other = replayer.call("b", temperature=0.2)
+
+        assert [first.content, second.content, third.content] == [
+            "a -> 1",
+            "a -> 2",
+            "a -> 1",
+        ]
+        assert other.content == "b -> 3"
+        assert first.metadata["cassette"] == "replay"
+        assert first.metadata["recorded_latency_seconds"] == 0.5
+        assert first.completion_tokens == 3
+        assert replayer.call_count == 0
+        assert cassette.stats()["hits"] == 4
+
+    def test_replay_miss_fails_and_is_reported(self, fake_provider, tmp_path):
+        """Test an unrecorded request fails in replay mode and is listed."""
+        from dspy_helm.providers.cassette import Cassette
+
+        provider = fake_provider(
+            "Counting",
+            content="{prompt} -> {n}",
+            response_fields={"completion_tokens": 3, "latency_seconds": 0.5},
+        )
+        provider.cassette = Cassette(tmp_path / "empty.jsonl", mode="replay")
+        response = provider.call("b", temperature=0.9)
+
+        assert not response.success
+        assert response.metadata["cassette"] == "miss"
+        assert provider.call_count == 0
+        report = provider.cassette.miss_report()
+        assert "0 replayed, 1 missed" in report
+        assert "Counting/test: 'b'" in report
+
+    def test_record_new_only_sends_misses(self, fake_provider, tmp_path):
+        """Test record_new replays known calls and appends new ones."""
+        from dspy_helm.providers.cassette import Cassette
+
+        path = tmp_path / "session.jsonl"
+        path.write_text("")
+        provider = fake_provider(
+            "Counting",
+            content="{prompt} -> {n}",
+            response_fields={"completion_tokens": 3, "latency_seconds": 0.5},
+        )
+        provider.cassette = Cassette(path, mode="record_new")
+        provider.call("a")
+        provider.call("b")
+        path.write_text(path.read_text() + '{"k": "trunc')
+
+        again = fake_provider(
+            "Counting",
+            content="{prompt} -> {n}",
+            response_fields={"completion_tokens": 3, "latency_seconds": 0.5},
+        )
+        again.cassette = Cassette(path, mode="record_new")
+        assert again.call("a").metadata["cassette"] == "replay"
+        assert again.call("c").metadata["cassette"] == "recorded"
+        assert again.call_count == 1
+        assert again.cassette.stats()["requests"] == 3
+
+    def test_unknown_mode(self, tmp_path):
+        """Test an unknown mode is rejected."""
+        from dspy_helm.providers.cassette import Cassette
+
+        with pytest.raises(ValueError, match="Unknown cassette mode: 'rewind'"):
+            Cassette(tmp_path / "x.jsonl", mode="rewind")
+
+
+class TestModelCascade:
+    """Test the quality-gated model cascade."""
+
+    def test_escalates_only_rejected_answers(self, fake_provider):
+        """Test accepted small-model answers are served without escalation."""
+        from dspy_helm.providers.cascade import ModelCascade, json_check
+
+        small = fake_provider(
+            "Scripted", model="small", content=['{"review": "ok"}', "not json", None]
+        )
+        large = fake_provider(
+            "Scripted", model="large", content=['{"review": "thorough"}']
+        )
+        cascade = ModelCascade([small, large], check=json_check(["review"]))
+
+        first = cascade.call("q1", cache_bypass=True)
+        second = cascade.call("q2", cache_bypass=True)
+        third = cascade.call("q3", cache_bypass=True)
+
+        assert first.model == "small"
+        assert first.metadata["cascade_escalations"] == 0
+        assert second.model == "large" and third.model == "large"
+        assert second.metadata["cascade_tier"] == "Scripted/large"
+        assert large.call_count == 2
+        stats = cascade.stats()
+        assert stats["Scripted/small"] == {
+            "attempts": 3,
+            "accepted": 1,
+            "rejected": 1,
+            "failed": 1,
+            "acceptance_rate": 0.3333,
+        }
+        assert stats["Scripted/large"]["acceptance_rate"] == 1.0
+
+    def test_last_tier_answer_is_returned_even_if_rejected(self, fake_provider):
+        """Test the final tier's answer is served and flagged."""
+        import asyncio
+        from dspy_helm.providers.cascade import ModelCascade, regex_check
+
+        small = fake_provider("Scripted", model="small", content=["maybe"])
+        large = fake_provider("Scripted", model="large", content=["perhaps"])
+        cascade = ModelCascade([small, large], check=regex_check(r"^(yes|no)$"))
+
+        response = asyncio.run(cascade.acall("Is it safe?"))
+
+        assert response.content == "perhaps"
+        assert response.metadata["cascade_accepted"] is False
+        assert response.metadata["cascade_escalations"] == 1
+
+    def test_builtin_checks(self):
+        """Test the confidence, JSON and metric checks."""
+        from types import SimpleNamespace
+        from dspy_helm.providers.base import ProviderResponse
+        from dspy_helm.providers.cascade import (
+            confidence_check,
+            json_check,
+            metric_check,
+        )
+
+        def answer(text):
+            return ProviderResponse(success=True, content=text)
+
+        confident = confidence_check(min_chars=10)
+        assert confident("q", answer("SQL injection in the login query."))
+        assert not confident("q", answer("I'm not sure, maybe XSS?"))
+        assert not confident("q", answer("XSS"))
+
+        assert json_check(["a"])("q", answer('```json\n{"a": 1}\n```'))
+        assert not json_check(["a"])("q", answer('{"b": 1}'))
+
+        def metric(example, pred):
+            return 1.0 if example.expected in pred.review else 0.0
+
+        check = metric_check(metric, SimpleNamespace(expected="xss"), "review")
+        assert check("q", answer("found xss"))
+        assert not check("q", answer("looks fine"))
+
+    def test_cascade_from_config(self):
+        """Test the Groq cascade runs from the 8B model to the 70B model."""
+        from unittest.mock import patch
+        from dspy_helm.providers import cascade_from_config
+
+        config = {
+            "groq": {"cascade": ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]}
+        }
+        with patch(
+            "dspy_helm.config.get_provider_config",
+            side_effect=lambda name: config.get(name, {}),
+        ):
+            cascade = cascade_from_config("groq")
+            with pytest.raises(ValueError, match="No cascade configured"):
+                cascade_from_config("openrouter")
+
+        assert [tier.model for tier in cascade.tiers] == [
+            "llama-3.1-8b-instant",
+            "llama-3.3-70b-versatile",
+        ]
+
+
+class TestGenerationParams:
+    """Test per-request generation parameters."""
+
+    def test_object_and_loose_keys_share_cache_key(self, fake_provider):
+        """Test params= and loose keys resolve alike; loose keys win."""
+        from dspy_helm.providers import GenerationParams, ResponseCache
+
+        provider = fake_provider("Recording")
+        provider.cache = ResponseCache(":memory:")
+        provider.call("p", params=GenerationParams(max_tokens=50, stop="END"))
+        cached = provider.call("p", max_tokens=50, stop=["END"])
+        provider.call("p", params=GenerationParams(max_tokens=50), max_tokens=20)
+
+        assert cached.metadata["cache"] == "hit"
+        assert provider.params[0] == GenerationParams(max_tokens=50, stop=("END",))
+        assert provider.params[1].max_tokens == 20
+        with pytest.raises(ValueError):
+            provider.call("p", max_tokens=0)
+
+    def test_openai_payload_uses_params_over_defaults(self):
+        """Test the chat payload carries the call's parameters."""
+        from dspy_helm.providers import GenerationParams, GroqProvider
+
+        provider = GroqProvider()
+        default = provider._build_payload("hi")
+        assert (default["max_tokens"], default["temperature"]) == (1000, 0.7)
+        assert "stop" not in default and "seed" not in default
+
+        payload = provider._build_payload(
+            "hi",
+            params=GenerationParams(
+                max_tokens=64, temperature=0.0, stop=list("abcde"), seed=7
+            ),
+        )
+        assert payload["max_tokens"] == 64
+        assert payload["temperature"] == 0.0
+        assert payload["stop"] == ["a", "b", "c", "d"]
+        assert payload["seed"] == 7
+
+    def test_huggingface_payload_and_puter_unsupported(self):
+        """Test HF greedy decoding at temperature 0 and Puter dropping it."""
+        from dspy_helm.providers import HuggingFaceProvider, PuterFreeProvider
+
+        parameters = HuggingFaceProvider()._build_payload(
+            "hi", max_tokens=32, temperature=0.0, stop=["\n\n"]
+        )["parameters"]
+        assert parameters["max_new_tokens"] == 32
+        assert parameters["do_sample"] is False
+        assert "temperature" not in parameters
+        assert parameters["stop"] == ["\n\n"]
+
+        payload = PuterFreeProvider()._build_payload("hi", temperature=0.2)
+        assert "temperature" not in payload
+
+    def test_cli_provider_timeout_flags_and_stop(self, monkeypatch):
+        """Test CLI calls get the call's timeout, mapped flags and stop cut."""
+        import subprocess
+        from types import SimpleNamespace
+        from dspy_helm.providers.base import RateLimitConfig
+        from dspy_helm.providers.cli_provider import CLIProvider
+
+        class FlagCLI(CLIProvider):
+            PARAM_FLAGS = {"max_tokens": "--max-tokens"}
+
+        runs = []
+
+        def fake_run(argv, **kw):
+            runs.append((argv, kw["timeout"]))
+            return SimpleNamespace(returncode=0, stdout="one\nSTOP two", stderr="")
+
+        monkeypatch.setattr(subprocess, "run", fake_run)
+        provider = FlagCLI(
+            name="Flag",
+            command="tool",
+            model="m",
+            rate_limit=RateLimitConfig(enabled=False),
+        )
+
+        response = provider.call("p", max_tokens=5, timeout=3, stop="STOP")
+        assert runs[0] == (["tool", "ask", "--max-tokens", "5", "p"], 3)
+        assert response.content == "one"
+        provider.call("q")
+        assert runs[1] == (["tool", "ask", "q"], CLIProvider.TIMEOUT_SECONDS)
+
+    def test_scenario_declares_short_outputs(self):
+        """Test security review caps generation length."""
+        from dspy_helm.scenarios import SecurityReviewScenario, UnitTestScenario
+
+        assert SecurityReviewScenario.GENERATION_PARAMS.max_tokens <= 500
+        assert UnitTestScenario.GENERATION_PARAMS is None
+
+
+class TestLazyProviderRegistry:
+    """Test the providers.yaml-driven registry."""
+
+    def test_builds_configured_providers_on_first_use(self, monkeypatch):
+        """Test classes are resolved lazily and configured from the YAML."""
+        from dspy_helm.providers.registry import ProviderRegistry
+        import dspy_helm.config.providers as config_module
+
+        configs = {
+            "providers": {
+                "groq": {
+                    "models": {"default": "llama-3.1-8b-instant"},
+                    "rate_limit": {"requests_per_minute": 7, "burst": 2},
+                },
+                "custom": {"class": "dspy_helm.providers.puter:PuterFreeProvider"},
+                "no_class": {"models": {"default": "x"}},
+            },
+            "chain": ["custom", "missing", "groq"],
+        }
+        monkeypatch.setattr(config_module, "load_providers_config", lambda p: configs)
+        registry = ProviderRegistry()
+
+        assert registry.loaded() == []
+        assert "custom" in registry.names() and "no_class" not in registry.names()
+        groq = registry.get("groq")
+        assert groq.model == "llama-3.1-8b-instant"
+        assert groq.rate_limit.requests_per_minute == 7
+        assert groq.rate_limit.max_retries == 3
+        assert registry.get("groq") is groq
+        assert registry.get("groq", "llama-3.1-8b-instant") is groq
+        assert registry.get("groq", "other-model") is not groq
+        custom = registry.get("custom")
+        assert registry.get("custom", custom.model) is custom
+        assert registry.chain_order() == ["custom", "groq"]
+        assert registry.chain().providers[1] is groq
+        with pytest.raises(ValueError, match="Unknown provider: 'no_class'"):
+            registry.get("no_class")
+
+    def test_reload_rebuilds_only_changed_providers(self, monkeypatch):
+        """Test reload keeps untouched instances and rebuilds edited ones."""
+        from dspy_helm.providers.registry import ProviderRegistry
+        import dspy_helm.config.providers as config_module
+
+        configs = {
+            "providers": {
+                "groq": {"rate_limit": {"burst": 2}},
+                "openrouter": {"rate_limit": {"burst": 2}},
+            }
+        }
+        monkeypatch.setattr(config_module, "load_providers_config", lambda p: configs)
+        registry = ProviderRegistry()
+        groq, openrouter = registry.get("groq"), registry.get("openrouter")
+
+        configs = {
+            "providers": {
+                "groq": {"rate_limit": {"burst": 9}},
+                "openrouter": {"rate_limit": {"burst": 2}},
+            }
+        }
+        assert registry.reload() == ["groq"]
+        assert registry.get("openrouter") is openrouter
+        rebuilt = registry.get("groq")
+        assert rebuilt is not groq and rebuilt.rate_limit.burst == 9
+
+    def test_package_imports_lazily(self):
+        """Test importing the package does not import provider modules."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, dspy_helm.providers as p; "
+            "assert 'dspy_helm.providers.groq' not in sys.modules; "
+            "assert 'requests' not in sys.modules; "
+            "p.GenerationParams; "
+            "assert p.GroqProvider.__name__ == 'GroqProvider'; "
+            "assert 'dspy_helm.providers.huggingface' not in sys.modules"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+
+
+class TestConcurrencyMetrics:
+    """Test per-thread provider state and contention metrics."""
+
+    def test_counts_requests_from_many_threads(self, fake_provider):
+        """Test requests from a thread pool are all counted, none in flight."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = fake_provider("p", delay=0.02, content="{prompt}", retries=3)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(provider.call, [f"q{i}" for i in range(32)]))
+
+        assert all(r.success for r in responses)
+        stats = provider.metrics.stats()
+        assert stats["requests"] == 32
+        assert stats["in_flight"] == 0
+        assert 1 < stats["peak_in_flight"] <= 8
+        assert 1 < stats["threads"] <= 8
+        assert stats["busy_seconds"] >= 32 * 0.02 * 0.9
+        assert not hasattr(provider, "_retry_count")
+
+    def test_records_rate_limiter_wait(self, fake_provider, monkeypatch):
+        """Test time spent in the limiter is reported as queue wait."""
+        provider = fake_provider("p", content="{prompt}", retries=3)
+        monkeypatch.setattr(provider.limiter, "acquire", lambda: 0.25)
+
+        provider.call("a")
+        provider.call("b")
+
+        stats = provider.metrics.stats()
+        assert stats["queued"] == 2
+        assert stats["queue_wait_seconds"] == 0.5
+        assert stats["mean_queue_wait"] == 0.25
+        assert stats["max_queue_wait"] == 0.25
+
+    def test_async_calls_and_chain_report(self, fake_provider):
+        """Test async calls are tracked and the chain reports every provider."""
+        import asyncio
+
+        from dspy_helm.providers.base import ProviderChain
+
+        first = fake_provider("first")
+        second = fake_provider("second", content="{prompt}", retries=3)
+        chain = ProviderChain([first, second])
+
+        asyncio.run(first.acall("x"))
+        report = chain.concurrency()
+
+        assert set(report) == {"first", "second"}
+        assert report["first"]["requests"] == 1
+        assert report["second"]["requests"] == 0
+
+        first.metrics.reset()
+        assert first.metrics.stats()["requests"] == 0
+
+
+class TestPromptPacking:
+    """Test multi-example prompt packing."""
+
+    @staticmethod
+    def _packer(fake_provider, reply):
+        import re
+
+        def content(prompt):
+            tasks = re.findall(r"### Task \d+\n\n(.*)", prompt)
+            return reply(tasks) if tasks else f"single: {prompt}"
+
+        usage = {"prompt_tokens": 40, "completion_tokens": 20, "tokens_used": 60}
+        return fake_provider("packer", content=content, response_fields=usage)
+
+    def test_packs_prompts_and_splits_answers(self, fake_provider):
+        """Test N prompts take one request and come back in order."""
+        import json
+
+        from dspy_helm.providers.packing import PackingConfig, PromptPacker
+
+        provider = self._packer(
+            fake_provider,
+            lambda tasks: (
+                "```json\n"
+                + json.dumps(
+                    [
+                        {"id": i, "answer": f"answer to {task} END extra"}
+                        for i, task in reversed(list(enumerate(tasks, 1)))
+                    ]
+                )
+                + "\n```"
+            ),
+        )
+        packer = PromptPacker(provider, PackingConfig(pack_size=4))
+
+        responses = packer.call_many(
+            [f"q{i}" for i in range(6)], max_tokens=50, stop="END"
+        )
+
+        assert [r.content for r in responses] == [f"answer to q{i} " for i in range(6)]
+        assert len(provider.prompts) == 2
+        assert provider.kwargs[0]["max_tokens"] == 200
+        assert "stop" not in provider.kwargs[0]
+        assert responses[0].metadata["packed"] == 4
+        assert responses[5].metadata["pack_index"] == 1
+        assert responses[0].prompt_tokens == 10
+        assert packer.stats()["requests_saved"] == 4
+
+    def test_falls_back_to_single_calls(self, fake_provider):
+        """Test unparsed or incomplete packs are answered one by one."""
+        import json
+
+        from dspy_helm.providers.packing import (
+            PackingConfig,
+            PromptPacker,
+            unpack_answers,
+        )
+
+        assert unpack_answers("Sorry, I can only answer one.", 2) == {}
+        assert unpack_answers('["a", "b"]', 2) == {0: "a", 1: "b"}
+        assert unpack_answers('["a"]', 2) == {}
+
+        provider = self._packer(
+            fake_provider,
+            lambda tasks: json.dumps([{"id": 2, "answer": f"packed {tasks[1]}"}]),
+        )
+        packer = PromptPacker(provider, PackingConfig(pack_size=3))
+
+        responses = packer.call_many(["a", "b", "c"])
+
+        assert [r.content for r in responses] == ["single: a", "packed b", "single: c"]
+        stats = packer.stats()
+        assert stats["packed_answers"] == 1
+        assert stats["fallbacks"] == 2
+        assert stats["requests"] == 3
+
+    def test_packs_respect_token_limit(self, fake_provider):
+        """Test a pack is cut before it exceeds max_prompt_tokens."""
+        from dspy_helm.providers.packing import PackingConfig, PromptPacker
+
+        packer = PromptPacker(
+            self._packer(fake_provider, lambda tasks: "[]"),
+            PackingConfig(pack_size=10, max_prompt_tokens=300),
+        )
+        prompts = ["short"] * 3 + ["word " * 400] + ["short"] * 2
+
+        assert packer.packs(prompts) == [[0, 1, 2], [3], [4, 5]]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])